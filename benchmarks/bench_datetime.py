@@ -0,0 +1,52 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import random
+import timeit
+import datetime
+
+from youtube_api.youtube_api_utils import parse_yt_datetime, parse_yt_datetimes
+
+"""
+Compares the ways to parse the dates of API items, per date.
+"strptime" is the old path of parse_yt_datetime, which tries a format, catches the exception and tries the other one.
+"parse_yt_datetime" parses one date at a time with the fixed-width fast path,
+and "parse_yt_datetimes" parses a whole page or column at once.
+Set TZ to compare time zones, the bulk path looks up the offset of local time once per day.
+
+    python benchmarks/bench_datetime.py
+    TZ=America/New_York python benchmarks/bench_datetime.py
+"""
+
+def strptime(date_str):
+    try:
+        return datetime.datetime.timestamp(datetime.datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ"))
+    except ValueError:
+        return datetime.datetime.timestamp(datetime.datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ"))
+
+
+def make_dates(n, date_format):
+    random.seed(0)
+    start = datetime.datetime(2005, 4, 23)
+    dates = [start + datetime.timedelta(seconds=random.randrange(600000000)) for _ in range(n)]
+    return [date.strftime(date_format) for date in dates]
+
+
+def main(n_dates=200000):
+    print('{:<24}{:>8}{:>12}{:>20}{:>20}   (us per date)'.format(
+        'dates', 'n', 'strptime', 'parse_yt_datetime', 'parse_yt_datetimes'))
+    # snippet/publishedAt has milliseconds on some resources and not on others.
+    for name, date_format in [('"...14.000Z"', '%Y-%m-%dT%H:%M:%S.000Z'), ('"...14Z"', '%Y-%m-%dT%H:%M:%SZ')]:
+        for n in [50, 100000]:
+            dates = make_dates(n, date_format)
+            number = max(1, n_dates // n)
+            assert parse_yt_datetimes(dates) == [strptime(date_str) for date_str in dates]
+            timings = [timeit.timeit(lambda: [strptime(date_str) for date_str in dates], number=number),
+                       timeit.timeit(lambda: [parse_yt_datetime(date_str) for date_str in dates], number=number),
+                       timeit.timeit(lambda: parse_yt_datetimes(dates), number=number)]
+            print('{:<24}{:>8}{:>12.2f}{:>20.2f}{:>20.2f}'.format(
+                name, n, *[t / number / n * 1e6 for t in timings]))
+
+
+if __name__ == '__main__':
+    main()
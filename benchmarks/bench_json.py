@@ -0,0 +1,51 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import json
+import timeit
+import requests
+
+from youtube_api.decoders import DECODERS
+
+"""
+Compares the JSON decoders on the API responses in tests/data.
+"text" is the old path, requests decodes the body to a str and the stdlib parses it.
+The other columns parse the raw bytes with each installed decoder.
+
+    python benchmarks/bench_json.py
+"""
+
+def load_fixtures():
+    dirname = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data')
+    fixtures = dict()
+    for filename in sorted(os.listdir(dirname)):
+        with open(os.path.join(dirname, filename), 'rb') as f:
+            fixtures[filename] = f.read()
+    return fixtures
+
+
+def make_response(body):
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = body
+    # the API sends "application/json; charset=UTF-8", so requests doesn't have to guess it.
+    response.encoding = 'UTF-8'
+    return response
+
+
+def main(number=2000):
+    fixtures = load_fixtures()
+    decoders = [(name, loads) for name, loads in DECODERS.items() if loads]
+    print('{:<36}{:>8}'.format('fixture (bytes)', 'text') +
+          ''.join('{:>10}'.format(name) for name, _ in decoders) + '   (us per response)')
+    for filename, body in fixtures.items():
+        # a new response every call, as requests caches the decoded text.
+        text = timeit.timeit(lambda: json.loads(make_response(body).text), number=number)
+        timings = [timeit.timeit(lambda: loads(make_response(body).content), number=number)
+                   for _, loads in decoders]
+        print('{:<36}{:>8.1f}'.format('{} ({})'.format(filename, len(body)), text / number * 1e6) +
+              ''.join('{:>10.1f}'.format(t / number * 1e6) for t in timings))
+
+
+if __name__ == '__main__':
+    main()
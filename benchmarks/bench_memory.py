@@ -0,0 +1,86 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import gc
+import json
+import random
+import tracemalloc
+
+import youtube_api.parsers as P
+from youtube_api.schema import get_schema
+from youtube_api.columnar import ColumnarParser, COMMENT_COLUMNS
+
+"""
+Compares the memory each representation of parsed rows keeps, per row, over a simulated comment crawl:
+pages of 100 comment threads decoded from JSON one at a time, like the client does,
+over a few hundred videos and a few thousand commenters, so IDs repeat across pages but not within a decoded page.
+
+    python benchmarks/bench_memory.py
+"""
+
+def make_pages(n_pages, n_videos=300, n_commenters=5000):
+    random.seed(0)
+    pages = []
+    for i in range(n_pages):
+        video_id = 'video{:06d}'.format(random.randrange(n_videos))
+        items = []
+        for j in range(100):
+            commenter = 'UC{:022d}'.format(random.randrange(n_commenters))
+            comment = {'id' : 'comment{:08d}{:03d}'.format(i, j),
+                       'snippet' : {'videoId' : video_id,
+                                    'authorChannelUrl' : 'http://www.youtube.com/channel/' + commenter,
+                                    'authorChannelId' : {'value' : commenter},
+                                    'authorDisplayName' : 'user ' + commenter[-6:],
+                                    'likeCount' : random.randrange(100),
+                                    'publishedAt' : '2020-01-{:02d}T12:34:56Z'.format(random.randrange(1, 29)),
+                                    'textDisplay' : 'a comment of about fifty characters, number {}'.format(j),
+                                    'viewerRating' : 'none'}}
+            items.append({'id' : comment['id'],
+                          'snippet' : {'totalReplyCount' : 0, 'topLevelComment' : comment}})
+        pages.append(json.dumps({'items' : items}))
+    return pages
+
+
+def retained(pages, parser, keep):
+    '''
+    Returns the bytes kept after parsing every page, with ``keep`` holding the rows.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows = []
+    for page in pages:
+        with P.parse_context():
+            rows.extend(parser(item) for item in json.loads(page)['items'])
+    rows = keep(rows)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return after - before
+
+
+def main(n_pages=200):
+    pages = make_pages(n_pages)
+    n_rows = n_pages * 100
+    columnar = ColumnarParser(COMMENT_COLUMNS)
+    representations = [
+        ('dict (parse_comment_metadata)', P.parse_comment_metadata, list),
+        ('namedtuple (as_records, intern=[])', P.as_records(P.parse_comment_metadata, intern=[]), list),
+        ('namedtuple, interned (as_records)', P.as_records(P.parse_comment_metadata), list),
+        ('dict (schema)', get_schema('comment'), list),
+        ('namedtuple, interned (schema.records)',
+         get_schema('comment').records('Comment', intern=['video_id', 'commenter_channel_url',
+                                                          'commenter_channel_id',
+                                                          'commenter_channel_display_name',
+                                                          'commenter_rating']), list),
+        ('columnar buffers (ColumnarParser)', columnar, lambda rows: columnar._buffers),
+    ]
+    print('{:<42}{:>14}'.format('representation ({} rows)'.format(n_rows), 'bytes per row'))
+    for name, parser, keep in representations:
+        columnar.clear()
+        print('{:<42}{:>14.0f}'.format(name, retained(pages, parser, keep) / n_rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -41,5 +41,12 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ),
-    install_requires=INSTALL_REQUIRES
+    python_requires='>=3.7',
+    install_requires=INSTALL_REQUIRES,
+    extras_require={
+        'async': ['aiohttp'],
+        'http2': ['httpx[http2]'],
+        'json': ['orjson'],
+        'arrow': ['pyarrow'],
+    }
 )
@@ -0,0 +1,109 @@
+import os
+import sys
+sys.path.append('../')
+import json
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from youtube_api import AsyncYouTubeDataAPI
+import youtube_api.parsers as P
+from youtube_api.cache import IDCache
+
+class TestAsyncMethods(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dirname = os.path.dirname(__file__)
+        with open(os.path.join(dirname, 'data', 'video_metadata.json')) as f:
+            cls.video_metadata = json.load(f)
+        with open(os.path.join(dirname, 'data', 'comment_meta.json')) as f:
+            cls.comment = json.load(f)
+
+    def setUp(self):
+        self.yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False, max_concurrency=3)
+
+    async def test_video_metadata_chunks(self):
+        video_ids = ['kNbhUWLH_yY'] * 120
+        endpoints = []
+        async def fake_request(http_endpoint):
+            endpoints.append(http_endpoint)
+            return self.video_metadata
+
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            resp = await self.yt.get_video_metadata(video_ids)
+
+        self.assertEqual(len(endpoints), 3)
+        self.assertEqual(len(resp), 3)
+        self.assertEqual(resp[0]['video_id'], 'kNbhUWLH_yY')
+
+    async def test_bounded_concurrency(self):
+        in_flight = []
+        peak = []
+        async def fake_request(http_endpoint):
+            in_flight.append(http_endpoint)
+            peak.append(len(in_flight))
+            await asyncio.sleep(.01)
+            in_flight.pop()
+            return {'items' : []}
+
+        http_endpoints = ['endpoint{}'.format(i) for i in range(20)]
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            responses = [r async for r in self.yt._http_request_many(http_endpoints)]
+
+        self.assertEqual(len(responses), 20)
+        self.assertLessEqual(max(peak), 3)
+
+    async def test_video_comments_without_replies(self):
+        last_page = dict(self.comment)
+        last_page.pop('nextPageToken')
+        async def fake_request(http_endpoint):
+            return last_page
+
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            resp = await self.yt.get_video_comments('eqwPlwHSL_M', get_replies=False)
+
+        self.assertEqual(len(resp), len(self.comment['items']))
+        self.assertEqual(resp[0]['comment_id'], P.parse_comment_metadata(self.comment['items'][0])['comment_id'])
+
+    def test_requires_key(self):
+        with self.assertRaisesRegex(ValueError, 'No API key used to initate the class.'):
+            AsyncYouTubeDataAPI('')
+
+    async def test_verify_key(self):
+        class FakeResponse:
+            def __init__(self, ok):
+                self.ok = ok
+            async def __aenter__(self):
+                return self
+            async def __aexit__(self, *exc):
+                return False
+
+        with patch('aiohttp.ClientSession.get', return_value=FakeResponse(True)) as mock_get:
+            async with AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=True) as yt:
+                self.assertIsNotNone(yt.session)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertNotIn('headers', mock_get.call_args[1])
+
+        with patch('aiohttp.ClientSession.get', return_value=FakeResponse(False)):
+            with self.assertRaisesRegex(ValueError, 'The API Key is invalid'):
+                async with AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=True):
+                    pass
+
+    async def test_video_metadata_id_cache(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False, id_cache=IDCache())
+        requested = []
+        async def fake_request(http_endpoint):
+            chunk = http_endpoint.split('&id=')[1].split('&')[0].split(',')
+            requested.extend(chunk)
+            return {'items' : [dict(self.video_metadata['items'][0], id=id_) for id_ in chunk]}
+
+        video_ids = ['vid{:03d}'.format(i) for i in range(60)]
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            await yt.get_video_metadata(video_ids[:10] * 2)
+            resp = await yt.get_video_metadata(video_ids)
+        self.assertEqual([r['video_id'] for r in resp], video_ids)
+        self.assertEqual(requested, video_ids)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import sys
+sys.path.append('../')
+import json
+import time
+import tempfile
+import unittest
+import requests
+from unittest.mock import patch
+
+from youtube_api import YouTubeDataAPI, AsyncYouTubeDataAPI
+from youtube_api.cache import SQLiteCache, IDCache, ETagStore, normalize_endpoint
+
+def make_response(status_code, body):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode('utf-8')
+    return response
+
+class TestSQLiteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_normalize_endpoint(self):
+        endpoint1 = 'https://www.googleapis.com/youtube/v3/videos?part=snippet&id=abc&key=key1'
+        endpoint2 = 'https://www.googleapis.com/youtube/v3/videos?id=abc&key=key2&part=snippet'
+        self.assertEqual(normalize_endpoint(endpoint1), normalize_endpoint(endpoint2))
+        self.assertNotIn('key', normalize_endpoint(endpoint1))
+
+    def test_ttl(self):
+        cache = SQLiteCache(self.path)
+        self.assertEqual(cache.ttl('https://www.googleapis.com/youtube/v3/channels?part=id,brandingSettings'),
+                         7 * 24 * 60 * 60)
+        self.assertEqual(cache.ttl('https://www.googleapis.com/youtube/v3/channels?part=brandingSettings,statistics'),
+                         15 * 60)
+        self.assertEqual(cache.ttl('https://www.googleapis.com/youtube/v3/search?part=snippet'), 60 * 60)
+
+    def test_get_set_persist(self):
+        endpoint = 'https://www.googleapis.com/youtube/v3/videos?part=snippet&id=abc'
+        cache = SQLiteCache(self.path)
+        self.assertIsNone(cache.get(endpoint))
+        cache.set(endpoint, b'{"items": []}')
+        cache.close()
+
+        cache = SQLiteCache(self.path)
+        self.assertEqual(cache.get(endpoint), b'{"items": []}')
+        self.assertEqual(cache.size, len(b'{"items": []}'))
+
+    def test_expired(self):
+        endpoint = 'https://www.googleapis.com/youtube/v3/videos?part=statistics&id=abc'
+        cache = SQLiteCache(self.path)
+        cache.set(endpoint, b'{}')
+        with patch('time.time', return_value=time.time() + 16 * 60):
+            self.assertIsNone(cache.get(endpoint))
+        self.assertEqual(cache.size, 0)
+
+    def test_lru_eviction(self):
+        cache = SQLiteCache(self.path, max_size=250)
+        endpoint = 'https://www.googleapis.com/youtube/v3/videos?part=snippet&id={}'
+        for i in range(3):
+            cache.set(endpoint.format(i), b'x' * 100)
+            time.sleep(.01)
+            cache.get(endpoint.format(0))
+        self.assertEqual(cache.size, 200)
+        self.assertIsNotNone(cache.get(endpoint.format(0)))
+        self.assertIsNone(cache.get(endpoint.format(1)))
+        self.assertIsNotNone(cache.get(endpoint.format(2)))
+
+    def test_client_cache(self):
+        yt = YouTubeDataAPI(['key1', 'key2'], verify_api_key=False, cache=SQLiteCache(self.path))
+        body = {'items' : [{'id' : 'UC3XTzVzaHQEd30rQbuvCtTQ'}]}
+        with patch.object(yt.session, 'get', return_value=make_response(200, body)) as mock_get:
+            first = yt.get_channel_id_from_user('LastWeekTonight')
+            second = yt.get_channel_id_from_user('LastWeekTonight')
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(yt.quota_ledger.total, 1)
+
+class TestIDCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dirname = os.path.dirname(__file__)
+        with open(os.path.join(dirname, 'data', 'video_metadata.json')) as f:
+            cls.video_metadata = json.load(f)
+
+    def test_lru_eviction(self):
+        cache = IDCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+    def test_expired(self):
+        cache = IDCache(ttl=60)
+        cache.set('a', 1)
+        with patch('time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_client_id_cache(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, id_cache=IDCache())
+        requested = []
+        def fake_request(http_endpoint):
+            chunk = http_endpoint.split('&id=')[1].split('&')[0].split(',')
+            requested.extend(chunk)
+            # the API doesn't return deleted videos, IE "gone".
+            return {'items' : [dict(self.video_metadata['items'][0], id=id_)
+                               for id_ in reversed(chunk) if id_ != 'gone']}
+
+        video_ids = ['vid{:03d}'.format(i) for i in range(60)]
+        with patch.object(yt, '_http_request', side_effect=fake_request) as mock_request:
+            resp = yt.get_video_metadata(video_ids[:10] + video_ids[:10])
+            self.assertEqual([r['video_id'] for r in resp], video_ids[:10])
+            self.assertEqual(requested, video_ids[:10])
+
+            requested.clear()
+            resp = yt.get_video_metadata(video_ids[::-1] + ['gone'])
+            self.assertEqual([r['video_id'] for r in resp], video_ids[::-1])
+            self.assertEqual(sorted(requested), sorted(video_ids[10:] + ['gone']))
+            self.assertEqual(mock_request.call_count, 3)
+
+            # other parts are cached separately
+            requested.clear()
+            yt.get_video_metadata(video_ids[:10], part=['snippet'])
+            self.assertEqual(requested, video_ids[:10])
+
+class TestETagStore(unittest.TestCase):
+
+    def test_conditional_requests(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, etag_store=ETagStore())
+        body = {'etag' : 'abc', 'items' : [{'id' : 'UC3XTzVzaHQEd30rQbuvCtTQ'}]}
+        not_modified = requests.models.Response()
+        not_modified.status_code = 304
+        responses = [make_response(200, body), not_modified]
+        with patch.object(yt.session, 'get', side_effect=responses) as mock_get:
+            first = yt.get_channel_id_from_user('LastWeekTonight')
+            second = yt.get_channel_id_from_user('LastWeekTonight')
+        self.assertEqual(first, second)
+        self.assertIsNone(mock_get.call_args_list[0][1]['headers'])
+        self.assertEqual(mock_get.call_args_list[1][1]['headers'], {'If-None-Match' : 'abc'})
+        self.assertEqual(yt.etag_store.hits, 1)
+
+    def test_lru_eviction(self):
+        store = ETagStore(max_entries=1)
+        endpoint = 'https://www.googleapis.com/youtube/v3/videos?part=snippet&id={}'
+        store.set(endpoint.format(0), 'a', {})
+        store.set(endpoint.format(1), 'b', {})
+        self.assertIsNone(store.get(endpoint.format(0)))
+        self.assertEqual(store.get(endpoint.format(1) + '&key=xxx'), ('b', {}))
+
+class TestAsyncETagStore(unittest.IsolatedAsyncioTestCase):
+
+    async def test_conditional_requests(self):
+        class FakeResponse:
+            def __init__(self, status, body=None, headers={}):
+                self.status = status
+                self.ok = status < 400
+                self.body = json.dumps(body).encode('utf-8') if body is not None else b''
+                self.headers = headers
+            async def read(self):
+                return self.body
+            async def __aenter__(self):
+                return self
+            async def __aexit__(self, *exc):
+                return False
+
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False, etag_store=ETagStore())
+        body = {'etag' : 'abc', 'items' : [{'id' : 'UC3XTzVzaHQEd30rQbuvCtTQ'}]}
+        responses = [FakeResponse(200, body), FakeResponse(304)]
+        with patch('aiohttp.ClientSession.get', side_effect=responses) as mock_get:
+            async with yt:
+                first = await yt.get_channel_id_from_user('LastWeekTonight')
+                second = await yt.get_channel_id_from_user('LastWeekTonight')
+        self.assertEqual(first, 'UC3XTzVzaHQEd30rQbuvCtTQ')
+        self.assertEqual(first, second)
+        self.assertIsNone(mock_get.call_args_list[0][1]['headers'])
+        self.assertEqual(mock_get.call_args_list[1][1]['headers'], {'If-None-Match' : 'abc'})
+        self.assertEqual(yt.etag_store.hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
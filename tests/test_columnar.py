@@ -0,0 +1,119 @@
+import sys
+sys.path.append('../')
+import unittest
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qsl
+
+import pandas as pd
+
+from youtube_api import YouTubeDataAPI
+import youtube_api.parsers as P
+from youtube_api.columnar import (
+    ColumnarParser, Column, VIDEO_COLUMNS, COMMENT_COLUMNS, pyarrow
+)
+
+def video(i, **statistics):
+    return {'id' : 'video-{}'.format(i),
+            'snippet' : {'channelId' : 'UC{}'.format(i % 3), 'title' : 'title {}'.format(i),
+                         'publishedAt' : '2020-01-0{}T00:00:00.000Z'.format(i % 9 + 1),
+                         'tags' : ['a', 'b'],
+                         'thumbnails' : {'high' : {'url' : 'https://i.ytimg.com/{}.jpg'.format(i)}}},
+            'statistics' : dict({'viewCount' : str(i * 10)}, **statistics)}
+
+def comment_page(http_endpoint):
+    params = dict(parse_qsl(urlparse(http_endpoint).query))
+    start = int(params.get('pageToken', 0))
+    page = {'items' : [{'id' : 't{}'.format(i),
+                        'snippet' : {'totalReplyCount' : 0,
+                                     'topLevelComment' : {'id' : 'c{}'.format(i),
+                                                          'snippet' : {'videoId' : params['videoId'],
+                                                                       'likeCount' : i,
+                                                                       'publishedAt' : '2020-01-01T00:00:00Z'}}}}
+                       for i in range(start, min(start + 100, 250))]}
+    if start + 100 < 250:
+        page['nextPageToken'] = str(start + 100)
+    return page
+
+
+class TestColumnarParser(unittest.TestCase):
+
+    def test_dtypes(self):
+        parser = ColumnarParser(VIDEO_COLUMNS)
+        for i in range(10):
+            parser(video(i, likeCount='1') if i % 2 else video(i))
+        parser(None)
+        self.assertEqual(len(parser), 10)
+
+        df = parser.to_pandas()
+        self.assertEqual(list(df.columns), [column.name for column in VIDEO_COLUMNS.columns])
+        self.assertEqual(df['video_view_count'].dtype, 'int64')
+        self.assertEqual(df['video_view_count'].sum(), 450)
+        self.assertEqual(str(df['video_like_count'].dtype), 'Int64')
+        self.assertEqual(df['video_like_count'].isna().sum(), 5)
+        self.assertIsInstance(df['channel_id'].dtype, pd.CategoricalDtype)
+        self.assertEqual(len(df['channel_id'].cat.categories), 3)
+        self.assertEqual(str(df['video_publish_date'].dt.tz), 'UTC')
+        self.assertEqual(df['video_publish_date'][0], pd.Timestamp('2020-01-01', tz='UTC'))
+        self.assertEqual(df['video_tags'][0], 'a|b')
+
+    def test_timestamps(self):
+        parser = ColumnarParser([Column('date', 'snippet/publishedAt', 'timestamp')])
+        for date_str in ['2020-01-01T12:00:00.500Z', None, '2020-01-02T00:00:00Z']:
+            parser({'snippet' : {'publishedAt' : date_str}})
+        dates = parser.to_pandas()['date']
+        self.assertEqual(dates[0], pd.Timestamp('2020-01-01 12:00:00.5', tz='UTC'))
+        self.assertTrue(pd.isna(dates[1]))
+        self.assertEqual(dates[2], pd.Timestamp('2020-01-02', tz='UTC'))
+        # other forms of ISO 8601 are parsed by pandas.
+        parser({'snippet' : {'publishedAt' : '2020-01-03T00:00:00+01:00'}})
+        self.assertEqual(parser.to_pandas()['date'][3], pd.Timestamp('2020-01-02 23:00', tz='UTC'))
+
+    def test_matches_parser(self):
+        items = [video(i) for i in range(3)]
+        parser = ColumnarParser(VIDEO_COLUMNS)
+        for item in items:
+            parser(item)
+        df = parser.to_pandas()
+        for row, item in zip(df.to_dict('records'), items):
+            parsed = P.parse_video_metadata(item)
+            for name in ['video_id', 'channel_id', 'video_title', 'video_tags']:
+                self.assertEqual(row[name], parsed[name])
+            self.assertEqual(row['video_view_count'], int(parsed['video_view_count']))
+
+    def test_fields(self):
+        parser = ColumnarParser([Column('video_id', 'id', 'string'),
+                                 Column('views', 'statistics/viewCount', 'int64')])
+        self.assertEqual(parser.fields, {None : ['id', 'statistics/viewCount']})
+        with self.assertRaises(ValueError):
+            ColumnarParser([Column('views', 'statistics/viewCount', 'int32')])
+        with self.assertRaises(ValueError):
+            ColumnarParser([Column('views', None, 'int64')])
+
+    def test_comments(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        parser = ColumnarParser(COMMENT_COLUMNS)
+        with patch.object(yt, '_http_request', side_effect=comment_page) as request:
+            frames = list(parser.batches(yt.get_video_comments_gen('v1', parser=parser), batch_size=100))
+        self.assertEqual([len(df) for df in frames], [100, 100, 50])
+        self.assertEqual(len(parser), 0)
+        self.assertEqual(frames[2]['comment_like_count'].tolist(), list(range(200, 250)))
+        self.assertEqual(frames[0]['comment_id'][0], 'c0')
+        self.assertEqual(frames[0]['reply_count'].tolist(), [0] * 100)
+        self.assertIn('topLevelComment', request.call_args_list[0][0][0])
+
+    @unittest.skipIf(pyarrow is None, 'requires pyarrow')
+    def test_to_arrow(self):
+        parser = ColumnarParser(VIDEO_COLUMNS)
+        for i in range(10):
+            parser(video(i))
+        batch = parser.to_arrow()
+        self.assertEqual(batch.num_rows, 10)
+        self.assertEqual(str(batch.schema.field('video_view_count').type), 'int64')
+
+    @unittest.skipIf(pyarrow is not None, 'pyarrow is installed')
+    def test_to_arrow_missing(self):
+        with self.assertRaises(ImportError):
+            ColumnarParser(VIDEO_COLUMNS).to_arrow()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import sys
+sys.path.append('../')
+import json
+import threading
+import unittest
+import requests
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qsl
+
+from youtube_api import YouTubeDataAPI, AsyncYouTubeDataAPI
+from youtube_api.crawler import BloomFilter, SnowballCrawler, AsyncSnowballCrawler, _Frontier
+
+def channel(i):
+    return 'UC{:022d}'.format(i)
+
+def fake_graph(subscriptions, featured):
+    '''
+    Returns a fake ``_http_request`` over the ``subscriptions`` and ``featured`` channels of each channel,
+    and the requested endpoints.
+    '''
+    requested = []
+    lock = threading.Lock()
+    def fake_request(http_endpoint):
+        with lock:
+            requested.append(http_endpoint)
+        params = dict(parse_qsl(urlparse(http_endpoint).query))
+        if '/subscriptions?' in http_endpoint:
+            return {'items' : [{'snippet' : {'resourceId' : {'channelId' : channel_id}}}
+                               for channel_id in subscriptions.get(params['channelId'], [])]}
+        return {'items' : [{'id' : channel_id,
+                            'brandingSettings' : {'channel' : {'featuredChannelsUrls' : featured.get(channel_id, [])}}}
+                           for channel_id in params['id'].split(',')]}
+    return fake_request, requested
+
+def forbidden_subscriptions(fake_request, private):
+    '''
+    Returns a fake ``session.get``, which answers the subscriptions of the ``private`` channels
+    with a 403 "subscriptionForbidden" and the other endpoints with ``fake_request``.
+    The responses are built by ``make_response``, called with a status code and a json body.
+    '''
+    def fake_get(http_endpoint, make_response):
+        params = dict(parse_qsl(urlparse(http_endpoint).query))
+        if '/subscriptions?' in http_endpoint and params['channelId'] in private:
+            return make_response(403, {'error' : {'code' : 403, 'errors' : [{'reason' : 'subscriptionForbidden'}]}})
+        return make_response(200, fake_request(http_endpoint))
+    return fake_get
+
+
+class TestSnowballCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        # a binary tree of subscriptions, every channel features its parent.
+        self.subscriptions = {channel(i) : [channel(2 * i + 1), channel(2 * i + 2)] for i in range(200)}
+        self.featured = {channel(i) : [channel((i - 1) // 2)] for i in range(1, 400)}
+
+    def test_crawl(self):
+        fake_request, requested = fake_graph(self.subscriptions, self.featured)
+        crawler = SnowballCrawler(self.yt, max_depth=3, max_workers=4)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            edges = list(crawler.crawl([channel(0)]))
+
+        subscriptions = {(e['channel_id'], e['linked_channel_id'], e['depth'])
+                         for e in edges if e['relation'] == 'subscription'}
+        self.assertEqual(subscriptions, {(channel(i), channel(2 * i + j), len(bin(i + 1)) - 2)
+                                         for i in range(7) for j in (1, 2)})
+        featured = {(e['channel_id'], e['linked_channel_id']) for e in edges if e['relation'] == 'featured'}
+        self.assertEqual(featured, {(channel(i), channel((i - 1) // 2)) for i in range(1, 7)})
+        # each channel is requested once, featured channels 50 at a time.
+        channel_requests = [r for r in requested if '/channels?' in r]
+        self.assertEqual(len(channel_requests), 3)
+        self.assertEqual(len([r for r in requested if '/subscriptions?' in r]), 7)
+        self.assertEqual(len(crawler.visited), 15)
+
+    def test_quota_budget(self):
+        fake_request, requested = fake_graph(self.subscriptions, self.featured)
+        crawler = SnowballCrawler(self.yt, max_depth=10, featured_channels=False,
+                                  quota_budget=20, max_workers=2)
+        def fake_get(http_endpoint, **kwargs):
+            response = requests.models.Response()
+            response.status_code = 200
+            response._content = json.dumps(fake_request(http_endpoint)).encode('utf-8')
+            return response
+
+        with patch.object(self.yt.session, 'get', side_effect=fake_get):
+            n_edges = crawler.run([channel(0)], lambda edge: None)
+        self.assertTrue(crawler.budget_exhausted)
+        # stops scheduling at 20 units, and the requests already scheduled finish.
+        self.assertGreaterEqual(len(requested), 20)
+        self.assertLessEqual(len(requested), 20 + 2 * 2)
+        self.assertEqual(n_edges, 2 * len(requested))
+        self.assertEqual(self.yt.quota_ledger.units['get_subscriptions_gen'], len(requested))
+
+    def test_private_subscriptions(self):
+        fake_request, requested = fake_graph(self.subscriptions, self.featured)
+        crawler = SnowballCrawler(self.yt, max_depth=2, featured_channels=False)
+        def make_response(status_code, body):
+            response = requests.models.Response()
+            response.status_code = status_code
+            response._content = json.dumps(body).encode('utf-8')
+            return response
+        fake_get = forbidden_subscriptions(fake_request, {channel(1)})
+
+        with patch.object(self.yt.session, 'get', side_effect=lambda url, **kwargs: fake_get(url, make_response)):
+            edges = list(crawler.crawl([channel(0)]))
+        self.assertEqual({(e['channel_id'], e['linked_channel_id']) for e in edges},
+                         {(channel(0), channel(1)), (channel(0), channel(2)),
+                          (channel(2), channel(5)), (channel(2), channel(6))})
+
+        # other errors still stop the crawl.
+        error = make_response(403, {'error' : {'code' : 403, 'errors' : [{'reason' : 'forbidden'}]}})
+        crawler = SnowballCrawler(self.yt, max_depth=2, featured_channels=False)
+        with patch.object(self.yt.session, 'get', return_value=error):
+            with self.assertRaises(requests.HTTPError):
+                list(crawler.crawl([channel(0)]))
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=10000, error_rate=.01)
+        n_added = sum(bloom.add(channel(i)) for i in range(10000))
+        self.assertGreater(n_added, 9900)
+        self.assertEqual(len(bloom), n_added)
+        self.assertFalse(bloom.add(channel(5)))
+        self.assertIn(channel(9999), bloom)
+        false_positives = sum(channel(i) in bloom for i in range(10000, 20000))
+        self.assertLess(false_positives, 300)
+        self.assertLess(len(bloom._bits), 13000)
+
+    def test_frontier(self):
+        frontier = _Frontier()
+        channel_ids = ['UC_x5XG1OV2P6uZZ5FSM9Ttw', 'UCn8zNIfYAQNdrFRrr8oibKw', 'HCabc', 'UC_x5XG1OV2P6uZZ5FSM9Ttx']
+        for channel_id in channel_ids:
+            frontier.add(channel_id)
+        self.assertEqual(len(frontier), 4)
+        self.assertEqual(sorted(frontier), sorted(channel_ids))
+        self.assertEqual(len(frontier._packed), 32)
+
+
+class TestAsyncSnowballCrawler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_crawl(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        subscriptions = {channel(i) : [channel(2 * i + 1), channel(2 * i + 2), channel(0)] for i in range(200)}
+        fake_request, requested = fake_graph(subscriptions, {})
+        async def fake_async_request(http_endpoint):
+            return fake_request(http_endpoint)
+
+        crawler = AsyncSnowballCrawler(yt, max_depth=2)
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            edges = [edge async for edge in crawler.crawl([channel(0)])]
+        self.assertEqual(len([e for e in edges if e['relation'] == 'subscription']), 9)
+        self.assertEqual(len([r for r in requested if '/subscriptions?' in r]), 3)
+
+    async def test_private_subscriptions(self):
+        class FakeResponse:
+            def __init__(self, status, body):
+                self.status = status
+                self.ok = status < 400
+                self.reason = 'OK' if self.ok else 'Forbidden'
+                self.body = json.dumps(body).encode('utf-8')
+                self.headers = {}
+                self.request_info = None
+                self.history = ()
+            async def read(self):
+                return self.body
+            async def __aenter__(self):
+                return self
+            async def __aexit__(self, *exc):
+                return False
+
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        subscriptions = {channel(i) : [channel(2 * i + 1), channel(2 * i + 2)] for i in range(200)}
+        fake_request, requested = fake_graph(subscriptions, {})
+        fake_get = forbidden_subscriptions(fake_request, {channel(1)})
+
+        crawler = AsyncSnowballCrawler(yt, max_depth=2, featured_channels=False)
+        with patch('aiohttp.ClientSession.get', side_effect=lambda url, **kwargs: fake_get(url, FakeResponse)):
+            async with yt:
+                edges = [edge async for edge in crawler.crawl([channel(0)])]
+        self.assertEqual({(e['channel_id'], e['linked_channel_id']) for e in edges},
+                         {(channel(0), channel(1)), (channel(0), channel(2)),
+                          (channel(2), channel(5)), (channel(2), channel(6))})
+
+if __name__ == '__main__':
+    unittest.main()
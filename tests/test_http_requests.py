@@ -0,0 +1,172 @@
+import os
+import sys
+sys.path.append('../')
+import json
+import time
+import threading
+import unittest
+import requests
+from unittest.mock import patch
+
+from youtube_api import YouTubeDataAPI
+from youtube_api.retry import RetryPolicy
+from youtube_api.adapters import HTTP2Adapter
+from youtube_api.decoders import get_decoder
+
+def make_response(status_code, body, headers={}):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode('utf-8')
+    response.headers.update(headers)
+    return response
+
+def api_error(status_code, reason):
+    return make_response(status_code, {'error' : {'code' : status_code,
+                                                  'errors' : [{'reason' : reason}]}})
+
+class TestHttpRequests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dirname = os.path.dirname(__file__)
+        with open(os.path.join(dirname, 'data', 'video_metadata.json')) as f:
+            cls.video_metadata = json.load(f)
+
+    def setUp(self):
+        self.yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+
+    def test_video_metadata_thread_pool(self):
+        video_ids = ['vid{:03d}'.format(i) for i in range(500)]
+        def fake_request(http_endpoint):
+            chunk = http_endpoint.split('&id=')[1].split('&')[0].split(',')
+            time.sleep(.002 * (int(chunk[0][3:]) % 7))
+            item = dict(self.video_metadata['items'][0], id=chunk[0])
+            return {'items' : [item]}
+
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            resp = self.yt.get_video_metadata(video_ids, max_workers=4)
+        self.assertEqual([r['video_id'] for r in resp], video_ids[::50])
+
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            resp = self.yt.get_video_metadata(video_ids, max_workers=4, ordered=False)
+        self.assertEqual(sorted(r['video_id'] for r in resp), video_ids[::50])
+
+    @patch('time.sleep')
+    def test_retry_https(self, mock_sleep):
+        responses = [make_response(503, {}, {'Retry-After' : '7'}),
+                     api_error(403, 'rateLimitExceeded'),
+                     make_response(200, self.video_metadata)]
+        with patch.object(self.yt.session, 'get', side_effect=responses) as mock_get:
+            resp = self.yt.get_video_metadata('kNbhUWLH_yY')
+
+        self.assertEqual(resp['video_id'], 'kNbhUWLH_yY')
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertTrue(mock_get.call_args[0][0].startswith('https://'))
+        self.assertGreaterEqual(mock_sleep.call_args_list[0][0][0], 7)
+        self.assertEqual(self.yt.last_retries, 2)
+        self.assertEqual(self.yt.retry_counts['videos'], 2)
+
+    @patch('time.sleep')
+    def test_no_retry_quota_exceeded(self, mock_sleep):
+        with patch.object(self.yt.session, 'get', return_value=api_error(403, 'quotaExceeded')) as mock_get:
+            with self.assertRaises(requests.HTTPError):
+                self.yt.get_video_metadata('kNbhUWLH_yY')
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(self.yt.last_retries, 0)
+
+    @patch('time.sleep')
+    def test_max_retries(self, mock_sleep):
+        self.yt.retry_policy = RetryPolicy(max_retries=2, jitter=False)
+        with patch.object(self.yt.session, 'get', side_effect=requests.ConnectionError) as mock_get:
+            with self.assertRaises(requests.ConnectionError):
+                self.yt.get_video_metadata('kNbhUWLH_yY')
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [.5, 1.])
+
+    @patch('time.sleep')
+    def test_last_retries_per_thread(self, mock_sleep):
+        # the video "a" fails once and "b" twice before they succeed.
+        failures = {'a' : 1, 'b' : 2}
+        lock = threading.Lock()
+        def fake_get(http_endpoint, **kwargs):
+            video_id = http_endpoint.split('&id=')[1].split('&')[0]
+            with lock:
+                if failures[video_id]:
+                    failures[video_id] -= 1
+                    return make_response(503, {})
+            return make_response(200, {'items' : []})
+
+        done = threading.Event()
+        retries = {}
+        def call(video_id, wait):
+            self.yt._http_request('https://www.googleapis.com/youtube/v3/videos?part=id&id={}'.format(video_id))
+            if wait:
+                # read the count after the other thread's call.
+                done.wait(5)
+            else:
+                done.set()
+            retries[video_id] = self.yt.last_retries
+
+        with patch.object(self.yt.session, 'get', side_effect=fake_get):
+            threads = [threading.Thread(target=call, args=('a', True)), threading.Thread(target=call, args=('b', False))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(retries, {'a' : 1, 'b' : 2})
+        self.assertEqual(self.yt.retry_counts['videos'], 3)
+
+    def test_connection_pool(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, pool_maxsize=32)
+        adapter = yt.session.get_adapter('https://www.googleapis.com/youtube/v3/videos')
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertIs(yt.session.get_adapter('http://www.googleapis.com'), adapter)
+
+        with patch.object(requests.Session, 'get', return_value=make_response(200, {})) as mock_get:
+            YouTubeDataAPI('xxxxxxxxx')
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_http2_adapter(self):
+        try:
+            yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, http2=True)
+        except ImportError:
+            self.skipTest('httpx is not installed')
+        adapter = yt.session.get_adapter('https://www.googleapis.com/youtube/v3/videos')
+        self.assertIsInstance(adapter, HTTP2Adapter)
+
+    def test_partial_responses(self):
+        self.assertIn('gzip', self.yt.session.headers['Accept-Encoding'])
+        self.assertIn('(gzip)', self.yt.session.headers['User-Agent'])
+        with patch.object(self.yt, '_http_request', return_value={}) as mock_request:
+            self.yt.get_videos_from_playlist_id('UU3XTzVzaHQEd30rQbuvCtTQ')
+            self.yt.get_videos_from_playlist_id('UU3XTzVzaHQEd30rQbuvCtTQ', fields='items/id')
+            self.yt.get_videos_from_playlist_id('UU3XTzVzaHQEd30rQbuvCtTQ', parser=None)
+        urls = [c[0][0] for c in mock_request.call_args_list]
+        self.assertIn('&fields=nextPageToken,etag,items(snippet(publishedAt,resourceId/videoId,channelId))',
+                      urls[0])
+        self.assertTrue(urls[1].endswith('&fields=items/id'))
+        self.assertNotIn('fields', urls[2])
+
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, partial_responses=False)
+        with patch.object(yt, '_http_request', return_value={}) as mock_request:
+            yt.get_videos_from_playlist_id('UU3XTzVzaHQEd30rQbuvCtTQ')
+        self.assertNotIn('fields', mock_request.call_args[0][0])
+
+    def test_json_decoder(self):
+        self.assertIs(get_decoder('json'), json.loads)
+        with self.assertRaises(ValueError):
+            get_decoder('yaml')
+
+        decoded = []
+        def loads(body):
+            decoded.append(body)
+            return json.loads(body)
+
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, json_decoder=loads)
+        with patch.object(yt.session, 'get', return_value=make_response(200, self.video_metadata)):
+            resp = yt.get_video_metadata('kNbhUWLH_yY')
+        self.assertEqual(resp['video_id'], 'kNbhUWLH_yY')
+        self.assertIsInstance(decoded[0], bytes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,7 +25,7 @@ class TestAPI(unittest.TestCase):
             yt = YouTubeDataAPI(self.wrong_key)
 
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_verify(self, mock_request):
         '''#verified by Megan Brown on 11/30/2018'''
         mock_resp = requests.models.Response()
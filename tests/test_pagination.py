@@ -0,0 +1,510 @@
+import os
+import sys
+sys.path.append('../')
+import json
+import time
+import asyncio
+import datetime
+import tempfile
+import unittest
+import threading
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qsl
+
+from youtube_api import YouTubeDataAPI, AsyncYouTubeDataAPI
+from youtube_api.checkpoint import SQLiteCheckpointStore, SQLiteWatermarkStore
+import youtube_api.parsers as P
+
+def fake_pages(pages):
+    '''Returns a fake ``_http_request`` that serves ``pages`` by their page token, and the requested endpoints.'''
+    requested = []
+    def fake_request(http_endpoint):
+        requested.append(http_endpoint)
+        token = http_endpoint.split('&pageToken=')[1] if '&pageToken=' in http_endpoint else '0'
+        i = int(token)
+        page = {'items' : pages[i]}
+        if i + 1 < len(pages):
+            page['nextPageToken'] = str(i + 1)
+        return page
+    return fake_request, requested
+
+class TestPagination(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dirname = os.path.dirname(__file__)
+        with open(os.path.join(dirname, 'data', 'playlist_meta.json')) as f:
+            cls.playlist = json.load(f)
+        with open(os.path.join(dirname, 'data', 'recommendation.json')) as f:
+            cls.rec = json.load(f)
+
+    def setUp(self):
+        self.yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+
+    def test_gen_is_lazy(self):
+        item = self.playlist['items'][0]
+        fake_request, requested = fake_pages([[item] * 50, [item] * 50, [item] * 3])
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            gen = self.yt.get_playlists_gen('UC_x5XG1OV2P6uZZ5FSM9Ttw')
+            first = next(gen)
+            self.assertEqual(len(requested), 1)
+            self.assertEqual(first['playlist_id'], item['id'])
+            self.assertEqual(len(list(gen)), 102)
+        self.assertEqual(len(requested), 3)
+        self.assertTrue(requested[2].endswith('&pageToken=2'))
+
+    def test_prefetch(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, prefetch=True)
+        item = self.playlist['items'][0]
+        fake_request, requested = fake_pages([[item] * 50, [item] * 50, [item] * 3])
+        page_1 = threading.Event()
+        def fake_prefetched_request(http_endpoint):
+            if http_endpoint.endswith('&pageToken=1'):
+                page_1.set()
+            return fake_request(http_endpoint)
+
+        with patch.object(yt, '_http_request', side_effect=fake_prefetched_request):
+            gen = yt.get_playlists_gen('UC_x5XG1OV2P6uZZ5FSM9Ttw')
+            next(gen)
+            # the second page is requested while the first one is consumed.
+            self.assertTrue(page_1.wait(5))
+            self.assertEqual(len(list(gen)), 102)
+        self.assertEqual(len(requested), 3)
+
+    def test_collection_date(self):
+        item = self.playlist['items'][0]
+        fake_request, requested = fake_pages([[item] * 50, [item] * 3])
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            gen = self.yt.get_playlists_gen('UC_x5XG1OV2P6uZZ5FSM9Ttw')
+            first_page = [next(gen) for _ in range(50)]
+            # the consumer's own parsers don't see the date of the page.
+            self.assertIsNone(P._COLLECTION_DATE.get())
+            second_page = list(gen)
+        self.assertEqual({p['collection_date'] for p in first_page}, {first_page[0]['collection_date']})
+        self.assertEqual({p['collection_date'] for p in second_page}, {second_page[0]['collection_date']})
+        self.assertLessEqual(first_page[0]['collection_date'], second_page[0]['collection_date'])
+        self.assertIsNot(first_page[0]['collection_date'], second_page[0]['collection_date'])
+
+    def test_empty_page(self):
+        # a page without items used to be requested again forever.
+        item = self.playlist['items'][0]
+        fake_request, requested = fake_pages([[item], [], [item]])
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            playlists = self.yt.get_playlists('UC_x5XG1OV2P6uZZ5FSM9Ttw')
+            subscriptions = self.yt.get_subscriptions('UC_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+        self.assertEqual(len(playlists), 2)
+        self.assertEqual(len(subscriptions), 2)
+        self.assertEqual(len(requested), 6)
+
+    @patch('time.sleep')
+    def test_search_max_results(self, mock_sleep):
+        item = self.rec['items'][0]
+        fake_request, requested = fake_pages([[item] * 50] * 20)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            videos = self.yt.search('John Oliver', max_results=120)
+        self.assertEqual(len(videos), 120)
+        self.assertEqual(len(requested), 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_video_comments_gen(self):
+        thread = {'id' : 'thread1',
+                  'snippet' : {'totalReplyCount' : 1,
+                               'topLevelComment' : {'id' : 'thread1', 'snippet' : {'videoId' : 'eqwPlwHSL_M'}}}}
+        reply = {'id' : 'thread1.reply1', 'snippet' : {'videoId' : 'eqwPlwHSL_M', 'parentId' : 'thread1'}}
+        def fake_request(http_endpoint):
+            if '/comments?' in http_endpoint:
+                return {'items' : [reply]}
+            return {'items' : [thread]}
+
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            comments = list(self.yt.get_video_comments_gen('eqwPlwHSL_M'))
+            self.assertEqual([c['comment_id'] for c in comments], ['thread1', 'thread1.reply1'])
+            comments = self.yt.get_video_comments('eqwPlwHSL_M', max_results=1)
+            self.assertEqual([c['comment_id'] for c in comments], ['thread1'])
+
+    def test_inline_replies(self):
+        def comment(comment_id, parent_id=None):
+            return {'id' : comment_id, 'snippet' : {'videoId' : 'eqwPlwHSL_M', 'parentId' : parent_id}}
+        def thread(thread_id, n_inline, n_replies):
+            return {'id' : thread_id,
+                    'snippet' : {'totalReplyCount' : n_replies, 'topLevelComment' : comment(thread_id)},
+                    'replies' : {'comments' : [comment('{}.{}'.format(thread_id, i), thread_id)
+                                               for i in range(n_inline)]}}
+        threads = [thread('a', 2, 2), thread('b', 5, 150), thread('c', 0, 0)]
+        requested = []
+        def fake_request(http_endpoint):
+            requested.append(http_endpoint)
+            if '/comments?' in http_endpoint:
+                self.assertIn('parentId=b', http_endpoint)
+                if '&pageToken=' in http_endpoint:
+                    return {'items' : [comment('b.{}'.format(i), 'b') for i in range(100, 150)]}
+                return {'items' : [comment('b.{}'.format(i), 'b') for i in range(100)],
+                        'nextPageToken' : '1'}
+            return {'items' : threads}
+
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            comments = self.yt.get_video_comments('eqwPlwHSL_M', max_workers=4)
+        # a thread is followed by its replies, only the truncated thread is paged.
+        self.assertEqual([c['comment_id'] for c in comments],
+                         ['a', 'a.0', 'a.1', 'b'] + ['b.{}'.format(i) for i in range(150)] + ['c'])
+        self.assertEqual(len(requested), 3)
+        self.assertIn('part=snippet,replies&', requested[0])
+        self.assertIn('replies/comments', requested[0])
+        self.assertIn('part=snippet&', requested[1])
+
+        requested.clear()
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            comments = self.yt.get_video_comments('eqwPlwHSL_M', get_replies=False)
+        self.assertEqual([c['comment_id'] for c in comments], ['a', 'b', 'c'])
+        self.assertEqual(len(requested), 1)
+        self.assertNotIn('replies', requested[0].split('&fields=')[0])
+
+
+def fake_search(published, cap=500):
+    '''
+    Returns a fake search ``_http_request`` over videos published at the ``published`` timestamps,
+    that stops at ``cap`` results like the API, and the requested endpoints.
+    '''
+    requested = []
+    def fake_request(http_endpoint):
+        requested.append(http_endpoint)
+        params = dict(parse_qsl(urlparse(http_endpoint).query))
+        after, before = (datetime.datetime.strptime(params[k], "%Y-%m-%dT%H:%M:%SZ")
+                         .replace(tzinfo=datetime.timezone.utc).timestamp()
+                         for k in ('publishedAfter', 'publishedBefore'))
+        ids = ['v{:010d}'.format(i) for i, t in enumerate(published) if after <= t <= before]
+        start = int(params.get('pageToken', 0))
+        page = {'pageInfo' : {'totalResults' : len(ids)},
+                'items' : [{'id' : {'videoId' : video_id}} for video_id in ids[:cap][start:start + 50]]}
+        if start + 50 < min(len(ids), cap):
+            page['nextPageToken'] = str(start + 50)
+        return page
+    return fake_request, requested
+
+
+class TestSearchExhaustive(unittest.TestCase):
+
+    def setUp(self):
+        self.yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+        # 2000 videos a minute apart, and 100 published at the same second.
+        self.published = [start + 60 * i for i in range(2000)] + [start + 30] * 100
+        self.after = datetime.datetime(2020, 1, 1)
+        self.before = datetime.datetime(2020, 1, 3)
+
+    def test_search_exhaustive(self):
+        fake_request, requested = fake_search(self.published)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            videos = self.yt.search_exhaustive('boat', published_after=self.after,
+                                               published_before=self.before,
+                                               parser=None, max_workers=4)
+        video_ids = [video['id']['videoId'] for video in videos]
+        self.assertEqual(len(video_ids), len(set(video_ids)))
+        self.assertEqual(set(video_ids), {'v{:010d}'.format(i) for i in range(2100)})
+
+        # a plain search stops at the cap.
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            videos = self.yt.search('boat', published_after=self.after,
+                                    published_before=self.before, max_results=None, parser=None)
+        self.assertEqual(len(videos), 500)
+
+    def test_max_results(self):
+        fake_request, requested = fake_search(self.published)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            videos = self.yt.search_exhaustive('boat', max_results=120, parser=P.raw_json,
+                                               published_after=self.after,
+                                               published_before=self.before)
+        self.assertEqual(len(videos), 120)
+
+    def test_fields(self):
+        @P._reads('snippet/title')
+        def parse_title(item):
+            return item['id']['videoId']
+
+        fake_request, requested = fake_search(self.published[:10])
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            video_ids = self.yt.search_exhaustive('boat', parser=parse_title,
+                                                  published_after=self.after,
+                                                  published_before=self.before)
+        self.assertEqual(len(video_ids), 10)
+        # the ID and total results are requested even though the parser doesn't read them.
+        fields = dict(parse_qsl(urlparse(requested[0]).query))['fields']
+        self.assertEqual(fields, 'nextPageToken,etag,pageInfo/totalResults,items(snippet/title,id)')
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'checkpoints.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume(self):
+        pages = [[{'id' : '{}-{}'.format(i, j)} for j in range(50)] for i in range(4)]
+        fake_request, requested = fake_pages(pages)
+        def crash_on_page_2(http_endpoint):
+            if http_endpoint.endswith('&pageToken=2'):
+                raise Exception('crash')
+            return fake_request(http_endpoint)
+
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False,
+                            checkpoint_store=SQLiteCheckpointStore(self.path))
+        videos = []
+        with patch.object(yt, '_http_request', side_effect=crash_on_page_2):
+            with self.assertRaisesRegex(Exception, 'crash'):
+                for video in yt.get_videos_from_playlist_id_gen('UU_x5XG1OV2P6uZZ5FSM9Ttw',
+                                                                parser=None, max_results=180):
+                    videos.append(video)
+        self.assertEqual(len(videos), 100)
+
+        # a new process with the same arguments continues from page 2.
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False,
+                            checkpoint_store=SQLiteCheckpointStore(self.path))
+        requested.clear()
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            videos += yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw',
+                                                     parser=None, max_results=180)
+        self.assertEqual(len(requested), 2)
+        self.assertTrue(requested[0].endswith('&pageToken=2'))
+        self.assertEqual(videos, [item for page in pages for item in page][:180])
+
+        # the finished call removed its checkpoint.
+        requested.clear()
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None, max_results=180)
+        self.assertNotIn('pageToken', requested[0])
+
+    def test_explicit_token(self):
+        pages = [[{'id' : '{}-{}'.format(i, j)} for j in range(50)] for i in range(4)]
+        fake_request, requested = fake_pages(pages)
+        store = SQLiteCheckpointStore(self.path)
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, checkpoint_store=store)
+        endpoint = ('https://www.googleapis.com/youtube/v3/playlistItems'
+                    '?part=snippet&playlistId=UU_x5XG1OV2P6uZZ5FSM9Ttw&maxResults=50')
+        store.set('get_videos_from_playlist_id', endpoint, '3', 150)
+        # a token passed by the caller wins over the saved one.
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', next_page_token='1', parser=None)
+        self.assertTrue(requested[0].endswith('&pageToken=1'))
+        self.assertEqual(videos, [item for page in pages[1:] for item in page])
+
+    def test_store(self):
+        store = SQLiteCheckpointStore(self.path)
+        endpoint = 'https://www.googleapis.com/youtube/v3/search?part=snippet&q=boat'
+        self.assertIsNone(store.get('search', endpoint))
+        store.set('search', endpoint + '&key=xxx', 'CDIQAA', 50)
+        self.assertEqual(store.get('search', endpoint), ('CDIQAA', 50))
+        self.assertIsNone(store.get('get_video_comments', endpoint))
+        store.delete('search', endpoint)
+        self.assertIsNone(store.get('search', endpoint))
+
+
+def uploads(n_videos):
+    '''Returns the items of an uploads playlist of ``n_videos`` videos a day apart, newest first.'''
+    start = datetime.datetime(2020, 1, 1)
+    return [{'snippet' : {'publishedAt' : (start + datetime.timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                          'resourceId' : {'videoId' : 'v{:010d}'.format(i)}}}
+            for i in reversed(range(n_videos))]
+
+
+class TestWatermark(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'watermarks.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def video_ids(self, videos):
+        return [video['snippet']['resourceId']['videoId'] for video in videos]
+
+    def test_since(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        items = uploads(500)
+        fake_request, requested = fake_pages([items[i:i + 50] for i in range(0, 500, 50)])
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            by_date = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None,
+                                                     since=datetime.datetime(2021, 4, 1))
+            self.assertEqual(len(requested), 1)
+            by_id = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None,
+                                                   since={'v0000000490', 'v0000000100'})
+        self.assertEqual(self.video_ids(by_date), ['v{:010d}'.format(i) for i in range(499, 456, -1)])
+        self.assertEqual(self.video_ids(by_id), ['v{:010d}'.format(i) for i in range(499, 490, -1)])
+        self.assertEqual(len(requested), 2)
+
+    def test_store(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False,
+                            watermark_store=SQLiteWatermarkStore(self.path))
+        items = uploads(1000)
+        fake_request, requested = fake_pages([items[i:i + 50] for i in range(100, 1000, 50)])
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+        self.assertEqual(len(videos), 900)
+        self.assertEqual(len(requested), 18)
+
+        # 100 new uploads since, the next walk requests 3 pages instead of 20.
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False,
+                            watermark_store=SQLiteWatermarkStore(self.path))
+        fake_request, requested = fake_pages([items[i:i + 50] for i in range(0, 1000, 50)])
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+            self.assertEqual(self.video_ids(videos), self.video_ids(items[:100]))
+            self.assertEqual(len(requested), 3)
+            self.assertEqual(yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw'), [])
+        self.assertEqual(len(requested), 4)
+        # the mark is the newest video, and the IDs of the newest page.
+        published_at, video_ids = yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw')
+        self.assertEqual(published_at, P.parse_video_url(items[0])['publish_date'])
+        self.assertEqual(video_ids, set(self.video_ids(items[:50])))
+
+    def test_store_max_results(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False,
+                            watermark_store=SQLiteWatermarkStore(self.path))
+        items = uploads(200)
+        fake_request, requested = fake_pages([items[i:i + 50] for i in range(0, 200, 50)])
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None, max_results=20)
+            self.assertEqual(len(videos), 20)
+            # a walk that stopped early saw the newest videos, so the next one has none to collect.
+            self.assertEqual(yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None), [])
+        self.assertEqual(len(requested), 2)
+        self.assertEqual(yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw')[1], set(self.video_ids(items[:20])))
+
+    def test_store_resumed(self):
+        items = uploads(200)
+        pages = [items[i:i + 50] for i in range(0, 200, 50)]
+        checkpoints = SQLiteCheckpointStore(os.path.join(self.directory.name, 'checkpoints.sqlite'))
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, checkpoint_store=checkpoints,
+                            watermark_store=SQLiteWatermarkStore(self.path))
+        fake_request, requested = fake_pages(pages)
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            # a walk from a page token doesn't see the newest videos.
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', next_page_token='2', parser=None)
+            self.assertEqual(len(videos), 100)
+            self.assertIsNone(yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw'))
+
+            # neither does a walk resumed from a checkpoint.
+            gen = yt.get_videos_from_playlist_id_gen('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+            for _ in range(60):
+                next(gen)
+            gen.close()
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+            self.assertEqual(self.video_ids(videos), self.video_ids(items[50:]))
+            self.assertIsNone(yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw'))
+
+            videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+        self.assertEqual(len(videos), 200)
+        self.assertEqual(yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw')[1], set(self.video_ids(items[:50])))
+
+    def test_since_publish_date(self):
+        if not hasattr(time, 'tzset'):
+            self.skipTest('requires time.tzset')
+        tz = os.environ.get('TZ')
+        try:
+            os.environ['TZ'] = 'America/New_York'
+            time.tzset()
+            yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+            # uploads an hour apart, closer than the offset of the time zone.
+            start = datetime.datetime(2020, 6, 1)
+            items = [{'snippet' : {'publishedAt' : (start + datetime.timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                   'resourceId' : {'videoId' : 'v{:010d}'.format(i)}}}
+                     for i in reversed(range(100))]
+            fake_request, requested = fake_pages([items[i:i + 50] for i in range(0, 100, 50)])
+            with patch.object(yt, '_http_request', side_effect=fake_request):
+                videos = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw')
+                # the mark of the older videos, by their parsed publish_date or an aware datetime.
+                by_publish_date = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None,
+                    since=max(video['publish_date'] for video in videos[9:]))
+                by_datetime = yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None,
+                    since=datetime.datetime(2020, 6, 4, 22, 30, tzinfo=datetime.timezone(-datetime.timedelta(hours=4))))
+        finally:
+            if tz is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = tz
+            time.tzset()
+        self.assertEqual(self.video_ids(by_publish_date), [video['video_id'] for video in videos[:9]])
+        self.assertEqual(self.video_ids(by_datetime), ['v0000000099'])
+
+
+class TestAsyncPagination(unittest.IsolatedAsyncioTestCase):
+
+    async def test_gen(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        fake_request, requested = fake_pages([[{'id' : 'a'}], [], [{'id' : 'b'}]])
+        async def fake_async_request(http_endpoint):
+            return fake_request(http_endpoint)
+
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            items = [item async for item in yt.get_playlists_gen('UC_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)]
+            videos = await yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+        self.assertEqual(items, [{'id' : 'a'}, {'id' : 'b'}])
+        # playlist items stop at the first empty page, like before.
+        self.assertEqual(videos, [{'id' : 'a'}])
+
+    async def test_watermark_from_start(self):
+        with tempfile.TemporaryDirectory() as directory:
+            yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False,
+                                     watermark_store=SQLiteWatermarkStore(os.path.join(directory, 'watermarks.sqlite')))
+            items = uploads(100)
+            fake_request, requested = fake_pages([items[:50], items[50:]])
+            async def fake_async_request(http_endpoint):
+                return fake_request(http_endpoint)
+
+            with patch.object(yt, '_http_request', side_effect=fake_async_request):
+                videos = await yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw', next_page_token='1')
+                self.assertEqual(len(videos), 50)
+                self.assertIsNone(yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw'))
+                videos = await yt.get_videos_from_playlist_id('UU_x5XG1OV2P6uZZ5FSM9Ttw')
+            self.assertEqual(len(videos), 100)
+            self.assertEqual(yt.watermark_store.get('UU_x5XG1OV2P6uZZ5FSM9Ttw'),
+                             (P.parse_video_url(items[0])['publish_date'],
+                              {item['snippet']['resourceId']['videoId'] for item in items[:50]}))
+            yt.watermark_store.close()
+
+    async def test_prefetch(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False, prefetch=True)
+        fake_request, requested = fake_pages([[{'id' : 'a'}], [{'id' : 'b'}], [{'id' : 'c'}]])
+        async def fake_async_request(http_endpoint):
+            return fake_request(http_endpoint)
+
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            gen = yt.get_playlists_gen('UC_x5XG1OV2P6uZZ5FSM9Ttw', parser=None)
+            self.assertEqual(await gen.__anext__(), {'id' : 'a'})
+            await asyncio.sleep(0)
+            self.assertEqual(len(requested), 2)
+            self.assertEqual([item async for item in gen], [{'id' : 'b'}, {'id' : 'c'}])
+        self.assertEqual(len(requested), 3)
+
+    async def test_video_comments_gen(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        thread = {'id' : 'a', 'snippet' : {'totalReplyCount' : 2},
+                  'replies' : {'comments' : [{'id' : 'a.0'}]}}
+        async def fake_async_request(http_endpoint):
+            if '/comments?' in http_endpoint:
+                return {'items' : [{'id' : 'a.0'}, {'id' : 'a.1'}]}
+            return {'items' : [thread, {'id' : 'b', 'snippet' : {'totalReplyCount' : 0}}]}
+
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            comments = await yt.get_video_comments('eqwPlwHSL_M', parser=None)
+        self.assertEqual([c['id'] for c in comments], ['a', 'a.0', 'a.1', 'b'])
+
+    async def test_search_exhaustive(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+        fake_request, requested = fake_search([start + 60 * i for i in range(1200)])
+        async def fake_async_request(http_endpoint):
+            return fake_request(http_endpoint)
+
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            videos = await yt.search_exhaustive('boat', parser=None,
+                                                published_after=datetime.datetime(2020, 1, 1),
+                                                published_before=datetime.datetime(2020, 1, 2))
+        self.assertEqual(len({video['id']['videoId'] for video in videos}), 1200)
+        self.assertEqual(len(videos), 1200)
+
+if __name__ == '__main__':
+    unittest.main()
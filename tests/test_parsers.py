@@ -6,6 +6,24 @@ import json
 import datetime
 
 from youtube_api import parsers as P
+from youtube_api.youtube_api_utils import _fields_mask
+
+def prune(item, paths):
+    '''Keeps only ``paths`` of ``item``, like the API does for a ``fields`` mask.'''
+    pruned = {}
+    for path in paths:
+        names = path.split('/')
+        value = item
+        for name in names:
+            if not isinstance(value, dict) or name not in value:
+                break
+            value = value[name]
+        else:
+            node = pruned
+            for name in names[:-1]:
+                node = node.setdefault(name, {})
+            node[names[-1]] = value
+    return pruned
 
 class TestParsers(unittest.TestCase):
 
@@ -161,5 +179,61 @@ class TestParsers(unittest.TestCase):
         self.assertIsNone(metadata['video_category'])
         self.assertEqual(metadata['video_thumbnail'], "https://i.ytimg.com/vi/w-HYZv6HzAs/hqdefault.jpg")
 
+    def test_fields(self):
+        self.assertEqual(_fields_mask(P.parse_video_url.fields[None]),
+                         'snippet(publishedAt,resourceId/videoId,channelId)')
+        cases = [(P.parse_video_metadata, self.video_metadata, None),
+                 (P.parse_channel_metadata, self.channel_metadata, None),
+                 (P.parse_featured_channels, self.channel_metadata, None),
+                 (P.parse_subscription_descriptive, self.subscription, None),
+                 (P.parse_playlist_metadata, self.playlist, None),
+                 (P.parse_comment_metadata, self.comment, 'comments'),
+                 (P.parse_rec_video_metadata, self.rec, None)]
+        for parser, response, resource in cases:
+            item = response['items'][0]
+            pruned = prune(item, parser.fields[resource])
+            metadata = parser(item)
+            pruned_metadata = parser(pruned)
+            metadata.pop('collection_date', None)
+            pruned_metadata.pop('collection_date', None)
+            self.assertEqual(metadata, pruned_metadata, parser.__name__)
+            self.assertLess(len(json.dumps(pruned)), len(json.dumps(item)))
+
+    def test_parse_context(self):
+        item = self.video_metadata['items'][0]
+        date = datetime.datetime(2020, 1, 1)
+        with P.parse_context(date):
+            self.assertEqual(P.parse_video_metadata(item)['collection_date'], date)
+            self.assertEqual(P.collection_date(), date)
+            with P.parse_context():
+                self.assertGreater(P.collection_date(), date)
+            self.assertEqual(P.raw_json_with_datetime({})['collection_date'], '2020-01-01')
+        self.assertGreater(P.parse_video_metadata(item)['collection_date'], date)
+
+        parse = P._page_parser(P.parse_video_metadata)
+        dates = {parse(item)['collection_date'] for _ in range(3)}
+        self.assertEqual(len(dates), 1)
+        self.assertIsNone(P._COLLECTION_DATE.get())
+
+    def test_as_records(self):
+        parser = P.as_records(P.parse_video_metadata)
+        self.assertIs(parser.fields, P.parse_video_metadata.fields)
+        with P.parse_context():
+            record = parser(self.video_metadata['items'][0])
+            metadata = P.parse_video_metadata(self.video_metadata['items'][0])
+        self.assertIsInstance(record, P.VideoRecord)
+        self.assertEqual(record._asdict(), metadata)
+        self.assertIsNone(parser(None))
+
+        # equal strings decoded from different responses share one copy.
+        pool = dict()
+        parser = P.as_records(P.parse_comment_metadata, pool=pool)
+        comments = [parser(json.loads(json.dumps(self.comment['items'][0]))) for _ in range(2)]
+        self.assertIs(comments[0].commenter_channel_id, comments[1].commenter_channel_id)
+        self.assertIsNot(comments[0].text, comments[1].text)
+        self.assertIn(comments[0].commenter_channel_id, pool)
+        with self.assertRaises(ValueError):
+            P.as_records(P.parse_featured_channels)
+
 if __name__ == '__main__':
     unittest.main()
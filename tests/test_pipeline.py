@@ -0,0 +1,139 @@
+import sys
+sys.path.append('../')
+import json
+import threading
+import unittest
+import requests
+import aiohttp
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qsl
+
+from youtube_api import YouTubeDataAPI, AsyncYouTubeDataAPI
+from youtube_api.pipeline import ChannelVideoPipeline, AsyncChannelVideoPipeline
+
+def playlist_not_found():
+    response = requests.models.Response()
+    response.status_code = 404
+    response._content = json.dumps({'error' : {'code' : 404, 'errors' : [{'reason' : 'playlistNotFound'}]}}).encode('utf-8')
+    return requests.HTTPError(response=response)
+
+def async_playlist_not_found():
+    return aiohttp.ClientResponseError(None, (), status=404, message='playlistNotFound')
+
+def fake_api(n_videos, not_found=playlist_not_found):
+    '''
+    Returns a fake ``_http_request`` where each channel uploaded ``n_videos[channel_id]`` videos,
+    and the requested endpoints. The uploads playlist of "UCgone" raises ``not_found()``.
+    '''
+    requested = []
+    lock = threading.Lock()
+    def fake_request(http_endpoint):
+        with lock:
+            requested.append(http_endpoint)
+        params = dict(parse_qsl(urlparse(http_endpoint).query))
+        if '/videos?' in http_endpoint:
+            return {'items' : [{'id' : video_id} for video_id in params['id'].split(',')]}
+        if params['playlistId'] == 'UUfail':
+            raise Exception('playlist failed')
+        if params['playlistId'] == 'UUgone':
+            raise not_found()
+        channel_id = 'UC' + params['playlistId'][2:]
+        start = int(params.get('pageToken', 0))
+        video_ids = ['{}-{}'.format(channel_id, i) for i in range(n_videos[channel_id])]
+        page = {'items' : [{'snippet' : {'resourceId' : {'videoId' : video_id}}}
+                           for video_id in video_ids[start:start + 50]]}
+        if start + 50 < len(video_ids):
+            page['nextPageToken'] = str(start + 50)
+        return page
+    return fake_request, requested
+
+
+class TestChannelVideoPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        self.n_videos = {'UC{}'.format(i) : 30 * i for i in range(10)}
+
+    def test_run(self):
+        fake_request, requested = fake_api(self.n_videos)
+        pipeline = ChannelVideoPipeline(self.yt, playlist_workers=3, metadata_workers=2,
+                                        queue_size=20, parser=None)
+        videos = []
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            n = pipeline.run(iter(self.n_videos), videos.append)
+
+        expected = {'{}-{}'.format(channel_id, i)
+                    for channel_id, n_videos in self.n_videos.items() for i in range(n_videos)}
+        self.assertEqual(n, len(expected))
+        self.assertEqual({video['id'] for video in videos}, expected)
+        # full batches of 50 IDs, except the last one.
+        batches = [r for r in requested if '/videos?' in r]
+        self.assertEqual(len(batches), -(-len(expected) // 50))
+        self.assertTrue(all('part=statistics,snippet&' in r for r in batches))
+
+    def test_max_videos(self):
+        fake_request, requested = fake_api(self.n_videos)
+        pipeline = ChannelVideoPipeline(self.yt, max_videos=10, parser=None)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            videos = list(pipeline.stream(['UC3', 'UC5']))
+        self.assertEqual(len(videos), 20)
+
+    def test_failure(self):
+        fake_request, requested = fake_api(self.n_videos)
+        pipeline = ChannelVideoPipeline(self.yt, queue_size=5, parser=None)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            with self.assertRaisesRegex(Exception, 'playlist failed'):
+                list(pipeline.stream(['UC9', 'UCfail', 'UC8']))
+
+    def test_playlist_not_found(self):
+        fake_request, requested = fake_api(self.n_videos)
+        pipeline = ChannelVideoPipeline(self.yt, playlist_workers=2, queue_size=5, parser=None)
+        with patch.object(self.yt, '_http_request', side_effect=fake_request):
+            videos = list(pipeline.stream(['UC3', 'UCgone', 'UC2']))
+        self.assertEqual(len(videos), 150)
+
+    def test_batch_size(self):
+        with self.assertRaises(ValueError):
+            ChannelVideoPipeline(self.yt, batch_size=51)
+
+
+class TestAsyncChannelVideoPipeline(unittest.IsolatedAsyncioTestCase):
+
+    async def test_run(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        n_videos = {'UC{}'.format(i) : 40 * i for i in range(5)}
+        fake_request, requested = fake_api(n_videos)
+        async def fake_async_request(http_endpoint):
+            return fake_request(http_endpoint)
+
+        async def channel_ids():
+            for channel_id in n_videos:
+                yield channel_id
+
+        videos = []
+        async def sink(video):
+            videos.append(video)
+
+        pipeline = AsyncChannelVideoPipeline(yt, playlist_workers=2, queue_size=10, parser=None)
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            n = await pipeline.run(channel_ids(), sink)
+        self.assertEqual(n, 400)
+        self.assertEqual(len({video['id'] for video in videos}), 400)
+
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            with self.assertRaisesRegex(Exception, 'playlist failed'):
+                await pipeline.run(['UCfail'], videos.append)
+
+    async def test_playlist_not_found(self):
+        yt = AsyncYouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        fake_request, requested = fake_api({'UC1' : 40, 'UC2' : 80}, not_found=async_playlist_not_found)
+        async def fake_async_request(http_endpoint):
+            return fake_request(http_endpoint)
+
+        pipeline = AsyncChannelVideoPipeline(yt, playlist_workers=2, queue_size=10, parser=None)
+        with patch.object(yt, '_http_request', side_effect=fake_async_request):
+            videos = [video async for video in pipeline.stream(['UC1', 'UCgone', 'UC2'])]
+        self.assertEqual(len(videos), 120)
+
+if __name__ == '__main__':
+    unittest.main()
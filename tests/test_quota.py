@@ -0,0 +1,116 @@
+import os
+import sys
+sys.path.append('../')
+import json
+import datetime
+import unittest
+import requests
+from unittest.mock import patch
+
+from youtube_api import YouTubeDataAPI
+from youtube_api.quota import KeyPool, QuotaExceededError, QuotaPlan, next_quota_reset
+
+def make_response(status_code, body):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode('utf-8')
+    return response
+
+class TestKeyPool(unittest.TestCase):
+
+    def test_spread_across_keys(self):
+        pool = KeyPool(['key1', 'key2', 'key3'])
+        keys = [pool.acquire() for _ in range(6)]
+        self.assertEqual(sorted(keys), ['key1', 'key1', 'key2', 'key2', 'key3', 'key3'])
+        pool.acquire(100)
+        self.assertEqual(sum(pool.usage.values()), 106)
+        self.assertEqual(max(pool.usage.values()), 102)
+
+    def test_daily_quota(self):
+        pool = KeyPool(['key1', 'key2'], daily_quota=150)
+        self.assertEqual(pool.acquire(100), 'key1')
+        self.assertEqual(pool.acquire(100), 'key2')
+        with self.assertRaises(QuotaExceededError):
+            pool.acquire(100)
+        self.assertIn(pool.acquire(1), ['key1', 'key2'])
+
+    def test_next_quota_reset(self):
+        now = datetime.datetime(2020, 3, 5, 23, 30, tzinfo=datetime.timezone.utc)
+        reset = next_quota_reset(now)
+        self.assertEqual(reset.date(), datetime.date(2020, 3, 6))
+        self.assertEqual((reset.hour, reset.minute), (0, 0))
+        self.assertGreater(reset, now)
+
+        # midnight Pacific daylight time, 07:00 UTC.
+        now = datetime.datetime(2020, 7, 5, 8, 30, tzinfo=datetime.timezone.utc)
+        reset = next_quota_reset(now)
+        self.assertEqual(reset, datetime.datetime(2020, 7, 6, 7, tzinfo=datetime.timezone.utc))
+        self.assertEqual(reset.utcoffset(), datetime.timedelta(hours=-7))
+
+    def test_rotate_on_quota_exceeded(self):
+        yt = YouTubeDataAPI(['key1', 'key2'], verify_api_key=False)
+        quota_exceeded = make_response(403, {'error' : {'errors' : [{'reason' : 'quotaExceeded'}]}})
+        responses = [quota_exceeded, make_response(200, {'items' : []}), make_response(200, {'items' : []})]
+        with patch.object(yt.session, 'get', side_effect=responses) as mock_get:
+            yt.get_channel_id_from_user('LastWeekTonight')
+            yt.get_channel_id_from_user('LastWeekTonight')
+        urls = [c[0][0] for c in mock_get.call_args_list]
+        self.assertTrue(urls[0].endswith('key=key1'))
+        self.assertTrue(urls[1].endswith('key=key2'))
+        self.assertTrue(urls[2].endswith('key=key2'))
+        self.assertEqual(yt.key_pool.available(), ['key2'])
+
+
+class TestQuotaLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+
+    def test_plan(self):
+        video_ids = ['kNbhUWLH_yY'] * 120
+        self.assertEqual(self.yt.plan(self.yt.get_video_metadata, video_ids), QuotaPlan(3, 3))
+        self.assertEqual(self.yt.plan('get_video_metadata', 'kNbhUWLH_yY'), QuotaPlan(1, 1))
+        self.assertEqual(self.yt.plan(self.yt.search, 'John Oliver', max_results=120), QuotaPlan(3, 300))
+        self.assertEqual(self.yt.plan(self.yt.get_videos_from_playlist_id, 'UU3XTzVzaHQEd30rQbuvCtTQ',
+                                      n_items=1001), QuotaPlan(21, 21))
+        plan = (self.yt.plan(self.yt.get_video_comments, 'eqwPlwHSL_M', n_items=250, n_replies=10)
+                + self.yt.plan(self.yt.get_playlists, 'UC3XTzVzaHQEd30rQbuvCtTQ'))
+        self.assertEqual(plan, QuotaPlan(14, 14))
+        # 4 windows of 9 pages, and the first pages of the 3 windows that were split.
+        self.assertEqual(self.yt.plan(self.yt.search_exhaustive, 'John Oliver', n_items=1800),
+                         QuotaPlan(39, 3900))
+
+    def test_ledger(self):
+        def fake_get(http_endpoint, **kwargs):
+            return make_response(200, {'items' : []})
+
+        with patch.object(self.yt.session, 'get', side_effect=fake_get):
+            self.yt.get_video_metadata(['kNbhUWLH_yY'] * 120, max_workers=2)
+            self.yt.search('John Oliver')
+
+        self.assertEqual(self.yt.quota_ledger.units['get_video_metadata'], 3)
+        self.assertEqual(self.yt.quota_ledger.requests['get_video_metadata'], 3)
+        self.assertEqual(self.yt.quota_ledger.units['search'], 100)
+        self.assertEqual(self.yt.quota_ledger.resource_units['videos'], 3)
+        self.assertEqual(self.yt.quota_ledger.total, 103)
+        self.assertEqual(self.yt.key_pool.remaining(), 10000 - 103)
+
+    @patch('time.sleep')
+    def test_ledger_prefetch(self, mock_sleep):
+        # prefetched pages are requested from another thread, and still charged to the method.
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, prefetch=True)
+        def fake_get(http_endpoint, **kwargs):
+            items = [{'id' : {'videoId' : 'kNbhUWLH_yY'}}] * 50
+            if 'pageToken' in http_endpoint:
+                return make_response(200, {'items' : items})
+            return make_response(200, {'items' : items, 'nextPageToken' : 'CDIQAA'})
+
+        with patch.object(yt.session, 'get', side_effect=fake_get):
+            videos = yt.search('John Oliver', max_results=100, parser=None)
+
+        self.assertEqual(len(videos), 100)
+        self.assertEqual(yt.quota_ledger.units['search'], 200)
+        self.assertEqual(yt.quota_ledger.total, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+sys.path.append('../')
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from youtube_api import YouTubeDataAPI
+from youtube_api.rate_limit import RateLimiter, FileRateLimiter
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_token_bucket(self):
+        limiter = RateLimiter(rate=10, burst=3)
+        self.assertEqual([limiter.try_acquire('key1', 'videos') for _ in range(3)], [0, 0, 0])
+        self.assertGreater(limiter.try_acquire('key1', 'videos'), 0)
+        # other keys and resources have their own buckets
+        self.assertEqual(limiter.try_acquire('key2', 'videos'), 0)
+        self.assertEqual(limiter.try_acquire('key1', 'search'), 0)
+
+    def test_resource_rates(self):
+        limiter = RateLimiter(rate=10, rates={'search' : 1})
+        self.assertEqual(limiter.try_acquire('key1', 'search'), 0)
+        self.assertAlmostEqual(limiter.try_acquire('key1', 'search'), 1, places=1)
+
+    def test_threads(self):
+        limiter = RateLimiter(rate=100, burst=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire, args=('key1', 'videos'))
+                   for _ in range(11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, .09)
+
+    def test_file_rate_limiter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # two limiters on one directory act like two worker processes.
+            limiter1 = FileRateLimiter(directory, rate=1, burst=2)
+            limiter2 = FileRateLimiter(directory, rate=1, burst=2)
+            self.assertEqual(limiter1.try_acquire('key1', 'videos'), 0)
+            self.assertEqual(limiter2.try_acquire('key1', 'videos'), 0)
+            self.assertGreater(limiter1.try_acquire('key1', 'videos'), 0)
+            self.assertGreater(limiter2.try_acquire('key1', 'videos'), 0)
+            for name in os.listdir(directory):
+                self.assertNotIn('key1', name)
+
+    def test_client_rate_limiter(self):
+        limiter = RateLimiter(rate=10)
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False, rate_limiter=limiter)
+        with patch.object(limiter, 'acquire') as mock_acquire, \
+             patch.object(yt.session, 'get', side_effect=Exception('sent')):
+            with self.assertRaisesRegex(Exception, 'sent'):
+                yt.get_video_metadata('kNbhUWLH_yY')
+        mock_acquire.assert_called_once_with('xxxxxxxxx', 'videos')
+
+if __name__ == '__main__':
+    unittest.main()
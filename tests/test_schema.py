@@ -0,0 +1,128 @@
+import os
+import sys
+sys.path.append('../')
+import json
+import unittest
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qsl
+
+from youtube_api import YouTubeDataAPI
+import youtube_api.parsers as P
+from youtube_api.schema import Schema, Field, get_schema, register_schema, schema_names, _SCHEMAS
+from youtube_api.youtube_api_utils import parse_yt_duration
+
+class TestSchema(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dirname = os.path.dirname(__file__)
+        with open(os.path.join(dirname, 'data', 'video_metadata.json')) as f:
+            cls.video = json.load(f)['items'][0]
+        with open(os.path.join(dirname, 'data', 'comment_meta.json')) as f:
+            cls.comment = json.load(f)['items'][0]
+        with open(os.path.join(dirname, 'data', 'recommendation.json')) as f:
+            cls.rec = json.load(f)['items'][0]
+
+    def test_matches_parsers(self):
+        cases = [('video', P.parse_video_metadata, self.video),
+                 ('comment', P.parse_comment_metadata, self.comment),
+                 ('search', P.parse_rec_video_metadata, self.rec)]
+        for name, parser, item in cases:
+            with P.parse_context():
+                row = get_schema(name)(item)
+                expected = parser(item)
+            for column, value in row.items():
+                if column in expected and not column.endswith('_count') and column != 'video_tags':
+                    self.assertEqual(value, expected[column], (name, column))
+        row = get_schema('video')(self.video)
+        self.assertEqual(row['video_view_count'], int(self.video['statistics']['viewCount']))
+
+    def test_select(self):
+        schema = get_schema('video', ['video_id', 'video_view_count'])
+        self.assertEqual(schema(self.video), {'video_id' : self.video['id'],
+                                              'video_view_count' : int(self.video['statistics']['viewCount'])})
+        self.assertEqual(schema.fields, {None : ['id', 'statistics/viewCount']})
+        with self.assertRaises(ValueError):
+            get_schema('video').select('video_duration')
+        with self.assertRaises(ValueError):
+            get_schema('videos')
+
+    def test_missing(self):
+        schema = get_schema('video')
+        row = schema({'id' : 'a', 'snippet' : None, 'statistics' : {'viewCount' : '3'}})
+        self.assertEqual(row['video_view_count'], 3)
+        self.assertIsNone(row['video_thumbnail'])
+        # an unexpected shape along a path is read one path at a time.
+        row = schema({'id' : 'a', 'snippet' : {'thumbnails' : ['high']}})
+        self.assertIsNone(row['video_thumbnail'])
+        self.assertEqual(schema(None), {})
+
+    def test_content_details(self):
+        self.assertEqual(parse_yt_duration('PT1H2M3S'), 3723)
+        self.assertEqual(parse_yt_duration('P1DT1S'), 86401)
+        self.assertIsNone(parse_yt_duration('1:02:03'))
+
+        schema = (get_schema('video', ['video_id', 'video_title']) +
+                  get_schema('video_live_streaming', ['live_concurrent_viewers']) +
+                  get_schema('video_content_details', ['video_duration']))
+        item = {'id' : 'a', 'snippet' : {'title' : 't'}, 'contentDetails' : {'duration' : 'PT4M13S'},
+                'liveStreamingDetails' : {'concurrentViewers' : '12'}}
+        self.assertEqual(schema(item), {'video_id' : 'a', 'video_title' : 't', 'live_concurrent_viewers' : 12,
+                                        'video_duration' : 253})
+        self.assertEqual(schema.fields[None], ['id', 'snippet/title', 'liveStreamingDetails/concurrentViewers',
+                                               'contentDetails/duration'])
+        with self.assertRaises(ValueError):
+            schema + get_schema('comment')
+
+    def test_register(self):
+        try:
+            schema = register_schema('video_topics', {'video_id' : 'id',
+                                                      'topics' : Field('topicDetails/topicCategories', len)})
+            self.assertIn('video_topics', schema_names())
+            self.assertIs(get_schema('video_topics'), schema)
+            self.assertEqual(schema({'id' : 'a', 'topicDetails' : {'topicCategories' : ['x', 'y']}}),
+                             {'video_id' : 'a', 'topics' : 2})
+        finally:
+            _SCHEMAS.pop('video_topics', None)
+
+    def test_records(self):
+        schema = get_schema('comment').records('Comment', intern=['commenter_channel_id'])
+        comments = [schema(json.loads(json.dumps(self.comment))) for _ in range(2)]
+        self.assertEqual(type(comments[0]).__name__, 'Comment')
+        self.assertEqual(comments[0]._fields, tuple(get_schema('comment').columns))
+        self.assertIs(comments[0].commenter_channel_id, comments[1].commenter_channel_id)
+        self.assertIsNot(comments[0].text, comments[1].text)
+        self.assertEqual(comments[0].comment_id, get_schema('comment')(self.comment)['comment_id'])
+        self.assertIsNone(schema(None))
+
+        selected = schema.select('comment_id', 'commenter_channel_id')
+        self.assertEqual(selected.record._fields, ('comment_id', 'commenter_channel_id'))
+        self.assertIs(selected.pool, schema.pool)
+        self.assertIs(selected(self.comment).commenter_channel_id, comments[0].commenter_channel_id)
+        # the slow path of unexpected shapes returns records too.
+        self.assertEqual(schema({'id' : 'a', 'snippet' : {'authorChannelId' : ['x']}}).comment_id, 'a')
+        with self.assertRaises(ValueError):
+            get_schema('comment').records(intern=['channel_id'])
+
+    def test_client_fields(self):
+        yt = YouTubeDataAPI('xxxxxxxxx', verify_api_key=False)
+        schema = get_schema('comment', ['comment_id', 'comment_like_count', 'reply_count'])
+        requested = []
+        def fake_request(http_endpoint):
+            requested.append(dict(parse_qsl(urlparse(http_endpoint).query)))
+            if '/comments?' in http_endpoint:
+                return {'items' : [{'id' : 't.1', 'snippet' : {'likeCount' : 1}}]}
+            return {'items' : [{'id' : 't', 'snippet' : {'totalReplyCount' : 6,
+                                                         'topLevelComment' : {'id' : 't', 'snippet' : {'likeCount' : 2}}}}]}
+
+        with patch.object(yt, '_http_request', side_effect=fake_request):
+            comments = yt.get_video_comments('v', parser=schema)
+        self.assertEqual(comments, [{'comment_id' : 't', 'comment_like_count' : 2, 'reply_count' : 6},
+                                    {'comment_id' : 't.1', 'comment_like_count' : 1, 'reply_count' : None}])
+        self.assertEqual(requested[0]['fields'],
+                         'nextPageToken,etag,items(id,snippet(totalReplyCount,topLevelComment(id,snippet/likeCount)),'
+                         'replies/comments(id,snippet/likeCount))')
+        self.assertEqual(requested[1]['fields'], 'nextPageToken,etag,items(id,snippet/likeCount)')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import sys
 import os
 sys.path.append('../')
 import unittest
+import time
 import requests
 import datetime
 
@@ -41,6 +42,54 @@ class TestVideo(unittest.TestCase):
         ''' #Verified by Megan Brown on 11/30/2018'''
         resp = utils.parse_yt_datetime(self.date)
         self.assertEqual(resp, self.datetime_date)
-        
+
+
+class TestParseDatetime(unittest.TestCase):
+
+    def setUp(self):
+        self.dates = ['2018-03-14T20:53:14.000Z', '2018-03-14T20:53:14Z', '2018-03-14T20:53:14.123456Z',
+                      '2006-11-05T01:30:00Z', '2024-07-01T12:00:00.500Z']
+
+    def strptime(self, date_str):
+        for date_format in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"]:
+            try:
+                return datetime.datetime.strptime(date_str, date_format).timestamp()
+            except ValueError:
+                pass
+
+    def test_fast_path(self):
+        for date_str in self.dates + ['2018-03-14T20:53:14.5Z', '2018-3-14T20:53:14Z', 'not a date']:
+            self.assertEqual(utils.parse_yt_datetime(date_str), self.strptime(date_str))
+        self.assertIsNone(utils.parse_yt_datetime(None))
+        self.assertIsNone(utils.parse_yt_datetime(''))
+
+    def test_bulk(self):
+        expected = [self.strptime(date_str) for date_str in self.dates]
+        self.assertEqual(utils.parse_yt_datetimes(self.dates), expected)
+        self.assertEqual(utils.parse_yt_datetimes(iter(self.dates + [None, 'not a date'])),
+                         expected + [None, None])
+        self.assertEqual(utils.parse_yt_datetimes([]), [])
+
+    def test_bulk_time_zones(self):
+        if not hasattr(time, 'tzset'):
+            self.skipTest('requires time.tzset')
+        tz = os.environ.get('TZ')
+        try:
+            # no daylight saving time, a changed offset, and daylight saving time,
+            # with dates in the hours skipped and repeated when it starts and ends.
+            dates = self.dates + ['2018-03-11T02:30:00Z', '2018-11-04T01:30:00.250Z',
+                                  '2018-03-25T01:30:00Z', '2018-10-28T02:30:00Z']
+            for zone in ['UTC', 'Asia/Kolkata', 'Europe/Moscow', 'America/New_York', 'Europe/Berlin']:
+                os.environ['TZ'] = zone
+                time.tzset()
+                self.assertEqual(utils.parse_yt_datetimes(dates),
+                                 [self.strptime(date_str) for date_str in dates], zone)
+        finally:
+            if tz is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = tz
+            time.tzset()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
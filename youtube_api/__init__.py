@@ -1,4 +1,5 @@
 from youtube_api.youtube_api import YouTubeDataAPI
+from youtube_api.youtube_api_async import AsyncYouTubeDataAPI
 import youtube_api.parsers as P
 import youtube_api.youtube_api_utils as youtube_api_utils
 
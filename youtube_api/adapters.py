@@ -0,0 +1,68 @@
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+"""
+This script has transport adapters that can be mounted on the requests session of the YouTubeDataAPI class.
+"""
+
+__all__ = ['HTTP2Adapter']
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    A requests transport adapter that sends requests over HTTP/2 with ``httpx``.
+    Many requests to www.googleapis.com are multiplexed over a few connections,
+    so concurrent callers don't each pay for a TLS handshake.
+
+    Requires httpx with HTTP/2 support: ``pip install httpx[http2]``.
+
+    :param pool_connections: how many connections to keep alive.
+    :type pool_connections: int
+    :param pool_maxsize: the maximum number of connections.
+    :type pool_maxsize: int
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10):
+        if httpx is None:
+            raise ImportError('HTTP/2 support requires httpx, '
+                              'install it with `pip install httpx[http2]`.')
+        super().__init__()
+        limits = httpx.Limits(max_connections=pool_maxsize,
+                              max_keepalive_connections=pool_connections)
+        self.client = httpx.Client(http2=True, limits=limits)
+
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        '''
+        Sends a prepared request with httpx and returns it as a :class:`requests.Response`.
+        '''
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(None, connect=timeout[0], read=timeout[1])
+        try:
+            resp = self.client.request(request.method, request.url,
+                                       headers=dict(request.headers),
+                                       content=request.body,
+                                       timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response._content = resp.content
+        response.encoding = resp.encoding
+        response.reason = resp.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,289 @@
+import os
+import time
+import sqlite3
+import threading
+import collections
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+"""
+This script has the response caches of the YouTubeDataAPI clients.
+Responses are keyed on the endpoint with the API key removed, so every key shares the cache.
+"""
+
+__all__ = ['SQLiteCache',
+           'IDCache',
+           'ETagStore',
+           'normalize_endpoint',
+           'RESOURCE_TTLS',
+           'PART_TTLS']
+
+# How long, in seconds, to keep responses of each API resource.
+RESOURCE_TTLS = {
+    'search' : 60 * 60,
+    'commentThreads' : 60 * 60,
+    'comments' : 60 * 60,
+    'playlistItems' : 60 * 60,
+    'playlists' : 24 * 60 * 60,
+    'subscriptions' : 24 * 60 * 60,
+}
+
+# How long, in seconds, to keep responses that include each part.
+# A response is kept as long as its shortest lived part, IE statistics for minutes and branding for days.
+PART_TTLS = {
+    'statistics' : 15 * 60,
+    'replies' : 60 * 60,
+    'snippet' : 24 * 60 * 60,
+    'contentDetails' : 24 * 60 * 60,
+    'topicDetails' : 7 * 24 * 60 * 60,
+    'brandingSettings' : 7 * 24 * 60 * 60,
+    'id' : 7 * 24 * 60 * 60,
+}
+
+def normalize_endpoint(http_endpoint):
+    '''
+    Removes the API key from an endpoint and sorts its query parameters,
+    so the same request with a different key or argument order has the same cache key.
+    '''
+    url = urlparse(http_endpoint)
+    params = sorted((k, v) for k, v in parse_qsl(url.query, keep_blank_values=True)
+                    if k != 'key')
+    return '{}://{}{}?{}'.format(url.scheme, url.netloc, url.path, urlencode(params))
+
+
+class SQLiteCache:
+    """
+    A persistent response cache in a SQLite file.
+
+    Each response expires after the TTL of its API resource and parts, see ``RESOURCE_TTLS`` and ``PART_TTLS``.
+    Once the cached responses take more than ``max_size`` bytes, the least recently used ones are evicted.
+
+    :param path: the SQLite file IE "~/.youtube_api_cache.sqlite".
+    :type path: str
+    :param max_size: the maximum size of the cached responses in bytes.
+    :type max_size: int
+    :param default_ttl: the TTL in seconds of responses with no TTL for their resource or parts.
+    :type default_ttl: float
+    :param resource_ttls: TTLs in seconds that override ``RESOURCE_TTLS``.
+    :type resource_ttls: dict
+    :param part_ttls: TTLs in seconds that override ``PART_TTLS``.
+    :type part_ttls: dict
+    """
+    def __init__(self, path, max_size=512 * 1024 * 1024, default_ttl=60 * 60,
+                 resource_ttls=None, part_ttls=None):
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.resource_ttls = dict(RESOURCE_TTLS, **(resource_ttls if resource_ttls else {}))
+        self.part_ttls = dict(PART_TTLS, **(part_ttls if part_ttls else {}))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                           'endpoint TEXT PRIMARY KEY, body BLOB, size INTEGER, '
+                           'expires REAL, accessed REAL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._conn.commit()
+        self.size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+
+    def ttl(self, http_endpoint):
+        '''
+        Returns how long to keep the response of ``http_endpoint``, in seconds.
+        '''
+        url = urlparse(http_endpoint)
+        resource = url.path.rsplit('/', 1)[-1]
+        ttls = [self.part_ttls[part]
+                for k, v in parse_qsl(url.query) if k == 'part'
+                for part in v.split(',') if part in self.part_ttls]
+        if resource in self.resource_ttls:
+            ttls.append(self.resource_ttls[resource])
+        return min(ttls) if ttls else self.default_ttl
+
+
+    def get(self, http_endpoint):
+        '''
+        Returns the cached response body of ``http_endpoint``, or None if it is missing or expired.
+
+        :rtype: bytes
+        '''
+        endpoint = normalize_endpoint(http_endpoint)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT body, size, expires FROM responses WHERE endpoint = ?',
+                                     (endpoint,)).fetchone()
+            if row is None:
+                return None
+            body, size, expires = row
+            if expires < now:
+                self._conn.execute('DELETE FROM responses WHERE endpoint = ?', (endpoint,))
+                self.size -= size
+                self._conn.commit()
+                return None
+            self._conn.execute('UPDATE responses SET accessed = ? WHERE endpoint = ?', (now, endpoint))
+            self._conn.commit()
+        return bytes(body)
+
+
+    def set(self, http_endpoint, body):
+        '''
+        Caches the response ``body`` of ``http_endpoint``, and evicts the least recently used responses
+        if the cache is larger than ``max_size``.
+
+        :param body: the raw response body.
+        :type body: bytes
+        '''
+        endpoint = normalize_endpoint(http_endpoint)
+        now = time.time()
+        expires = now + self.ttl(http_endpoint)
+        with self._lock:
+            row = self._conn.execute('SELECT size FROM responses WHERE endpoint = ?',
+                                     (endpoint,)).fetchone()
+            if row:
+                self.size -= row[0]
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                               (endpoint, sqlite3.Binary(body), len(body), expires, now))
+            self.size += len(body)
+            if self.size > self.max_size:
+                self._evict()
+            self._conn.commit()
+
+
+    def _evict(self):
+        # drop expired responses first, then the least recently used ones.
+        self._conn.execute('DELETE FROM responses WHERE expires < ?', (time.time(),))
+        self.size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        rows = self._conn.execute('SELECT endpoint, size FROM responses ORDER BY accessed')
+        evicted = []
+        for endpoint, size in rows:
+            if self.size <= self.max_size:
+                break
+            evicted.append((endpoint,))
+            self.size -= size
+        self._conn.executemany('DELETE FROM responses WHERE endpoint = ?', evicted)
+
+
+    def clear(self):
+        '''
+        Removes every cached response.
+        '''
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self.size = 0
+
+
+    def close(self):
+        self._conn.close()
+
+
+class IDCache:
+    """
+    An in-memory LRU cache of API items, IE videos or channels, keyed by their ID.
+    The clients use it to skip IDs that were fetched recently by
+    :meth:`youtube_api.youtube_api.YouTubeDataAPI.get_video_metadata` and
+    :meth:`youtube_api.youtube_api.YouTubeDataAPI.get_channel_metadata`.
+
+    :param max_entries: the maximum number of cached items, the least recently used are evicted.
+    :type max_entries: int
+    :param ttl: how long to keep an item, in seconds.
+    :type ttl: float
+    """
+    def __init__(self, max_entries=100000, ttl=10 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+        return len(self._items)
+
+
+    def get(self, key):
+        '''
+        Returns the cached item for ``key``, or None if it is missing or expired.
+        '''
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            item, expires = entry
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item
+
+
+    def set(self, key, item):
+        '''
+        Caches ``item`` for ``key``, and evicts the least recently used items past ``max_entries``.
+        '''
+        with self._lock:
+            self._items[key] = (item, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class ETagStore:
+    """
+    An in-memory LRU store of the ETag and parsed response of each endpoint, for conditional requests.
+
+    The clients send the stored ETag in an ``If-None-Match`` header, and when the API answers
+    "304 Not Modified" they return the stored response without downloading or parsing it again.
+    The stored responses are shared, so don't modify them in place.
+
+    :param max_entries: the maximum number of stored responses, the least recently used are evicted.
+    :type max_entries: int
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        # conditional requests answered with "304 Not Modified".
+        self.hits = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+        return len(self._items)
+
+
+    def get(self, http_endpoint):
+        '''
+        Returns the ETag and parsed response stored for ``http_endpoint``, or None.
+
+        :rtype: tuple
+        '''
+        endpoint = normalize_endpoint(http_endpoint)
+        with self._lock:
+            entry = self._items.get(endpoint)
+            if entry is not None:
+                self._items.move_to_end(endpoint)
+            return entry
+
+
+    def set(self, http_endpoint, etag, response_json):
+        '''
+        Stores the ``etag`` and parsed response of ``http_endpoint``.
+        '''
+        endpoint = normalize_endpoint(http_endpoint)
+        with self._lock:
+            self._items[endpoint] = (etag, response_json)
+            self._items.move_to_end(endpoint)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
@@ -0,0 +1,152 @@
+import os
+import time
+import sqlite3
+import threading
+
+from youtube_api.cache import normalize_endpoint
+
+"""
+This script has the checkpoint store that lets paginated API calls of the YouTubeDataAPI clients resume after a crash.
+A checkpoint is keyed on the client method and its endpoint with the API key removed, so it is shared by every key.
+It also has the high-water mark store that lets playlist walks stop at the videos collected by the last walk.
+"""
+
+__all__ = ['SQLiteCheckpointStore', 'SQLiteWatermarkStore']
+
+class SQLiteCheckpointStore:
+    """
+    A persistent store of page token checkpoints in a SQLite file.
+
+    After each page of a paginated method, IE :meth:`youtube_api.youtube_api.YouTubeDataAPI.search_gen`,
+    the client saves the token of the next page and the number of items yielded so far.
+    Calling the method again with the same arguments continues from the saved page.
+    The checkpoint is removed once the method reaches its last page or ``max_results``.
+
+    :param path: the SQLite file IE "~/.youtube_api_checkpoints.sqlite".
+    :type path: str
+    """
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS checkpoints ('
+                           'method TEXT, endpoint TEXT, page_token TEXT, n_items INTEGER, '
+                           'updated REAL, PRIMARY KEY (method, endpoint))')
+        self._conn.commit()
+
+
+    def get(self, method, http_endpoint):
+        '''
+        Returns the saved page token and number of items of ``method`` on ``http_endpoint``, or None.
+
+        :rtype: tuple
+        '''
+        with self._lock:
+            row = self._conn.execute('SELECT page_token, n_items FROM checkpoints '
+                                     'WHERE method = ? AND endpoint = ?',
+                                     (method, normalize_endpoint(http_endpoint))).fetchone()
+        return tuple(row) if row else None
+
+
+    def set(self, method, http_endpoint, page_token, n_items):
+        '''
+        Saves ``page_token``, the next page to request, and ``n_items``, the items yielded before it.
+        '''
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)',
+                               (method, normalize_endpoint(http_endpoint), page_token,
+                                n_items, time.time()))
+            self._conn.commit()
+
+
+    def delete(self, method, http_endpoint):
+        '''
+        Removes the checkpoint of ``method`` on ``http_endpoint``.
+        '''
+        with self._lock:
+            self._conn.execute('DELETE FROM checkpoints WHERE method = ? AND endpoint = ?',
+                               (method, normalize_endpoint(http_endpoint)))
+            self._conn.commit()
+
+
+    def clear(self):
+        '''
+        Removes every checkpoint.
+        '''
+        with self._lock:
+            self._conn.execute('DELETE FROM checkpoints')
+            self._conn.commit()
+
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLiteWatermarkStore:
+    """
+    A persistent store of the high-water mark of each playlist in a SQLite file.
+
+    Passed to the client as ``watermark_store``,
+    :meth:`youtube_api.youtube_api.YouTubeDataAPI.get_videos_from_playlist_id_gen` stops at the videos
+    it collected the last time it walked a playlist from the first page to the end or to its mark, and saves the mark of the newest videos.
+    A mark is the latest publish timestamp, in the clock of the ``publish_date`` of the parsers,
+    and the video IDs of the newest page of videos.
+
+    :param path: the SQLite file IE "~/.youtube_api_watermarks.sqlite".
+    :type path: str
+    """
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS watermarks ('
+                           'playlist_id TEXT PRIMARY KEY, published_at REAL, video_ids TEXT, '
+                           'updated REAL)')
+        self._conn.commit()
+
+
+    def get(self, playlist_id):
+        '''
+        Returns the publish timestamp and set of video IDs of the mark of ``playlist_id``, or None.
+
+        :rtype: tuple
+        '''
+        with self._lock:
+            row = self._conn.execute('SELECT published_at, video_ids FROM watermarks '
+                                     'WHERE playlist_id = ?', (playlist_id,)).fetchone()
+        if row is None:
+            return None
+        published_at, video_ids = row
+        return (published_at, set(video_ids.split(',')) if video_ids else set())
+
+
+    def set(self, playlist_id, published_at, video_ids):
+        '''
+        Saves the mark of ``playlist_id``, the latest ``published_at`` timestamp and the newest ``video_ids``.
+        '''
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)',
+                               (playlist_id, published_at, ','.join(video_ids), time.time()))
+            self._conn.commit()
+
+
+    def delete(self, playlist_id):
+        '''
+        Removes the mark of ``playlist_id``, so its next walk collects every video.
+        '''
+        with self._lock:
+            self._conn.execute('DELETE FROM watermarks WHERE playlist_id = ?', (playlist_id,))
+            self._conn.commit()
+
+
+    def clear(self):
+        '''
+        Removes every mark.
+        '''
+        with self._lock:
+            self._conn.execute('DELETE FROM watermarks')
+            self._conn.commit()
+
+
+    def close(self):
+        self._conn.close()
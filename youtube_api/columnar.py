@@ -0,0 +1,383 @@
+from array import array
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+import youtube_api.parsers as P
+from youtube_api.youtube_api_utils import _yt_datetime64
+
+"""
+This script has a columnar parser, which appends each API item straight into typed column buffers
+instead of building a dict per item, and returns them as a pandas DataFrame or a pyarrow RecordBatch.
+"""
+
+__all__ = ['Column',
+           'ColumnSet',
+           'ColumnarParser',
+           'VIDEO_COLUMNS',
+           'PLAYLIST_ITEM_COLUMNS',
+           'SEARCH_COLUMNS',
+           'COMMENT_COLUMNS']
+
+Column = namedtuple('Column', ['name', 'path', 'dtype'])
+Column.__doc__ = '''
+A column of a :class:`ColumnarParser`.
+
+:param name: the name of the column.
+:type name: str
+:param path: the JSON path of the value in an API item, IE "statistics/viewCount".
+    A "timestamp" column without a path holds the collection_date of each item, see :func:`youtube_api.parsers.parse_context`.
+:type path: str
+:param dtype: "int64" for counts, "float64", "timestamp" for dates, "category" for strings
+    repeated across items like channel IDs, or "string". Lists of strings are joined by "|".
+:type dtype: str
+'''
+
+ColumnSet = namedtuple('ColumnSet', ['columns', 'fields', 'prepare'])
+ColumnSet.__new__.__defaults__ = (None, None)
+ColumnSet.__doc__ = '''
+The columns of a :class:`ColumnarParser`, with the ``fields`` the clients request for them,
+by default the paths of the columns, and a function ``prepare`` which reshapes each item before it's read.
+'''
+
+
+class _Int64Buffer:
+    def __init__(self):
+        self.values = array('q')
+        self.missing = bytearray()
+
+    def append(self, value):
+        if value is None:
+            self.values.append(0)
+            self.missing.append(1)
+        else:
+            self.values.append(int(value))
+            self.missing.append(0)
+
+    def to_pandas(self):
+        values = np.array(self.values, dtype=np.int64)
+        missing = np.frombuffer(bytes(self.missing), dtype=np.bool_)
+        if missing.any():
+            return pd.arrays.IntegerArray(values, missing.copy())
+        return values
+
+
+class _Float64Buffer:
+    def __init__(self):
+        self.values = array('d')
+
+    def append(self, value):
+        self.values.append(float('nan') if value is None else float(value))
+
+    def to_pandas(self):
+        return np.array(self.values, dtype=np.float64)
+
+
+class _StringBuffer:
+    def __init__(self):
+        self.values = []
+
+    def append(self, value):
+        if isinstance(value, list):
+            value = '|'.join(value)
+        self.values.append(value)
+
+    def to_pandas(self):
+        return pd.Series(self.values, dtype=object)
+
+
+class _CategoryBuffer:
+    def __init__(self):
+        self.codes = array('i')
+        self.index = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.index)
+        self.codes.append(code)
+
+    def to_pandas(self):
+        return pd.Categorical.from_codes(np.array(self.codes, dtype=np.int32),
+                                         categories=list(self.index))
+
+
+class _TimestampBuffer:
+    '''
+    Keeps the dates as sent by the API, and converts all of them at once.
+    '''
+    def __init__(self):
+        self.values = []
+
+    def append(self, value):
+        self.values.append(value)
+
+    def to_pandas(self):
+        try:
+            # numpy parses the two forms the API returns several times faster than pandas.
+            return pd.to_datetime(_yt_datetime64(self.values), utc=True)
+        except ValueError:
+            pass
+        try:
+            return pd.to_datetime(self.values, utc=True, format='ISO8601')
+        except (TypeError, ValueError):
+            # pandas < 2.0 infers the format itself.
+            return pd.to_datetime(self.values, utc=True)
+
+
+class _CollectionDateBuffer:
+    '''
+    Keeps the collection_date of each item, converted once per page.
+    '''
+    def __init__(self):
+        self.values = array('d')
+        self.date = None
+        self.timestamp = None
+
+    def append(self, value):
+        date = P.collection_date()
+        if date is not self.date:
+            self.date, self.timestamp = date, date.timestamp()
+        self.values.append(self.timestamp)
+
+    def to_pandas(self):
+        return pd.to_datetime(np.array(self.values, dtype=np.float64), unit='s', utc=True)
+
+
+_BUFFERS = {
+    'int64' : _Int64Buffer,
+    'float64' : _Float64Buffer,
+    'string' : _StringBuffer,
+    'category' : _CategoryBuffer,
+    'timestamp' : _TimestampBuffer,
+}
+
+
+class ColumnarParser:
+    """
+    A parser for the client methods which appends each item into a typed buffer per column,
+    so a page of items costs a few array appends rather than a dict per item. Counts are int64,
+    dates are UTC datetime64 and repeated strings are categorical. The parser requests the ``fields``
+    of its columns, so the API only sends those properties.
+    The methods yield None for each item, and :meth:`to_pandas` or :meth:`to_arrow` return the table.
+
+    .. code-block:: python
+
+        from youtube_api.columnar import ColumnarParser, VIDEO_COLUMNS, COMMENT_COLUMNS
+
+        videos = ColumnarParser(VIDEO_COLUMNS)
+        yt.get_video_metadata(video_ids, parser=videos)
+        df = videos.to_pandas()
+
+        comments = ColumnarParser(COMMENT_COLUMNS)
+        for batch in comments.record_batches(yt.get_video_comments_gen(video_id, parser=comments)):
+            writer.write_batch(batch)
+
+    A parser collects the items of a single method call at a time.
+
+    :param columns: the columns, a :class:`ColumnSet` or a list of :class:`Column`.
+    :type columns: :class:`ColumnSet` or list
+    :param fields: the paths to request, by resource name, IE :attr:`youtube_api.parsers.parse_comment_metadata.fields`.
+    :type fields: dict
+    :param prepare: a function which reshapes each item before its columns are read.
+    :type prepare: callable
+    """
+    def __init__(self, columns, fields=None, prepare=None):
+        if isinstance(columns, ColumnSet):
+            fields = fields or columns.fields
+            prepare = prepare or columns.prepare
+            columns = columns.columns
+        self.columns = [Column(*column) for column in columns]
+        for column in self.columns:
+            if column.dtype not in _BUFFERS:
+                raise ValueError('Unknown dtype "{}" of column "{}", expected one of {}.'.format(
+                    column.dtype, column.name, ', '.join(_BUFFERS)))
+            if not column.path and column.dtype != 'timestamp':
+                raise ValueError('Column "{}" has no path.'.format(column.name))
+        self.fields = fields or {None : [column.path for column in self.columns if column.path]}
+        self.prepare = prepare
+        self._keys = [tuple(column.path.split('/')) if column.path else None
+                      for column in self.columns]
+        self.clear()
+
+
+    def clear(self):
+        '''
+        Empties the buffers of every column.
+        '''
+        self._buffers = [_CollectionDateBuffer() if keys is None else _BUFFERS[column.dtype]()
+                         for column, keys in zip(self.columns, self._keys)]
+        self._readers = list(zip(self._keys, [buffer.append for buffer in self._buffers]))
+        self._length = 0
+
+
+    def __len__(self):
+        return self._length
+
+
+    def __bool__(self):
+        # the clients fall back to raw_json when ``parser`` is falsy, even while it's empty.
+        return True
+
+
+    def __call__(self, item):
+        '''
+        Appends the columns of an API item. Missing values are null.
+
+        :param item: json document
+        :type item: dict
+        '''
+        if not isinstance(item, dict):
+            return
+        if self.prepare:
+            item = self.prepare(item)
+        for keys, append in self._readers:
+            value = item
+            if keys is not None:
+                for key in keys:
+                    try:
+                        value = value[key]
+                    except (KeyError, TypeError):
+                        value = None
+                        break
+            append(value)
+        self._length += 1
+
+
+    def to_pandas(self):
+        '''
+        Returns the items parsed so far.
+
+        :rtype: pandas.DataFrame
+        '''
+        return pd.DataFrame({column.name : buffer.to_pandas()
+                             for column, buffer in zip(self.columns, self._buffers)},
+                            columns=[column.name for column in self.columns])
+
+
+    def to_arrow(self):
+        '''
+        Returns the items parsed so far. Requires pyarrow.
+
+        :rtype: pyarrow.RecordBatch
+        '''
+        if pyarrow is None:
+            raise ImportError('to_arrow requires pyarrow, install youtube-data-api[arrow].')
+        return pyarrow.RecordBatch.from_pandas(self.to_pandas(), preserve_index=False)
+
+
+    def consume(self, items):
+        '''
+        Exhausts ``items``, a method called with this parser, and returns the parser.
+
+        :param items: IE ``yt.get_video_comments_gen(video_id, parser=parser)``.
+        :type items: iterable
+
+        :rtype: :class:`ColumnarParser`
+        '''
+        for _ in items:
+            pass
+        return self
+
+
+    def batches(self, items, batch_size=100000):
+        '''
+        Exhausts ``items``, a method called with this parser, and yields a DataFrame every ``batch_size`` items,
+        so a long method call never holds more than ``batch_size`` rows.
+
+        :param items: IE ``yt.get_video_comments_gen(video_id, parser=parser)``.
+        :type items: iterable
+        :param batch_size: the number of rows per DataFrame.
+        :type batch_size: int
+
+        :returns: yields DataFrames of at most ``batch_size`` rows.
+        :rtype: pandas.DataFrame
+        '''
+        return self._batches(items, batch_size, self.to_pandas)
+
+
+    def record_batches(self, items, batch_size=100000):
+        '''
+        Like :meth:`batches`, but yields pyarrow RecordBatches. Requires pyarrow.
+
+        :rtype: pyarrow.RecordBatch
+        '''
+        return self._batches(items, batch_size, self.to_arrow)
+
+
+    def _batches(self, items, batch_size, convert):
+        self.clear()
+        for _ in items:
+            if self._length >= batch_size:
+                yield convert()
+                self.clear()
+        if self._length:
+            yield convert()
+        self.clear()
+
+
+_COLLECTION_DATE = Column('collection_date', None, 'timestamp')
+
+# the columns of youtube_api.parsers.parse_video_metadata.
+VIDEO_COLUMNS = ColumnSet([
+    Column('video_id', 'id', 'string'),
+    Column('channel_title', 'snippet/channelTitle', 'category'),
+    Column('channel_id', 'snippet/channelId', 'category'),
+    Column('video_publish_date', 'snippet/publishedAt', 'timestamp'),
+    Column('video_title', 'snippet/title', 'string'),
+    Column('video_description', 'snippet/description', 'string'),
+    Column('video_category', 'snippet/categoryId', 'category'),
+    Column('video_view_count', 'statistics/viewCount', 'int64'),
+    Column('video_comment_count', 'statistics/commentCount', 'int64'),
+    Column('video_like_count', 'statistics/likeCount', 'int64'),
+    Column('video_dislike_count', 'statistics/dislikeCount', 'int64'),
+    Column('video_thumbnail', 'snippet/thumbnails/high/url', 'string'),
+    Column('video_tags', 'snippet/tags', 'string'),
+    _COLLECTION_DATE,
+])
+
+# the columns of youtube_api.parsers.parse_video_url.
+PLAYLIST_ITEM_COLUMNS = ColumnSet([
+    Column('video_id', 'snippet/resourceId/videoId', 'string'),
+    Column('channel_id', 'snippet/channelId', 'category'),
+    Column('publish_date', 'snippet/publishedAt', 'timestamp'),
+    _COLLECTION_DATE,
+])
+
+# the columns of youtube_api.parsers.parse_rec_video_metadata.
+SEARCH_COLUMNS = ColumnSet([
+    Column('video_id', 'id/videoId', 'string'),
+    Column('channel_title', 'snippet/channelTitle', 'category'),
+    Column('channel_id', 'snippet/channelId', 'category'),
+    Column('video_publish_date', 'snippet/publishedAt', 'timestamp'),
+    Column('video_title', 'snippet/title', 'string'),
+    Column('video_description', 'snippet/description', 'string'),
+    Column('video_category', 'snippet/categoryId', 'category'),
+    Column('video_thumbnail', 'snippet/thumbnails/high/url', 'string'),
+    _COLLECTION_DATE,
+])
+
+# the columns of youtube_api.parsers.parse_comment_metadata, for comment threads and replies.
+COMMENT_COLUMNS = ColumnSet([
+    Column('video_id', 'snippet/videoId', 'category'),
+    Column('commenter_channel_url', 'snippet/authorChannelUrl', 'string'),
+    Column('commenter_channel_id', 'snippet/authorChannelId/value', 'string'),
+    Column('commenter_channel_display_name', 'snippet/authorDisplayName', 'string'),
+    Column('comment_id', 'id', 'string'),
+    Column('comment_like_count', 'snippet/likeCount', 'int64'),
+    Column('comment_publish_date', 'snippet/publishedAt', 'timestamp'),
+    Column('text', 'snippet/textDisplay', 'string'),
+    Column('commenter_rating', 'snippet/viewerRating', 'category'),
+    Column('comment_parent_id', 'snippet/parentId', 'string'),
+    _COLLECTION_DATE,
+    Column('reply_count', 'totalReplyCount', 'int64'),
+], fields=P.parse_comment_metadata.fields, prepare=P._comment_view)
@@ -0,0 +1,404 @@
+import math
+import base64
+import asyncio
+import hashlib
+import binascii
+import itertools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import youtube_api.parsers as P
+from youtube_api.retry import error_reason
+
+"""
+This script has the snowball crawler, which expands a seed set of channels into a graph of
+the channels they subscribe to and feature, breadth first.
+"""
+
+__all__ = ['BloomFilter', 'SnowballCrawler', 'AsyncSnowballCrawler']
+
+# the reason of the 403 error for the subscriptions of a channel that keeps them private.
+_SUBSCRIPTION_FORBIDDEN = 'subscriptionForbidden'
+
+@P._reads('snippet/resourceId/channelId')
+def _parse_subscription_id(item):
+    return item['snippet']['resourceId'].get('channelId')
+
+
+class BloomFilter:
+    """
+    A set of strings in a fixed size bit array, that answers "maybe" for members and "no" for the others.
+    A string that was never added is reported as a member with a probability of about ``error_rate``,
+    until more than ``capacity`` strings are added.
+
+    :param capacity: the number of strings to hold.
+    :type capacity: int
+    :param error_rate: the false positive rate at ``capacity``.
+    :type error_rate: float
+    """
+    def __init__(self, capacity=1000000, error_rate=.001):
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1, not {}.'.format(error_rate))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.n_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.n_hashes = max(1, int(round(self.n_bits / float(capacity) * math.log(2))))
+        self._bits = bytearray((self.n_bits + 7) // 8)
+        self._len = 0
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+        return self._len
+
+
+    def _positions(self, key):
+        # double hashing, the positions of k hashes from two.
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+
+    def __contains__(self, key):
+        return all(self._bits[i >> 3] & (1 << (i & 7)) for i in self._positions(key))
+
+
+    def add(self, key):
+        '''
+        Adds ``key`` to the filter.
+
+        :returns: False if ``key`` was already a member, maybe a false positive, True otherwise.
+        :rtype: bool
+        '''
+        positions = self._positions(key)
+        with self._lock:
+            added = False
+            for i in positions:
+                if not self._bits[i >> 3] & (1 << (i & 7)):
+                    self._bits[i >> 3] |= 1 << (i & 7)
+                    added = True
+            if added:
+                self._len += 1
+            return added
+
+
+class _Frontier:
+    '''
+    The channel IDs of the next level of a crawl, packed in a bytearray.
+    A channel ID is "UC" and 22 characters of URL-safe base64, 16 bytes instead of a 73 byte string.
+    '''
+    def __init__(self):
+        self._packed = bytearray()
+        # IDs that don't have the channel ID format.
+        self._other = []
+
+
+    def __len__(self):
+        return len(self._packed) // 16 + len(self._other)
+
+
+    def add(self, channel_id):
+        if len(channel_id) == 24 and channel_id.startswith('UC'):
+            try:
+                packed = base64.b64decode(channel_id[2:] + '==', altchars=b'-_', validate=True)
+            except (binascii.Error, ValueError):
+                packed = None
+            # only IDs that unpack to themselves, the last character has 4 unused bits.
+            if packed and self._unpack(packed) == channel_id:
+                self._packed += packed
+                return
+        self._other.append(channel_id)
+
+
+    def _unpack(self, packed):
+        return 'UC' + base64.urlsafe_b64encode(bytes(packed)).decode('ascii')[:22]
+
+
+    def __iter__(self):
+        for i in range(0, len(self._packed), 16):
+            yield self._unpack(self._packed[i:i + 16])
+        for channel_id in self._other:
+            yield channel_id
+
+
+class SnowballCrawler:
+    """
+    Expands a seed set of channels breadth first with a :class:`youtube_api.youtube_api.YouTubeDataAPI` client,
+    following the channels each channel subscribes to and features, up to ``max_depth`` links away from the seeds.
+    Yields the links as they are found, and requests every channel once.
+
+    Channels are marked as visited in a :class:`BloomFilter`, so about ``error_rate`` of the channels are skipped
+    as false positives, and the next level of channels is kept as packed IDs.
+    Featured channels are requested 50 channels at a time, and subscriptions one channel at a time,
+    with ``max_workers`` requests at once.
+
+    .. code-block:: python
+
+        crawler = SnowballCrawler(yt, max_depth=2, quota_budget=5000, max_workers=8)
+        edges = pd.DataFrame(crawler.crawl(['UC_x5XG1OV2P6uZZ5FSM9Ttw']))
+
+    :param yt: the client, shared by every thread. Set its ``pool_maxsize`` to at least ``max_workers``.
+    :type yt: :class:`youtube_api.youtube_api.YouTubeDataAPI`
+    :param max_depth: how many links away from the seeds to expand.
+    :type max_depth: int
+    :param subscriptions: follow the channels each channel subscribes to.
+        Channels with private subscriptions, which the API refuses with a 403 "subscriptionForbidden", have no subscription links.
+    :type subscriptions: bool
+    :param featured_channels: follow the featured channels of each channel.
+    :type featured_channels: bool
+    :param max_subscriptions: the maximum number of subscriptions per channel, all of them when None.
+    :type max_subscriptions: int
+    :param quota_budget: stop sending requests once the crawl spent this many quota units, no limit when None. The requests already scheduled, up to ``2 * max_workers``, still finish.
+    :type quota_budget: int
+    :param max_workers: the number of threads sending requests.
+    :type max_workers: int
+    :param capacity: the expected number of channels, to size the :class:`BloomFilter`.
+    :type capacity: int
+    :param error_rate: the false positive rate of the :class:`BloomFilter`.
+    :type error_rate: float
+    """
+    def __init__(self, yt, max_depth=1, subscriptions=True, featured_channels=True,
+                 max_subscriptions=None, quota_budget=None, max_workers=4,
+                 capacity=1000000, error_rate=.001):
+        self.yt = yt
+        self.max_depth = max_depth
+        self.subscriptions = subscriptions
+        self.featured_channels = featured_channels
+        self.max_subscriptions = max_subscriptions
+        self.quota_budget = quota_budget
+        self.max_workers = max_workers
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # whether the last crawl stopped at the quota budget.
+        self.budget_exhausted = False
+
+
+    def _start(self, seeds):
+        self.visited = BloomFilter(self.capacity, self.error_rate)
+        self.budget_exhausted = False
+        self._start_units = self.yt.quota_ledger.total
+        frontier = _Frontier()
+        for channel_id in seeds:
+            if self.visited.add(channel_id):
+                frontier.add(channel_id)
+        return frontier
+
+
+    def _within_budget(self):
+        if self.quota_budget is not None and \
+                self.yt.quota_ledger.total - self._start_units >= self.quota_budget:
+            self.budget_exhausted = True
+        return not self.budget_exhausted
+
+
+    def _requests(self, frontier):
+        '''
+        Yields the requests that expand ``frontier``, a relation and the channel IDs to request it for.
+        '''
+        if self.featured_channels:
+            channel_ids = iter(frontier)
+            chunk = list(itertools.islice(channel_ids, 50))
+            while chunk:
+                yield 'featured', chunk
+                chunk = list(itertools.islice(channel_ids, 50))
+        if self.subscriptions:
+            for channel_id in frontier:
+                yield 'subscription', [channel_id]
+
+
+    def _get_featured(self, channel_ids):
+        links = []
+        for channel in self.yt.get_featured_channels_gen(channel_ids):
+            for channel_id, featured in channel.items():
+                links += [(channel_id, linked_channel_id) for linked_channel_id in featured]
+        return links
+
+
+    def _get_subscriptions(self, channel_ids):
+        links = []
+        try:
+            for linked_channel_id in self.yt.get_subscriptions_gen(channel_ids[0],
+                                                                   parser=_parse_subscription_id):
+                if self.max_subscriptions and len(links) >= self.max_subscriptions:
+                    break
+                if linked_channel_id:
+                    links.append((channel_ids[0], linked_channel_id))
+        except requests.HTTPError as e:
+            if e.response is None or error_reason(e.response.text) != _SUBSCRIPTION_FORBIDDEN:
+                raise
+        return links
+
+
+    def _edges(self, relation, links, depth, next_frontier):
+        for channel_id, linked_channel_id in links:
+            if self.visited.add(linked_channel_id) and depth + 1 < self.max_depth:
+                next_frontier.add(linked_channel_id)
+            yield {'channel_id' : channel_id,
+                   'linked_channel_id' : linked_channel_id,
+                   'relation' : relation,
+                   'depth' : depth + 1}
+
+
+    def crawl(self, seeds):
+        '''
+        Yields the links from the channels ``seeds`` and from the channels they link to, up to ``max_depth``,
+        as dictionaries of channel_id, linked_channel_id, relation ("subscription" or "featured"), and depth,
+        the number of links from the seeds to linked_channel_id.
+
+        :param seeds: channel IDs IE: ['UC_x5XG1OV2P6uZZ5FSM9Ttw']
+        :type seeds: list of str
+
+        :returns: yields the links between channels.
+        :rtype: dict
+        '''
+        frontier = self._start(seeds)
+        get_links = {'featured' : self._get_featured, 'subscription' : self._get_subscriptions}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for depth in range(self.max_depth):
+                next_frontier = _Frontier()
+                # the relation of each request in flight.
+                pending = dict()
+                scheduled = self._requests(frontier)
+                try:
+                    while True:
+                        while len(pending) < 2 * self.max_workers and self._within_budget():
+                            request = next(scheduled, None)
+                            if request is None:
+                                break
+                            relation, channel_ids = request
+                            # run in a copy of the context so the quota is charged to the client method.
+                            context = contextvars.copy_context()
+                            future = executor.submit(context.run, get_links[relation], channel_ids)
+                            pending[future] = relation
+                        if not pending:
+                            break
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            relation = pending.pop(future)
+                            for edge in self._edges(relation, future.result(), depth, next_frontier):
+                                yield edge
+                finally:
+                    for future in pending:
+                        future.cancel()
+                if self.budget_exhausted or not len(next_frontier):
+                    return
+                frontier = next_frontier
+
+
+    def run(self, seeds, sink):
+        '''
+        Passes the links found by :meth:`crawl` to ``sink``.
+
+        :param sink: a function called with each link, IE ``edges.append``.
+        :type sink: callable
+
+        :returns: the number of links passed to ``sink``.
+        :rtype: int
+        '''
+        n_edges = 0
+        for edge in self.crawl(seeds):
+            sink(edge)
+            n_edges += 1
+        return n_edges
+
+
+class AsyncSnowballCrawler(SnowballCrawler):
+    """
+    Expands a seed set of channels breadth first with a :class:`youtube_api.youtube_api_async.AsyncYouTubeDataAPI` client.
+    See :class:`SnowballCrawler`, ``max_workers`` is the number of requests scheduled at once.
+
+    .. code-block:: python
+
+        async with AsyncYouTubeDataAPI(api_key) as yt:
+            crawler = AsyncSnowballCrawler(yt, max_depth=2, quota_budget=5000)
+            edges = [edge async for edge in crawler.crawl(['UC_x5XG1OV2P6uZZ5FSM9Ttw'])]
+    """
+    async def _get_featured(self, channel_ids):
+        links = []
+        async for channel in self.yt.get_featured_channels_gen(channel_ids):
+            for channel_id, featured in channel.items():
+                links += [(channel_id, linked_channel_id) for linked_channel_id in featured]
+        return links
+
+
+    async def _get_subscriptions(self, channel_ids):
+        links = []
+        try:
+            async for linked_channel_id in self.yt.get_subscriptions_gen(channel_ids[0],
+                                                                         parser=_parse_subscription_id):
+                if self.max_subscriptions and len(links) >= self.max_subscriptions:
+                    break
+                if linked_channel_id:
+                    links.append((channel_ids[0], linked_channel_id))
+        except aiohttp.ClientResponseError as e:
+            # the message of the error is the reason of the API error, see AsyncYouTubeDataAPI._http_request.
+            if e.message != _SUBSCRIPTION_FORBIDDEN:
+                raise
+        return links
+
+
+    async def crawl(self, seeds):
+        '''
+        Yields the links from the channels ``seeds`` and from the channels they link to, up to ``max_depth``.
+        See :meth:`SnowballCrawler.crawl`.
+
+        :param seeds: channel IDs IE: ['UC_x5XG1OV2P6uZZ5FSM9Ttw']
+        :type seeds: list of str
+
+        :returns: yields the links between channels.
+        :rtype: dict
+        '''
+        frontier = self._start(seeds)
+        get_links = {'featured' : self._get_featured, 'subscription' : self._get_subscriptions}
+        for depth in range(self.max_depth):
+            next_frontier = _Frontier()
+            # the relation of each request in flight.
+            pending = dict()
+            scheduled = self._requests(frontier)
+            try:
+                while True:
+                    while len(pending) < self.max_workers and self._within_budget():
+                        request = next(scheduled, None)
+                        if request is None:
+                            break
+                        relation, channel_ids = request
+                        pending[asyncio.ensure_future(get_links[relation](channel_ids))] = relation
+                    if not pending:
+                        break
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        relation = pending.pop(task)
+                        for edge in self._edges(relation, task.result(), depth, next_frontier):
+                            yield edge
+            finally:
+                for task in pending:
+                    task.cancel()
+            if self.budget_exhausted or not len(next_frontier):
+                return
+            frontier = next_frontier
+
+
+    async def run(self, seeds, sink):
+        '''
+        Passes the links found by :meth:`crawl` to ``sink``.
+
+        :param sink: a function called with each link, IE ``edges.append``.
+        :type sink: callable
+
+        :returns: the number of links passed to ``sink``.
+        :rtype: int
+        '''
+        n_edges = 0
+        async for edge in self.crawl(seeds):
+            sink(edge)
+            n_edges += 1
+        return n_edges
@@ -0,0 +1,55 @@
+import json
+import collections
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+"""
+This script has the JSON decoders the YouTubeDataAPI clients parse responses with.
+Responses are parsed straight from the raw bytes, the fastest installed decoder is used by default.
+"""
+
+__all__ = ['DECODERS', 'get_decoder', 'loads']
+
+# JSON decoders from fastest to slowest, None when the package is not installed.
+DECODERS = collections.OrderedDict([
+    ('orjson', orjson.loads if orjson else None),
+    ('simdjson', simdjson.loads if simdjson else None),
+    ('ujson', ujson.loads if ujson else None),
+    ('json', json.loads),
+])
+
+
+def get_decoder(decoder=None):
+    '''
+    Returns a function that parses JSON from bytes.
+
+    :param decoder: the name of a decoder in ``DECODERS`` IE "orjson", a function, or None for the fastest installed decoder.
+    :type decoder: str or callable
+
+    :rtype: callable
+    '''
+    if callable(decoder):
+        return decoder
+    if decoder is None:
+        return next(loads for loads in DECODERS.values() if loads)
+    if decoder not in DECODERS:
+        raise ValueError('Unknown JSON decoder {}, choose one of {}.'.format(decoder, list(DECODERS)))
+    if DECODERS[decoder] is None:
+        raise ImportError('The {} JSON decoder is not installed.'.format(decoder))
+    return DECODERS[decoder]
+
+
+loads = get_decoder()
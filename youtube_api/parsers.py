@@ -1,7 +1,10 @@
 import json
 import sys
 import datetime
-from collections import OrderedDict
+import functools
+import contextlib
+import contextvars
+from collections import OrderedDict, namedtuple
 
 if sys.version_info[0] == 2:
     from collections import Iterable
@@ -24,7 +27,87 @@ __all__ = ['raw_json',
            'parse_featured_channels',
            'parse_comment_metadata',
            'parse_playlist_metadata',
-           'parse_caption_track']
+           'parse_caption_track',
+           'parse_context',
+           'collection_date',
+           'as_records',
+           'VideoRecord',
+           'VideoUrlRecord',
+           'ChannelRecord',
+           'SubscriptionRecord',
+           'PlaylistRecord',
+           'CommentRecord',
+           'RecVideoRecord']
+
+# the collection_date shared by the items parsed in a parse_context.
+_COLLECTION_DATE = contextvars.ContextVar('collection_date', default=None)
+
+def _reads(*paths, **resource_paths):
+    '''
+    Declares the JSON paths of an API item a parser reads, IE "snippet/title".
+    The clients send them as a ``fields`` mask, so the API leaves out the rest of each item.
+    Paths that only apply to one API resource are passed by resource name, IE ``comments=[...]``.
+    '''
+    def decorator(parser):
+        parser.fields = dict(resource_paths)
+        if paths:
+            parser.fields[None] = paths
+        return parser
+    return decorator
+
+
+@contextlib.contextmanager
+def parse_context(date=None):
+    '''
+    Gives every item parsed within the block the same collection_date, IE the items of a page,
+    so they don't each take the time, and can be joined or deduplicated on it.
+    The clients parse each page of a response in its own context.
+
+    .. code-block:: python
+
+        with P.parse_context():
+            videos = [P.parse_video_metadata(item) for item in response_json['items']]
+
+    :param date: the collection_date, the time the block starts when None.
+    :type date: datetime.datetime
+    '''
+    token = _COLLECTION_DATE.set(date if date else datetime.datetime.now())
+    try:
+        yield
+    finally:
+        _COLLECTION_DATE.reset(token)
+
+
+def collection_date():
+    '''
+    Returns the collection_date of the item being parsed, the date of the :func:`parse_context`
+    or the current time outside of one. Custom parsers can call it too.
+
+    :rtype: datetime.datetime
+    '''
+    date = _COLLECTION_DATE.get()
+    return date if date else datetime.datetime.now()
+
+
+def _page_parser(parser, date=None):
+    '''
+    Returns ``parser`` bound to one collection_date for the items of a page.
+    The clients yield between items, so each call sets the date rather than a block around the page.
+    '''
+    date = date if date else datetime.datetime.now()
+    def parse(item):
+        token = _COLLECTION_DATE.set(date)
+        try:
+            return parser(item)
+        finally:
+            _COLLECTION_DATE.reset(token)
+    return parse
+
+
+@functools.lru_cache(maxsize=1)
+def _collection_day(date):
+    return date.strftime('%Y-%m-%d')
+
 
 def raw_json(item):
     '''
@@ -36,9 +119,12 @@ def raw_json_with_datetime(item):
     '''
     Returns the raw json output from the API.
     '''
-    item['collection_date'] = datetime.datetime.now().strftime('%Y-%m-%d')
+    item['collection_date'] = _collection_day(collection_date())
     return item
 
+@_reads('id', 'snippet/channelTitle', 'snippet/channelId', 'snippet/publishedAt',
+        'snippet/title', 'snippet/description', 'snippet/categoryId', 'snippet/tags',
+        'snippet/thumbnails/high/url', 'statistics')
 def parse_video_metadata(item):
     '''
     Parses and processes raw output and returns video_id, channel_title, channel_id, video_publish_date, video_title, video_description, video_category, video_view_count, video_comment_count, video_like_count, video_dislike_count, video_thumbnail, video_tags, collection_date.
@@ -72,12 +158,13 @@ def parse_video_metadata(item):
         "video_dislike_count" : item["statistics"].get("dislikeCount"),
         "video_thumbnail" : item["snippet"]["thumbnails"]["high"]["url"],
         "video_tags" :  video_tags,
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
 
     return video_meta
 
 
+@_reads('snippet/publishedAt', 'snippet/resourceId/videoId', 'snippet/channelId')
 def parse_video_url(item):
     '''
     Parses and processes raw output and returns publish_date, video_id, channel_id, collection_date
@@ -100,10 +187,13 @@ def parse_video_url(item):
         "video_id" : video_id,
         "channel_id" : channel_id,
         "publish_date" : publish_date,
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
 
 
+@_reads('id', 'snippet/title', 'snippet/publishedAt', 'snippet/description', 'snippet/country',
+        'brandingSettings/channel/keywords', 'statistics',
+        'contentDetails/relatedPlaylists', 'topicDetails/topicCategories')
 def parse_channel_metadata(item):
     '''
     Parses and processes raw output and returns channel_id, title, account_creatation_date, keywords, description, view_count, video_count, subscription_count, playlist_id_likes, playlist_id_uploads, topic_ids, country, collection_date.
@@ -125,7 +215,7 @@ def parse_channel_metadata(item):
         "channel_id" : item['id'],
         "title" : item["snippet"].get("title"),
         "account_creation_date" : parse_yt_datetime(item["snippet"].get("publishedAt")),
-        "keywords" : item['brandingSettings']['channel'].get('keywords'),
+        "keywords" : item.get('brandingSettings', {}).get('channel', {}).get('keywords'),
         "description" : item["snippet"].get("description"),
         "view_count" : item["statistics"].get("viewCount"),
         "video_count" : item["statistics"].get("videoCount"),
@@ -134,12 +224,13 @@ def parse_channel_metadata(item):
         "playlist_id_uploads" : item['contentDetails']['relatedPlaylists'].get('uploads'),
         "topic_ids" : topic,
         "country" : item['snippet'].get('country'),
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
 
     return channel_meta
 
 
+@_reads('snippet/title', 'snippet/resourceId', 'snippet/publishedAt')
 def parse_subscription_descriptive(item):
     '''
     Parses and processes raw output and returns subscription_title, subscription_channel_id, subscription_kind, subscription_publish_date, collection_date.
@@ -159,12 +250,13 @@ def parse_subscription_descriptive(item):
         "subscription_channel_id" : item['snippet']['resourceId'].get('channelId'),
         "subscription_kind" : item['snippet']['resourceId'].get('kind'),
         "subscription_publish_date" : parse_yt_datetime(item['snippet'].get('publishedAt')),
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
 
     return sub_meta
 
 
+@_reads('id', 'brandingSettings/channel/featuredChannelsUrls')
 def parse_featured_channels(item):
     '''
     Parses and processes raw output and returns a dictionary where the key is the channel_id and the key is a list of channel URLs.
@@ -179,10 +271,12 @@ def parse_featured_channels(item):
         return dict()
 
     d = {}
-    d[item['id']] = item['brandingSettings']['channel'].get('featuredChannelsUrls', [])
+    d[item['id']] = item.get('brandingSettings', {}).get('channel', {}).get('featuredChannelsUrls', [])
     return d
 
 
+@_reads('id', 'snippet/title', 'snippet/publishedAt', 'snippet/channelId', 'snippet/channelTitle',
+        'contentDetails/itemCount')
 def parse_playlist_metadata(item):
     '''
     Parses and processes raw output and returns playlist_name, playlist_id, playlist_publish_date, playlist_n_videos, channel_id, channel_name, collection_date.
@@ -204,12 +298,35 @@ def parse_playlist_metadata(item):
         "playlist_n_videos" : item['contentDetails'].get('itemCount'),
         "channel_id" : item['snippet'].get('channelId'),
         "channel_name" : item['snippet'].get('channelTitle'),
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
 
     return playlist_meta
 
 
+_COMMENT_PATHS = ['id'] + ['snippet/' + name for name in (
+    'videoId', 'authorChannelUrl', 'authorChannelId', 'authorDisplayName', 'likeCount',
+    'publishedAt', 'textDisplay', 'viewerRating', 'parentId')]
+
+
+def _comment_view(item):
+    '''
+    Reads the top-level comment of a comment thread, with the thread's reply count,
+    so threads and replies share the same columns.
+    '''
+    snippet = item.get('snippet', {})
+    if 'topLevelComment' not in snippet:
+        return item
+    comment = snippet['topLevelComment']
+    return {'id' : comment.get('id'),
+            'snippet' : comment.get('snippet', {}),
+            'totalReplyCount' : snippet.get('totalReplyCount')}
+
+
+@_reads(commentThreads=['id', 'snippet/totalReplyCount'] +
+                       ['snippet/topLevelComment/' + path for path in _COMMENT_PATHS] +
+                       ['replies/comments/' + path for path in _COMMENT_PATHS],
+        comments=_COMMENT_PATHS)
 def parse_comment_metadata(item):
     '''
     Parses and processes raw output and returns video_id, commenter_channel_url,  commenter_channel_display_name, comment_id, comment_like_count, comment_publish_date, text, commenter_rating, comment_parent_id, collection_date.
@@ -238,7 +355,7 @@ def parse_comment_metadata(item):
         "text" : item["snippet"].get("textDisplay"),
         "commenter_rating" : item["snippet"].get("viewerRating"),
         "comment_parent_id" : item["snippet"].get("parentId"),
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
     try:
         comment_meta['reply_count'] = save.get('totalReplyCount')
@@ -248,6 +365,8 @@ def parse_comment_metadata(item):
     return comment_meta
 
 
+@_reads('id/videoId', 'snippet/channelTitle', 'snippet/channelId', 'snippet/publishedAt',
+        'snippet/title', 'snippet/description', 'snippet/categoryId', 'snippet/thumbnails/high/url')
 def parse_rec_video_metadata(item):
     '''
     Parses and processes raw output and returns video_id, channel_title, channel_id, video_publish_date, video_title, video_description, video_category, video_thumbnail, collection_date.
@@ -270,7 +389,7 @@ def parse_rec_video_metadata(item):
         "video_description" : item["snippet"].get("description"),
         "video_category" : item["snippet"].get("categoryId"),
         "video_thumbnail" : item["snippet"]["thumbnails"]["high"]["url"],
-        "collection_date" : datetime.datetime.now()
+        "collection_date" : collection_date()
     }
 
     return video_meta
@@ -295,3 +414,87 @@ def parse_caption_track(item):
     }
 
     return caption_meta
+
+
+# compact record types of the parsers, see as_records.
+VideoRecord = namedtuple('VideoRecord', [
+    'video_id', 'channel_title', 'channel_id', 'video_publish_date', 'video_title', 'video_description',
+    'video_category', 'video_view_count', 'video_comment_count', 'video_like_count', 'video_dislike_count',
+    'video_thumbnail', 'video_tags', 'collection_date'])
+VideoUrlRecord = namedtuple('VideoUrlRecord', ['video_id', 'channel_id', 'publish_date', 'collection_date'])
+ChannelRecord = namedtuple('ChannelRecord', [
+    'channel_id', 'title', 'account_creation_date', 'keywords', 'description', 'view_count', 'video_count',
+    'subscription_count', 'playlist_id_likes', 'playlist_id_uploads', 'topic_ids', 'country', 'collection_date'])
+SubscriptionRecord = namedtuple('SubscriptionRecord', [
+    'subscription_title', 'subscription_channel_id', 'subscription_kind', 'subscription_publish_date',
+    'collection_date'])
+PlaylistRecord = namedtuple('PlaylistRecord', [
+    'playlist_name', 'playlist_id', 'playlist_publish_date', 'playlist_n_videos', 'channel_id', 'channel_name',
+    'collection_date'])
+CommentRecord = namedtuple('CommentRecord', [
+    'video_id', 'commenter_channel_url', 'commenter_channel_id', 'commenter_channel_display_name', 'comment_id',
+    'comment_like_count', 'comment_publish_date', 'text', 'commenter_rating', 'comment_parent_id',
+    'collection_date', 'reply_count'])
+RecVideoRecord = namedtuple('RecVideoRecord', [
+    'video_id', 'channel_title', 'channel_id', 'video_publish_date', 'video_title', 'video_description',
+    'video_category', 'video_thumbnail', 'collection_date'])
+
+# the record type of each parser, and the columns repeated across the rows of a crawl.
+_RECORDS = {
+    parse_video_metadata : (VideoRecord, ('channel_title', 'channel_id', 'video_category')),
+    parse_video_url : (VideoUrlRecord, ('channel_id',)),
+    parse_channel_metadata : (ChannelRecord, ('country',)),
+    parse_subscription_descriptive : (SubscriptionRecord, ('subscription_kind',)),
+    parse_playlist_metadata : (PlaylistRecord, ('channel_id', 'channel_name')),
+    parse_comment_metadata : (CommentRecord, ('video_id', 'commenter_channel_url', 'commenter_channel_id',
+                                              'commenter_channel_display_name', 'commenter_rating',
+                                              'comment_parent_id')),
+    parse_rec_video_metadata : (RecVideoRecord, ('channel_title', 'channel_id', 'video_category')),
+}
+
+
+def as_records(parser, intern=None, pool=None):
+    '''
+    Returns ``parser`` returning a namedtuple per item, IE a :class:`VideoRecord` for :func:`parse_video_metadata`,
+    which takes a fraction of the memory of a dict in long-lived datasets. Items that aren't parsed are None.
+    Repeated strings are interned, so the rows of a crawl share one copy of each channel ID.
+
+    .. code-block:: python
+
+        pool = dict()
+        parser = P.as_records(P.parse_comment_metadata, pool=pool)
+        comments = [c for video_id in video_ids for c in yt.get_video_comments(video_id, parser=parser)]
+
+    :param parser: one of the parsers of this module.
+    :type parser: :mod:`youtube_api.parsers module`
+    :param intern: the columns to intern, by default the ones repeated across rows like ``channel_id``.
+    :type intern: list
+    :param pool: the interned strings, shared by the parsers of a crawl. A new one when None.
+    :type pool: dict
+
+    :returns: the parser, with its record type as ``record``.
+    :rtype: callable
+    '''
+    if parser not in _RECORDS:
+        raise ValueError('{} has no record type, expected one of {}.'.format(
+            getattr(parser, '__name__', parser), ', '.join(p.__name__ for p in _RECORDS)))
+    record, repeated = _RECORDS[parser]
+    names = record._fields
+    interned = [names.index(name) for name in (repeated if intern is None else intern)]
+    pool = dict() if pool is None else pool
+    make = record._make
+
+    def parse(item):
+        row = parser(item)
+        if not row:
+            return None
+        values = [row.get(name) for name in names]
+        for i in interned:
+            value = values[i]
+            if value is not None:
+                values[i] = pool.setdefault(value, value)
+        return make(values)
+    parse.fields = parser.fields
+    parse.record = record
+    parse.__name__ = parser.__name__
+    return parse
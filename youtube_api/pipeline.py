@@ -0,0 +1,345 @@
+import queue
+import asyncio
+import inspect
+import threading
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import youtube_api.parsers as P
+from youtube_api.retry import error_reason
+from youtube_api.youtube_api_utils import get_upload_playlist_id
+
+"""
+This script has pipelines that chain client methods over a stream of inputs, with a bounded queue between stages.
+Each stage runs with its own concurrency, and waits when the next stage falls behind instead of buffering without limit.
+"""
+
+__all__ = ['ChannelVideoPipeline', 'AsyncChannelVideoPipeline']
+
+# marks the end of the input of a stage.
+_DONE = object()
+
+# the reason of the 404 error for the uploads playlist of a terminated channel, or one that never uploaded.
+_PLAYLIST_NOT_FOUND = 'playlistNotFound'
+
+class _Failure:
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class _Stopped(Exception):
+    pass
+
+
+@P._reads('snippet/resourceId/videoId')
+def _parse_video_id(item):
+    return item['snippet']['resourceId'].get('videoId')
+
+
+class ChannelVideoPipeline:
+    """
+    Streams the metadata of the videos uploaded by a stream of channels, with the threads of a
+    :class:`youtube_api.youtube_api.YouTubeDataAPI` client.
+
+    The stages run at the same time:
+
+    1. ``playlist_workers`` threads walk the uploads playlist of each channel, see :func:`youtube_api.youtube_api_utils.get_upload_playlist_id`.
+       Channels without an uploads playlist, which the API answers with a 404 "playlistNotFound", are skipped.
+    2. A thread batches the video IDs by ``batch_size``.
+    3. ``metadata_workers`` threads request the metadata of each batch with :meth:`youtube_api.youtube_api.YouTubeDataAPI.get_video_metadata`.
+    4. The calling thread yields the metadata, or passes it to a sink.
+
+    .. code-block:: python
+
+        pipeline = ChannelVideoPipeline(yt, playlist_workers=8, metadata_workers=4)
+        with open('videos.jsonl', 'w') as f:
+            pipeline.run(channel_ids, sink=lambda video: f.write(json.dumps(video, default=str) + '\\n'))
+
+    :param yt: the client, shared by every thread. Set its ``pool_maxsize`` to at least ``playlist_workers + metadata_workers``.
+    :type yt: :class:`youtube_api.youtube_api.YouTubeDataAPI`
+    :param playlist_workers: the number of uploads playlists walked at once.
+    :type playlist_workers: int
+    :param metadata_workers: the number of video metadata batches requested at once.
+    :type metadata_workers: int
+    :param queue_size: the maximum number of items waiting between two stages.
+    :type queue_size: int
+    :param batch_size: the number of video IDs per :meth:`get_video_metadata` request, at most 50.
+    :type batch_size: int
+    :param max_videos: the maximum number of videos per channel, all of them when None.
+    :type max_videos: int
+    :param parser: the function to parse the video metadata.
+    :type parser: :mod:`youtube_api.parsers module`
+    :param part: the parts of the video metadata to request.
+    :type part: list
+    """
+    def __init__(self, yt, playlist_workers=4, metadata_workers=4, queue_size=1000, batch_size=50,
+                 max_videos=None, parser=P.parse_video_metadata, part=['statistics','snippet']):
+        if not 0 < batch_size <= 50:
+            raise ValueError('batch_size must be between 1 and 50, not {}.'.format(batch_size))
+        self.yt = yt
+        self.playlist_workers = playlist_workers
+        self.metadata_workers = metadata_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_videos = max_videos
+        self.parser = parser
+        self.part = part
+
+
+    def stream(self, channel_ids):
+        '''
+        Yields the metadata of the videos uploaded by ``channel_ids``, in the order the batches complete.
+        Stops the stages when a stage raises an exception, and raises it. Channels whose uploads playlist is not found are skipped.
+
+        :param channel_ids: channel IDs IE a generator reading them from a file, consumed as the first stage has room.
+        :type channel_ids: iterable of str
+
+        :returns: yields video metadata.
+        :rtype: dict
+        '''
+        stop = threading.Event()
+        channels = queue.Queue(self.queue_size)
+        video_ids = queue.Queue(self.queue_size)
+        batches = queue.Queue(max(1, self.queue_size // self.batch_size))
+        videos = queue.Queue(self.queue_size)
+
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=.1)
+                    return
+                except queue.Full:
+                    pass
+            raise _Stopped()
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=.1)
+                except queue.Empty:
+                    pass
+            raise _Stopped()
+
+        def read_channels():
+            for channel_id in channel_ids:
+                put(channels, channel_id)
+            for _ in range(self.playlist_workers):
+                put(channels, _DONE)
+
+        def walk_playlists():
+            max_results = {'max_results' : self.max_videos} if self.max_videos else {}
+            while True:
+                channel_id = get(channels)
+                if channel_id is _DONE:
+                    put(video_ids, _DONE)
+                    return
+                try:
+                    for video_id in self.yt.get_videos_from_playlist_id_gen(
+                            get_upload_playlist_id(channel_id), parser=_parse_video_id, **max_results):
+                        put(video_ids, video_id)
+                except requests.HTTPError as e:
+                    if e.response is None or error_reason(e.response.text) != _PLAYLIST_NOT_FOUND:
+                        raise
+
+        def batch_video_ids():
+            batch = []
+            n_done = 0
+            while n_done < self.playlist_workers:
+                video_id = get(video_ids)
+                if video_id is _DONE:
+                    n_done += 1
+                    continue
+                batch.append(video_id)
+                if len(batch) == self.batch_size:
+                    put(batches, batch)
+                    batch = []
+            if batch:
+                put(batches, batch)
+            for _ in range(self.metadata_workers):
+                put(batches, _DONE)
+
+        def get_metadata():
+            while True:
+                batch = get(batches)
+                if batch is _DONE:
+                    put(videos, _DONE)
+                    return
+                for video in self.yt.get_video_metadata(batch, parser=self.parser, part=self.part):
+                    put(videos, video)
+
+        def run(stage):
+            try:
+                stage()
+            except _Stopped:
+                pass
+            except Exception as e:
+                try:
+                    put(videos, _Failure(e))
+                except _Stopped:
+                    pass
+
+        stages = ([read_channels, batch_video_ids] + [walk_playlists] * self.playlist_workers +
+                  [get_metadata] * self.metadata_workers)
+        threads = [threading.Thread(target=run, args=(stage,), daemon=True) for stage in stages]
+        for thread in threads:
+            thread.start()
+        try:
+            n_done = 0
+            while n_done < self.metadata_workers:
+                video = videos.get()
+                if video is _DONE:
+                    n_done += 1
+                elif isinstance(video, _Failure):
+                    raise video.exception
+                else:
+                    yield video
+        finally:
+            stop.set()
+
+
+    def run(self, channel_ids, sink):
+        '''
+        Passes the metadata of the videos uploaded by ``channel_ids`` to ``sink``, see :meth:`stream`.
+
+        :param sink: a function called with the metadata of each video, IE ``videos.append``.
+        :type sink: callable
+
+        :returns: the number of videos passed to ``sink``.
+        :rtype: int
+        '''
+        n_videos = 0
+        for video in self.stream(channel_ids):
+            sink(video)
+            n_videos += 1
+        return n_videos
+
+
+class AsyncChannelVideoPipeline(ChannelVideoPipeline):
+    """
+    Streams the metadata of the videos uploaded by a stream of channels, with the tasks of a
+    :class:`youtube_api.youtube_api_async.AsyncYouTubeDataAPI` client. See :class:`ChannelVideoPipeline`.
+    The requests of every stage also share the client's ``max_concurrency``.
+
+    .. code-block:: python
+
+        async with AsyncYouTubeDataAPI(api_key) as yt:
+            pipeline = AsyncChannelVideoPipeline(yt, playlist_workers=8, metadata_workers=4)
+            async for video in pipeline.stream(channel_ids):
+                ...
+    """
+    async def stream(self, channel_ids):
+        '''
+        Yields the metadata of the videos uploaded by ``channel_ids``, in the order the batches complete.
+        Stops the stages when a stage raises an exception, and raises it. Channels whose uploads playlist is not found are skipped.
+
+        :param channel_ids: channel IDs, an iterable or an async iterable.
+        :type channel_ids: iterable of str
+
+        :returns: yields video metadata.
+        :rtype: dict
+        '''
+        channels = asyncio.Queue(self.queue_size)
+        video_ids = asyncio.Queue(self.queue_size)
+        batches = asyncio.Queue(max(1, self.queue_size // self.batch_size))
+        videos = asyncio.Queue(self.queue_size)
+
+        async def read_channels():
+            if hasattr(channel_ids, '__aiter__'):
+                async for channel_id in channel_ids:
+                    await channels.put(channel_id)
+            else:
+                for channel_id in channel_ids:
+                    await channels.put(channel_id)
+            for _ in range(self.playlist_workers):
+                await channels.put(_DONE)
+
+        async def walk_playlists():
+            max_results = {'max_results' : self.max_videos} if self.max_videos else {}
+            while True:
+                channel_id = await channels.get()
+                if channel_id is _DONE:
+                    await video_ids.put(_DONE)
+                    return
+                try:
+                    async for video_id in self.yt.get_videos_from_playlist_id_gen(
+                            get_upload_playlist_id(channel_id), parser=_parse_video_id, **max_results):
+                        await video_ids.put(video_id)
+                except aiohttp.ClientResponseError as e:
+                    # the message of the error is the reason of the API error, see AsyncYouTubeDataAPI._http_request.
+                    if e.message != _PLAYLIST_NOT_FOUND:
+                        raise
+
+        async def batch_video_ids():
+            batch = []
+            n_done = 0
+            while n_done < self.playlist_workers:
+                video_id = await video_ids.get()
+                if video_id is _DONE:
+                    n_done += 1
+                    continue
+                batch.append(video_id)
+                if len(batch) == self.batch_size:
+                    await batches.put(batch)
+                    batch = []
+            if batch:
+                await batches.put(batch)
+            for _ in range(self.metadata_workers):
+                await batches.put(_DONE)
+
+        async def get_metadata():
+            while True:
+                batch = await batches.get()
+                if batch is _DONE:
+                    await videos.put(_DONE)
+                    return
+                for video in await self.yt.get_video_metadata(batch, parser=self.parser,
+                                                              part=self.part):
+                    await videos.put(video)
+
+        async def run(stage):
+            try:
+                await stage()
+            except Exception as e:
+                await videos.put(_Failure(e))
+
+        stages = ([read_channels, batch_video_ids] + [walk_playlists] * self.playlist_workers +
+                  [get_metadata] * self.metadata_workers)
+        tasks = [asyncio.ensure_future(run(stage)) for stage in stages]
+        try:
+            n_done = 0
+            while n_done < self.metadata_workers:
+                video = await videos.get()
+                if video is _DONE:
+                    n_done += 1
+                elif isinstance(video, _Failure):
+                    raise video.exception
+                else:
+                    yield video
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+    async def run(self, channel_ids, sink):
+        '''
+        Passes the metadata of the videos uploaded by ``channel_ids`` to ``sink``, see :meth:`stream`.
+
+        :param sink: a function or coroutine function called with the metadata of each video.
+        :type sink: callable
+
+        :returns: the number of videos passed to ``sink``.
+        :rtype: int
+        '''
+        n_videos = 0
+        async for video in self.stream(channel_ids):
+            result = sink(video)
+            if inspect.isawaitable(result):
+                await result
+            n_videos += 1
+        return n_videos
+
@@ -0,0 +1,370 @@
+import math
+import inspect
+import datetime
+import functools
+import threading
+import contextlib
+import contextvars
+import collections
+
+try:
+    from zoneinfo import ZoneInfo
+    PACIFIC = ZoneInfo('America/Los_Angeles')
+except Exception:
+    # python < 3.9, dateutil is installed with pandas.
+    try:
+        from dateutil.tz import gettz
+        PACIFIC = gettz('America/Los_Angeles')
+    except ImportError:
+        PACIFIC = None
+    if PACIFIC is None:
+        PACIFIC = datetime.timezone(datetime.timedelta(hours=-8), 'PST')
+
+"""
+This script has the quota costs of the YouTube Data API and the key pool that spreads API calls across keys.
+The daily quota of every API key resets at midnight Pacific time.
+
+Read the docs: https://developers.google.com/youtube/v3/determine_quota_cost
+"""
+
+__all__ = ['QUOTA_COSTS',
+           'quota_cost',
+           'next_quota_reset',
+           'KeyPool',
+           'QuotaLedger',
+           'QuotaPlan',
+           'plan_quota',
+           'QuotaExceededError']
+
+# Quota units of one request to each API resource the clients use.
+QUOTA_COSTS = {
+    'videos' : 1,
+    'channels' : 1,
+    'playlists' : 1,
+    'playlistItems' : 1,
+    'subscriptions' : 1,
+    'commentThreads' : 1,
+    'comments' : 1,
+    'search' : 100,
+}
+
+# API error reasons returned once a key has spent its daily quota.
+QUOTA_EXCEEDED_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+def quota_cost(resource):
+    '''
+    Returns the quota units spent by one request to an API ``resource``, IE "search" or "videos".
+    Any other list request costs 1 unit.
+    '''
+    return QUOTA_COSTS.get(resource, 1)
+
+
+def next_quota_reset(now=None):
+    '''
+    Returns the next midnight in Pacific time, when the daily quota of every API key resets.
+
+    :param now: a timezone-aware datetime, defaults to the current time.
+    :type now: datetime.datetime
+
+    :rtype: datetime.datetime
+    '''
+    now = now if now else datetime.datetime.now(PACIFIC)
+    today = now.astimezone(PACIFIC).date()
+    tomorrow = today + datetime.timedelta(days=1)
+    return datetime.datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=PACIFIC)
+
+
+class KeyPool:
+    """
+    A pool of API keys with a ledger of the quota units each key spent today.
+
+    Every request takes the key that spent the fewest units, so the load is spread evenly.
+    A key that returns ``quotaExceeded`` or reaches ``daily_quota`` is taken out of rotation
+    until the quota resets at midnight Pacific time.
+
+    :param keys: YouTube Data API keys.
+    :type keys: list of str
+    :param daily_quota: the quota units each key can spend per day.
+    :type daily_quota: int
+    """
+    def __init__(self, keys, daily_quota=10000):
+        if isinstance(keys, str):
+            keys = [keys]
+        self.keys = list(keys)
+        self.daily_quota = daily_quota
+        self.usage = {key : 0 for key in self.keys}
+        self._exhausted = set()
+        self._reset_at = next_quota_reset()
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+        return len(self.keys)
+
+
+    def _maybe_reset(self):
+        now = datetime.datetime.now(PACIFIC)
+        if now >= self._reset_at:
+            self.usage = {key : 0 for key in self.keys}
+            self._exhausted = set()
+            self._reset_at = next_quota_reset(now)
+
+
+    def available(self):
+        '''
+        Returns the keys that are still in rotation today.
+
+        :rtype: list of str
+        '''
+        with self._lock:
+            self._maybe_reset()
+            return [key for key in self.keys if key not in self._exhausted]
+
+
+    def acquire(self, units=1):
+        '''
+        Picks the key that spent the fewest quota units today, and charges ``units`` to it.
+
+        :param units: the quota cost of the request, see :func:`quota_cost`.
+        :type units: int
+
+        :returns: an API key
+        :rtype: str
+        '''
+        with self._lock:
+            self._maybe_reset()
+            candidates = [key for key in self.keys
+                          if key not in self._exhausted
+                          and self.usage[key] + units <= self.daily_quota]
+            if not candidates:
+                raise QuotaExceededError('Every API key has spent its daily quota, '
+                                         'the quota resets at {}.'.format(self._reset_at))
+            key = min(candidates, key=self.usage.get)
+            self.usage[key] += units
+            return key
+
+
+    def remaining(self):
+        '''
+        Returns the quota units the keys in rotation can still spend today.
+
+        :rtype: int
+        '''
+        with self._lock:
+            self._maybe_reset()
+            return sum(max(0, self.daily_quota - self.usage[key])
+                       for key in self.keys if key not in self._exhausted)
+
+
+    def exhaust(self, key):
+        '''
+        Takes ``key`` out of rotation until the next quota reset.
+
+        :returns: True if other keys are still in rotation.
+        :rtype: bool
+        '''
+        with self._lock:
+            self._exhausted.add(key)
+            return len(self._exhausted) < len(self.keys)
+
+
+class QuotaLedger:
+    """
+    Records the requests sent and quota units spent by each method of the client,
+    and by each API resource.
+
+    ``units`` and ``requests`` are counters keyed by method name, IE ``ledger.units['get_video_metadata']``.
+    ``resource_units`` is keyed by API resource, IE ``ledger.resource_units['search']``.
+    """
+    _method = contextvars.ContextVar('quota_method', default=None)
+
+    def __init__(self):
+        self.units = collections.Counter()
+        self.requests = collections.Counter()
+        self.resource_units = collections.Counter()
+        self._lock = threading.Lock()
+
+
+    @property
+    def total(self):
+        '''
+        The quota units spent by every API call so far.
+        '''
+        return sum(self.resource_units.values())
+
+
+    @contextlib.contextmanager
+    def method(self, name):
+        '''
+        Charges the requests sent inside the ``with`` block to the method ``name``.
+        Nested methods are charged to the outermost one.
+        '''
+        if self._method.get() is not None:
+            yield
+            return
+        token = self._method.set(name)
+        try:
+            yield
+        finally:
+            self._method.reset(token)
+
+
+    def record(self, resource, units):
+        '''
+        Records one request to ``resource`` that spent ``units``.
+        '''
+        method = self._method.get()
+        with self._lock:
+            self.resource_units[resource] += units
+            if method:
+                self.units[method] += units
+                self.requests[method] += 1
+
+
+def count_quota(func):
+    '''
+    Decorates a client method so the requests it sends are charged to it in the client's ``quota_ledger``.
+    Works on functions, generators, coroutines and async generators.
+    '''
+    name = func.__name__
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            gen = func(self, *args, **kwargs)
+            try:
+                while True:
+                    with self.quota_ledger.method(name):
+                        try:
+                            item = await gen.__anext__()
+                        except StopAsyncIteration:
+                            return
+                    yield item
+            finally:
+                await gen.aclose()
+    elif inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with self.quota_ledger.method(name):
+                return await func(self, *args, **kwargs)
+    elif inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            gen = func(self, *args, **kwargs)
+            try:
+                while True:
+                    with self.quota_ledger.method(name):
+                        try:
+                            item = next(gen)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                gen.close()
+    else:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.quota_ledger.method(name):
+                return func(self, *args, **kwargs)
+    return wrapper
+
+
+class QuotaPlan(collections.namedtuple('QuotaPlan', ['requests', 'units'])):
+    """
+    The estimated number of requests and quota units of an API call. Plans can be added together.
+    """
+    def __add__(self, other):
+        return QuotaPlan(self.requests + other.requests, self.units + other.units)
+
+
+def _n_pages(n_items, page_size):
+    return max(1, int(math.ceil(n_items / float(page_size))))
+
+
+def _plan_ids(resource):
+    def plan(video_id=None, channel_id=None, **kwargs):
+        ids = video_id if video_id is not None else channel_id
+        n_requests = 1 if isinstance(ids, str) else _n_pages(len(ids), 50)
+        return QuotaPlan(n_requests, n_requests * quota_cost(resource))
+    return plan
+
+
+def _plan_pages(resource, page_size):
+    def plan(max_results=None, n_items=None, **kwargs):
+        limits = [n for n in (max_results, n_items) if n]
+        n_requests = _n_pages(min(limits), page_size) if limits else 1
+        return QuotaPlan(n_requests, n_requests * quota_cost(resource))
+    return plan
+
+
+def _plan_search(max_results=None, n_items=None, **kwargs):
+    # search stops at about 500 results.
+    return _plan_pages('search', 50)(max_results=max_results or 500, n_items=n_items)
+
+
+def _plan_search_exhaustive(max_results=None, n_items=None, window_results=450, **kwargs):
+    # windows are halved until each has about window_results, the first page of every split window is extra.
+    limits = [n for n in (max_results, n_items) if n]
+    n_results = min(limits) if limits else window_results
+    n_windows = 2 ** int(math.ceil(math.log(max(1, n_results / float(window_results)), 2)))
+    n_requests = n_windows * _n_pages(n_results / float(n_windows), 50) + n_windows - 1
+    return QuotaPlan(n_requests, n_requests * quota_cost('search'))
+
+
+def _plan_comments(max_results=None, n_items=None, get_replies=True, n_replies=0, **kwargs):
+    threads = _plan_pages('commentThreads', 100)(max_results=max_results, n_items=n_items)
+    if get_replies and n_replies:
+        threads += QuotaPlan(n_replies, n_replies * quota_cost('comments'))
+    return threads
+
+
+_PLANNERS = {
+    'get_channel_id_from_user' : lambda **kwargs: QuotaPlan(1, quota_cost('channels')),
+    'get_video_metadata' : _plan_ids('videos'),
+    'get_video_metadata_gen' : _plan_ids('videos'),
+    'get_channel_metadata' : _plan_ids('channels'),
+    'get_channel_metadata_gen' : _plan_ids('channels'),
+    'get_featured_channels' : _plan_ids('channels'),
+    'get_featured_channels_gen' : _plan_ids('channels'),
+    'get_playlists' : _plan_pages('playlists', 50),
+    'get_playlists_gen' : _plan_pages('playlists', 50),
+    'get_subscriptions' : _plan_pages('subscriptions', 50),
+    'get_subscriptions_gen' : _plan_pages('subscriptions', 50),
+    'get_videos_from_playlist_id' : _plan_pages('playlistItems', 50),
+    'get_videos_from_playlist_id_gen' : _plan_pages('playlistItems', 50),
+    'get_video_comments' : _plan_comments,
+    'get_video_comments_gen' : _plan_comments,
+    'search' : _plan_search,
+    'search_gen' : _plan_search,
+    'search_exhaustive' : _plan_search_exhaustive,
+    'search_exhaustive_gen' : _plan_search_exhaustive,
+    'get_recommended_videos' : _plan_search,
+}
+
+
+def plan_quota(method, *args, n_items=None, n_replies=0, **kwargs):
+    '''
+    Estimates the requests and quota units of a client method before running it, without calling the API.
+
+    For paginated methods the number of items is not known in advance.
+    Pass ``n_items``, IE the video count of a channel for its uploads playlist, otherwise ``max_results`` or a single page is assumed.
+    For :meth:`get_video_comments`, ``n_replies`` is the number of comment threads with more than 5 replies,
+    the others come with their comment thread.
+
+    :param method: a method of the client, IE ``yt.get_video_metadata``.
+    :param args: the arguments the method would be called with.
+
+    :rtype: QuotaPlan
+    '''
+    name = method.__name__
+    if name not in _PLANNERS:
+        raise ValueError('Cannot plan the quota of {}.'.format(name))
+    arguments = inspect.signature(method).bind_partial(*args, **kwargs)
+    arguments.apply_defaults()
+    arguments = dict(arguments.arguments)
+    arguments.pop('kwargs', None)
+    return _PLANNERS[name](n_items=n_items, n_replies=n_replies, **arguments)
@@ -0,0 +1,140 @@
+import os
+import time
+import hashlib
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+"""
+This script has token bucket rate limiters that pace the API calls of the YouTubeDataAPI clients.
+There is one bucket per API key and API resource, IE the "search" calls of one key.
+"""
+
+__all__ = ['RateLimiter', 'FileRateLimiter']
+
+def _refill(tokens, updated, now, rate, capacity):
+    '''
+    Returns the tokens in a bucket last updated at ``updated`` that refills at ``rate`` tokens per second.
+    '''
+    return min(capacity, tokens + max(0., now - updated) * rate)
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket rate limiter, with one bucket per API key and API resource.
+    Share one instance between the threads, or clients, of a process.
+
+    :param rate: the requests per second allowed for each key and resource.
+    :type rate: float
+    :param burst: how many requests can be sent at once after a pause, defaults to ``rate``.
+    :type burst: int
+    :param rates: the requests per second for specific resources, IE {'search' : 1}.
+    :type rates: dict
+    """
+    def __init__(self, rate=10, burst=None, rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.rates = rates if rates else dict()
+        self._buckets = dict()
+        self._lock = threading.Lock()
+
+
+    def _limits(self, resource):
+        rate = self.rates.get(resource, self.rate)
+        capacity = self.burst if self.burst else max(1., rate)
+        return rate, capacity
+
+
+    def try_acquire(self, key, resource):
+        '''
+        Takes a token from the bucket of ``key`` and ``resource`` if there is one.
+
+        :returns: 0 if a token was taken, otherwise the seconds to wait before trying again.
+        :rtype: float
+        '''
+        rate, capacity = self._limits(resource)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get((key, resource), (capacity, now))
+            tokens = _refill(tokens, updated, now, rate, capacity)
+            if tokens >= 1:
+                self._buckets[(key, resource)] = (tokens - 1, now)
+                return 0.
+            self._buckets[(key, resource)] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+    def acquire(self, key, resource):
+        '''
+        Blocks until a request to ``resource`` with ``key`` is allowed.
+        '''
+        while True:
+            wait = self.try_acquire(key, resource)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    A token bucket rate limiter shared between the processes of one host.
+    Each bucket is a small file in ``directory``, updated under an exclusive file lock.
+    Point every worker process at the same ``directory``.
+
+    Requires ``fcntl``, so it is not available on Windows.
+
+    :param directory: where the bucket files are kept.
+    :type directory: str
+    :param rate: the requests per second allowed for each key and resource.
+    :type rate: float
+    :param burst: how many requests can be sent at once after a pause, defaults to ``rate``.
+    :type burst: int
+    :param rates: the requests per second for specific resources, IE {'search' : 1}.
+    :type rates: dict
+    """
+    def __init__(self, directory, rate=10, burst=None, rates=None):
+        if fcntl is None:
+            raise ImportError('FileRateLimiter requires fcntl, which is not available on this platform.')
+        super().__init__(rate=rate, burst=burst, rates=rates)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+
+    def _bucket_path(self, key, resource):
+        # API keys are hashed so they are not written to disk.
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, '{}-{}.bucket'.format(digest, resource))
+
+
+    def try_acquire(self, key, resource):
+        '''
+        Takes a token from the bucket file of ``key`` and ``resource`` if there is one.
+
+        :returns: 0 if a token was taken, otherwise the seconds to wait before trying again.
+        :rtype: float
+        '''
+        rate, capacity = self._limits(resource)
+        with open(self._bucket_path(key, resource), 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # wall clock time, so every process agrees on it.
+                now = time.time()
+                f.seek(0)
+                try:
+                    tokens, updated = map(float, f.read().split())
+                except ValueError:
+                    tokens, updated = capacity, now
+                tokens = _refill(tokens, updated, now, rate, capacity)
+                wait = 0. if tokens >= 1 else (1 - tokens) / rate
+                if not wait:
+                    tokens -= 1
+                f.seek(0)
+                f.truncate()
+                f.write('{} {}'.format(tokens, now))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
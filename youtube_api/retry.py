@@ -0,0 +1,120 @@
+import json
+import random
+import datetime
+from email.utils import parsedate_to_datetime
+
+from youtube_api.quota import QUOTA_EXCEEDED_REASONS
+
+"""
+This script has the retry policy used by the YouTubeDataAPI clients to retry failed API calls.
+"""
+
+__all__ = ['RetryPolicy', 'error_reason']
+
+def error_reason(response_text):
+    '''
+    Returns the ``reason`` of the first error in a YouTube Data API error response, IE "quotaExceeded".
+    Returns None if the response is not an API error.
+    '''
+    try:
+        errors = json.loads(response_text)['error']['errors']
+        return errors[0].get('reason')
+    except Exception:
+        return None
+
+
+def _parse_retry_after(retry_after):
+    '''
+    Converts the value of a Retry-After header, in seconds or as an HTTP date, to seconds.
+    '''
+    try:
+        return max(0., float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    try:
+        date = parsedate_to_datetime(retry_after)
+        now = datetime.datetime.now(date.tzinfo)
+        return max(0., (date - now).total_seconds())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Decides which failed API calls are retried, and how long to wait between attempts.
+
+    Connection errors, timeouts and responses with a status in ``status_forcelist`` are retried.
+    API errors are also retried when their reason is in ``retry_reasons``,
+    so a 403 ``rateLimitExceeded`` is retried, but a 403 ``quotaExceeded`` is not.
+
+    :param max_retries: How many times to retry an API call.
+    :type max_retries: int
+    :param backoff_factor: The wait before the first retry. Doubles after every retry.
+    :type backoff_factor: float
+    :param max_backoff: The longest wait between two attempts, in seconds.
+    :type max_backoff: float
+    :param jitter: randomize the waits between 0 and the exponential backoff.
+    :type jitter: bool
+    :param status_forcelist: Retry when any of these http response codes are returned.
+    :type status_forcelist: list
+    :param retry_reasons: Retry API errors with any of these reasons.
+    :type retry_reasons: list
+    :param respect_retry_after: wait at least as long as the Retry-After header of the response.
+    :type respect_retry_after: bool
+    """
+    non_retryable_reasons = QUOTA_EXCEEDED_REASONS
+
+    def __init__(self, max_retries=3, backoff_factor=.5, max_backoff=64, jitter=True,
+                 status_forcelist=[429, 500, 502, 503, 504],
+                 retry_reasons=['rateLimitExceeded', 'userRateLimitExceeded', 'backendError'],
+                 respect_retry_after=True):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = set(status_forcelist)
+        self.retry_reasons = set(retry_reasons)
+        self.respect_retry_after = respect_retry_after
+
+
+    def should_retry(self, attempt, status_code=None, reason=None):
+        '''
+        Whether to retry an API call that failed for the ``attempt``-th time.
+
+        :param attempt: how many retries were already made for the API call.
+        :type attempt: int
+        :param status_code: the http status code of the response, None for connection errors and timeouts.
+        :type status_code: int
+        :param reason: the API error reason of the response, see :func:`error_reason`.
+        :type reason: str
+
+        :rtype: bool
+        '''
+        if attempt >= self.max_retries:
+            return False
+        if status_code is None:
+            return True
+        if reason in self.non_retryable_reasons:
+            return False
+        return status_code in self.status_forcelist or reason in self.retry_reasons
+
+
+    def get_backoff(self, attempt, retry_after=None):
+        '''
+        How long to wait, in seconds, before the next retry.
+
+        :param attempt: how many retries were already made for the API call.
+        :type attempt: int
+        :param retry_after: the Retry-After header of the response.
+        :type retry_after: str
+
+        :rtype: float
+        '''
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        if self.respect_retry_after and retry_after:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                backoff = max(backoff, delay)
+        return backoff
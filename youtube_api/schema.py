@@ -0,0 +1,372 @@
+from collections import namedtuple, OrderedDict
+
+import youtube_api.parsers as P
+from youtube_api.youtube_api_utils import parse_yt_datetime, parse_yt_duration
+
+"""
+This script has declarative parsers. A schema maps column names to the JSON path of each value in an API item,
+with a function to convert it, and is compiled once into a function which reads all of them.
+Select the columns you need, and the clients only request their paths with the ``fields`` mask.
+"""
+
+__all__ = ['Field',
+           'Schema',
+           'register_schema',
+           'get_schema',
+           'schema_names']
+
+Field = namedtuple('Field', ['path', 'convert'])
+Field.__new__.__defaults__ = (None,)
+Field.__doc__ = '''
+A column of a :class:`Schema`.
+
+:param path: the JSON path of the value in an API item, IE "contentDetails/duration".
+    A column without a path holds the collection_date of each item, see :func:`youtube_api.parsers.parse_context`.
+:type path: str
+:param convert: a function applied to values that aren't missing, IE :func:`youtube_api.youtube_api_utils.parse_yt_duration`.
+:type convert: callable
+'''
+
+# the value of a missing object along a path.
+_EMPTY = {}
+
+
+def _compile(columns, record=None, interned=(), pool=None):
+    '''
+    Returns a function reading ``columns`` from an item, which looks up each object along the paths once.
+    It returns a ``record`` if given, with the values of the ``interned`` columns from ``pool``.
+    '''
+    namespace = {'_EMPTY' : _EMPTY, 'collection_date' : P.collection_date, 'record' : record, 'pool' : pool}
+    nodes = {() : 'item'}
+    lines = ['def extract(item):']
+    values = []
+    for i, (name, field) in enumerate(columns.items()):
+        if field.path is None:
+            values.append('collection_date()' if record else '{!r} : collection_date()'.format(name))
+            continue
+        keys = tuple(field.path.split('/'))
+        for depth in range(1, len(keys)):
+            if keys[:depth] not in nodes:
+                nodes[keys[:depth]] = 'n{}'.format(len(nodes))
+                lines.append('    {} = {}.get({!r}) or _EMPTY'.format(
+                    nodes[keys[:depth]], nodes[keys[:depth - 1]], keys[depth - 1]))
+        lines.append('    v{} = {}.get({!r})'.format(i, nodes[keys[:-1]], keys[-1]))
+        if field.convert:
+            namespace['convert{}'.format(i)] = field.convert
+            lines.append('    if v{0} is not None: v{0} = convert{0}(v{0})'.format(i))
+        if name in interned:
+            lines.append('    if v{0} is not None: v{0} = pool.setdefault(v{0}, v{0})'.format(i))
+        values.append('v{}'.format(i) if record else '{!r} : v{}'.format(name, i))
+    if record:
+        lines.append('    return record({})'.format(', '.join(values)))
+    else:
+        lines.append('    return {{{}}}'.format(', '.join(values)))
+    exec('\n'.join(lines), namespace)
+    return namespace['extract']
+
+
+def _extract(columns, item):
+    '''
+    Reads ``columns`` from an item one path at a time, for items with an unexpected shape along a path.
+    '''
+    row = dict()
+    for name, field in columns.items():
+        if field.path is None:
+            row[name] = P.collection_date()
+            continue
+        value = item
+        for key in field.path.split('/'):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None and field.convert:
+            value = field.convert(value)
+        row[name] = value
+    return row
+
+
+class Schema:
+    """
+    A parser declared as a map from column names to the JSON path of each value in an API item,
+    compiled once into a function which reads them. Missing values are None.
+    Use it as the ``parser`` of any client method, the client requests the ``fields`` of its columns.
+
+    .. code-block:: python
+
+        from youtube_api.schema import get_schema
+
+        schema = get_schema('video').select('video_id', 'video_view_count') + get_schema('video_content_details')
+        videos = yt.get_video_metadata(video_ids, parser=schema, part=['statistics', 'contentDetails'])
+
+    :param columns: the column names, and the JSON path of each or a :class:`Field`.
+    :type columns: dict
+    :param prepare: a function which reshapes each item before its columns are read.
+    :type prepare: callable
+    :param fields: a function from the paths of the columns to the ``fields`` attribute of a parser,
+        for items reshaped by ``prepare``. See :func:`youtube_api.parsers._reads`.
+    :type fields: callable
+    :param record: the namedtuple type to return instead of a dict, see :meth:`records`.
+    :type record: type
+    :param intern: the columns whose strings are shared through ``pool``.
+    :type intern: list
+    :param pool: the interned strings.
+    :type pool: dict
+    """
+    def __init__(self, columns, prepare=None, fields=None, record=None, intern=(), pool=None):
+        self.columns = OrderedDict((name, field if isinstance(field, Field) else Field(field))
+                                   for name, field in columns.items())
+        self.prepare = prepare
+        self._fields = fields
+        paths = [field.path for field in self.columns.values() if field.path]
+        self.fields = fields(paths) if fields else {None : paths}
+        self.record = record
+        self.intern = tuple(intern)
+        self.pool = pool
+        self._extract = _compile(self.columns, record, self.intern, pool)
+
+
+    def __call__(self, item):
+        '''
+        Reads the columns of an API item.
+
+        :param item: json document
+        :type item: dict
+
+        :returns: parsed dictionary, or a ``record``, see :meth:`records`.
+        :rtype: dict
+        '''
+        if not isinstance(item, dict):
+            return None if self.record else dict()
+        if self.prepare:
+            item = self.prepare(item)
+        try:
+            return self._extract(item)
+        except (AttributeError, TypeError):
+            row = _extract(self.columns, item)
+            if not self.record:
+                return row
+            for name in self.intern:
+                if row[name] is not None:
+                    row[name] = self.pool.setdefault(row[name], row[name])
+            return self.record(**row)
+
+
+    def records(self, name='Record', intern=(), pool=None):
+        '''
+        Returns the schema returning a namedtuple per item instead of a dict, its type is ``record``.
+        A tuple takes a fraction of the memory of a dict in long-lived datasets.
+        The strings of the ``intern`` columns are shared by the rows, IE the channel IDs of the videos of a crawl.
+
+        .. code-block:: python
+
+            schema = get_schema('comment').records('Comment', intern=['video_id', 'commenter_channel_id'])
+            comments = yt.get_video_comments(video_id, parser=schema)
+
+        :param name: the name of the record type.
+        :type name: str
+        :param intern: the columns to intern.
+        :type intern: list
+        :param pool: the interned strings, shared by the schemas of a crawl. A new one when None.
+        :type pool: dict
+
+        :rtype: :class:`Schema`
+        '''
+        unknown = [column for column in intern if column not in self.columns]
+        if unknown:
+            raise ValueError('Unknown columns {}, expected some of {}.'.format(
+                ', '.join(unknown), ', '.join(self.columns)))
+        return Schema(self.columns, prepare=self.prepare, fields=self._fields,
+                      record=namedtuple(name, list(self.columns)), intern=intern,
+                      pool=dict() if pool is None else pool)
+
+
+    def _with_columns(self, columns):
+        if not self.record:
+            return Schema(columns, prepare=self.prepare, fields=self._fields)
+        return Schema(columns, prepare=self.prepare, fields=self._fields,
+                      record=namedtuple(self.record.__name__, list(columns)),
+                      intern=[name for name in self.intern if name in columns], pool=self.pool)
+
+
+    def select(self, *names):
+        '''
+        Returns a schema of the columns ``names`` only, in that order.
+
+        :param names: column names, IE "video_id".
+        :type names: str
+
+        :rtype: :class:`Schema`
+        '''
+        unknown = [name for name in names if name not in self.columns]
+        if unknown:
+            raise ValueError('Unknown columns {}, expected some of {}.'.format(
+                ', '.join(unknown), ', '.join(self.columns)))
+        return self._with_columns(OrderedDict((name, self.columns[name]) for name in names))
+
+
+    def __add__(self, other):
+        '''
+        Returns a schema with the columns of both schemas, IE a registered schema of another part.
+        '''
+        if other.prepare is not self.prepare:
+            raise ValueError('Can only add schemas of the same resource.')
+        columns = OrderedDict(self.columns)
+        columns.update(other.columns)
+        return self._with_columns(columns)
+
+
+    def __repr__(self):
+        if self.record:
+            return 'Schema({}).records({!r})'.format(', '.join(self.columns), self.record.__name__)
+        return 'Schema({})'.format(', '.join(self.columns))
+
+
+_SCHEMAS = dict()
+
+def register_schema(name, schema):
+    '''
+    Registers a schema under ``name``, so :func:`get_schema` returns it.
+    Replaces a schema with the same name.
+
+    .. code-block:: python
+
+        register_schema('video_topics', Schema({'video_id' : 'id',
+                                                'topic_categories' : 'topicDetails/topicCategories'}))
+
+    :param name: the name of the schema.
+    :type name: str
+    :param schema: the schema, or a map of column names to paths.
+    :type schema: :class:`Schema` or dict
+
+    :rtype: :class:`Schema`
+    '''
+    if not isinstance(schema, Schema):
+        schema = Schema(schema)
+    _SCHEMAS[name] = schema
+    return schema
+
+
+def get_schema(name, columns=None):
+    '''
+    Returns the schema registered under ``name``, with only ``columns`` if given.
+
+    :param name: the name of the schema, see :func:`schema_names`.
+    :type name: str
+    :param columns: the column names to keep.
+    :type columns: list
+
+    :rtype: :class:`Schema`
+    '''
+    if name not in _SCHEMAS:
+        raise ValueError('Unknown schema "{}", expected one of {}.'.format(name, ', '.join(schema_names())))
+    schema = _SCHEMAS[name]
+    return schema.select(*columns) if columns else schema
+
+
+def schema_names():
+    '''
+    Returns the names of the registered schemas.
+
+    :rtype: list
+    '''
+    return sorted(_SCHEMAS)
+
+
+def _comment_fields(paths):
+    '''
+    Requests the paths of the comments of threads and replies, see :func:`youtube_api.parsers._comment_view`.
+    '''
+    comment_paths = [path for path in paths if path != 'totalReplyCount']
+    return {'commentThreads' : ['id', 'snippet/totalReplyCount'] +
+                               ['snippet/topLevelComment/' + path for path in comment_paths] +
+                               ['replies/comments/' + path for path in comment_paths],
+            'comments' : comment_paths}
+
+
+def _join(values):
+    return '|'.join(values)
+
+
+register_schema('video', Schema(OrderedDict([
+    ('video_id', 'id'),
+    ('channel_title', 'snippet/channelTitle'),
+    ('channel_id', 'snippet/channelId'),
+    ('video_publish_date', Field('snippet/publishedAt', parse_yt_datetime)),
+    ('video_title', 'snippet/title'),
+    ('video_description', 'snippet/description'),
+    ('video_category', 'snippet/categoryId'),
+    ('video_view_count', Field('statistics/viewCount', int)),
+    ('video_comment_count', Field('statistics/commentCount', int)),
+    ('video_like_count', Field('statistics/likeCount', int)),
+    ('video_dislike_count', Field('statistics/dislikeCount', int)),
+    ('video_thumbnail', 'snippet/thumbnails/high/url'),
+    ('video_tags', Field('snippet/tags', _join)),
+    ('collection_date', Field(None)),
+])))
+
+# part=contentDetails
+register_schema('video_content_details', Schema(OrderedDict([
+    ('video_id', 'id'),
+    ('video_duration', Field('contentDetails/duration', parse_yt_duration)),
+    ('video_dimension', 'contentDetails/dimension'),
+    ('video_definition', 'contentDetails/definition'),
+    ('video_caption', 'contentDetails/caption'),
+    ('video_licensed_content', 'contentDetails/licensedContent'),
+    ('video_projection', 'contentDetails/projection'),
+])))
+
+# part=liveStreamingDetails, only set for live streams and premieres.
+register_schema('video_live_streaming', Schema(OrderedDict([
+    ('video_id', 'id'),
+    ('live_actual_start_time', Field('liveStreamingDetails/actualStartTime', parse_yt_datetime)),
+    ('live_actual_end_time', Field('liveStreamingDetails/actualEndTime', parse_yt_datetime)),
+    ('live_scheduled_start_time', Field('liveStreamingDetails/scheduledStartTime', parse_yt_datetime)),
+    ('live_scheduled_end_time', Field('liveStreamingDetails/scheduledEndTime', parse_yt_datetime)),
+    ('live_concurrent_viewers', Field('liveStreamingDetails/concurrentViewers', int)),
+    ('live_chat_id', 'liveStreamingDetails/activeLiveChatId'),
+])))
+
+register_schema('channel', Schema(OrderedDict([
+    ('channel_id', 'id'),
+    ('title', 'snippet/title'),
+    ('account_creation_date', Field('snippet/publishedAt', parse_yt_datetime)),
+    ('description', 'snippet/description'),
+    ('country', 'snippet/country'),
+    ('view_count', Field('statistics/viewCount', int)),
+    ('video_count', Field('statistics/videoCount', int)),
+    ('subscription_count', Field('statistics/subscriberCount', int)),
+    ('playlist_id_uploads', 'contentDetails/relatedPlaylists/uploads'),
+    ('collection_date', Field(None)),
+])))
+
+register_schema('playlist_item', Schema(OrderedDict([
+    ('video_id', 'snippet/resourceId/videoId'),
+    ('channel_id', 'snippet/channelId'),
+    ('publish_date', Field('snippet/publishedAt', parse_yt_datetime)),
+    ('collection_date', Field(None)),
+])))
+
+register_schema('search', Schema(OrderedDict([
+    ('video_id', 'id/videoId'),
+    ('channel_title', 'snippet/channelTitle'),
+    ('channel_id', 'snippet/channelId'),
+    ('video_publish_date', Field('snippet/publishedAt', parse_yt_datetime)),
+    ('video_title', 'snippet/title'),
+    ('video_description', 'snippet/description'),
+    ('video_thumbnail', 'snippet/thumbnails/high/url'),
+    ('collection_date', Field(None)),
+])))
+
+# comment threads and replies, like youtube_api.parsers.parse_comment_metadata.
+register_schema('comment', Schema(OrderedDict([
+    ('video_id', 'snippet/videoId'),
+    ('commenter_channel_url', 'snippet/authorChannelUrl'),
+    ('commenter_channel_id', 'snippet/authorChannelId/value'),
+    ('commenter_channel_display_name', 'snippet/authorDisplayName'),
+    ('comment_id', 'id'),
+    ('comment_like_count', 'snippet/likeCount'),
+    ('comment_publish_date', Field('snippet/publishedAt', parse_yt_datetime)),
+    ('text', 'snippet/textDisplay'),
+    ('commenter_rating', 'snippet/viewerRating'),
+    ('comment_parent_id', 'snippet/parentId'),
+    ('collection_date', Field(None)),
+    ('reply_count', 'totalReplyCount'),
+]), prepare=P._comment_view, fields=_comment_fields))
@@ -1,10 +1,13 @@
 import sys
 import time
 import requests
-from requests.packages.urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 import datetime
 import warnings
+import threading
+import contextvars
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 warnings.filterwarnings("ignore", message="numpy.dtype size changed")
 warnings.filterwarnings("ignore", message="numpy.ufunc size changed")
 import pandas as pd
@@ -13,6 +16,27 @@ from youtube_api.youtube_api_utils import (
     _load_response,
     parse_yt_datetime,
     _chunker,
+    _search_query,
+    _endpoint_resource,
+    _with_fields,
+    _replies_truncated,
+    _timestamp,
+    _search_item_id,
+    _compact_id,
+    _watermark,
+    _new_items,
+    _next_watermark,
+)
+from youtube_api.retry import RetryPolicy, error_reason
+from youtube_api.decoders import get_decoder
+from youtube_api.adapters import HTTP2Adapter
+from youtube_api.quota import (
+    KeyPool,
+    QuotaLedger,
+    count_quota,
+    plan_quota,
+    quota_cost,
+    QUOTA_EXCEEDED_REASONS,
 )
 import youtube_api.parsers as P
 
@@ -22,85 +46,417 @@ This script has the YouTubeDataAPI class and functions for the API's endpoints.
 
 __all__ = ['YoutubeDataApi', 'YouTubeDataAPI']
 
+def _pop_completed(pending, ordered):
+    '''
+    Removes and returns finished futures from the ``pending`` deque.
+    When ``ordered``, waits for and returns only the oldest future.
+    '''
+    if ordered:
+        return [pending.popleft()]
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+    return done
+
 class YouTubeDataAPI:
     """
     The Youtube Data API handles the keys and methods to access data from the YouTube Data API
 
      :param key: YouTube Data API key. Get a YouTube Data API key here: https://console.cloud.google.com/apis/dashboard
+         Pass a list of keys, or a :class:`youtube_api.quota.KeyPool`, to spread API calls across keys.
+         Keys that run out of quota are skipped until the quota resets.
+     :param retry_policy: which failed API calls to retry and how long to wait in between, see :class:`youtube_api.retry.RetryPolicy`.
+     :param pool_connections: how many connection pools to cache.
+     :param pool_maxsize: how many connections to keep alive per host. Set it to at least the number of threads sharing the client.
+     :param http2: send requests over HTTP/2 with :class:`youtube_api.adapters.HTTP2Adapter`, requires ``httpx[http2]``.
+     :param rate_limiter: paces API calls per key and resource, see :mod:`youtube_api.rate_limit`. Share it between clients and threads.
+     :param cache: a response cache such as :class:`youtube_api.cache.SQLiteCache`, so repeated API calls don't spend quota.
+     :param id_cache: a :class:`youtube_api.cache.IDCache` of videos and channels by ID. Lists of IDs are deduplicated, and cached IDs are not requested again.
+     :param etag_store: a :class:`youtube_api.cache.ETagStore`. Repeated API calls send the stored ETag, and unchanged responses are not downloaded or parsed again.
+     :param partial_responses: request only the JSON paths the parser reads, with a ``fields`` mask. Parsers declare their paths in a ``fields`` attribute.
+     :param json_decoder: the JSON decoder for responses, IE "orjson", see :mod:`youtube_api.decoders`. Defaults to the fastest one installed.
+     :param checkpoint_store: a :class:`youtube_api.checkpoint.SQLiteCheckpointStore`. Paginated methods save their progress after each page, and continue from it when called again with the same arguments.
+     :param prefetch: request the next page of paginated methods in the background while the current page is parsed and yielded. A page that is never read still spends quota.
+     :param watermark_store: a :class:`youtube_api.checkpoint.SQLiteWatermarkStore`. Playlist walks stop at the videos collected by the last walk of the playlist, and save the mark of the newest videos.
     """
     def __init__(
-        self, key, api_version='3', verify_api_key=True, verbose=False, timeout=20
+        self, key, api_version='3', verify_api_key=True, verbose=False, timeout=20,
+        retry_policy=None, pool_connections=10, pool_maxsize=10, http2=False,
+        rate_limiter=None, cache=None, id_cache=None, etag_store=None, partial_responses=True,
+        json_decoder=None, checkpoint_store=None, prefetch=False,
+        watermark_store=None
     ):
         """
         :param key: YouTube Data API key
         Get a YouTube Data API key here: https://console.cloud.google.com/apis/dashboard
         """
-        self.key = key
+        self.key_pool = key if isinstance(key, KeyPool) else KeyPool(key if key else [])
+        self.key = self.key_pool.keys[0] if len(self.key_pool) else None
         self.api_version = int(api_version)
         self.verbose = verbose
         self._timeout = timeout
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.id_cache = id_cache
+        self.etag_store = etag_store
+        self.partial_responses = partial_responses
+        self._loads = get_decoder(json_decoder)
+        self.checkpoint_store = checkpoint_store
+        self.prefetch = prefetch
+        self.watermark_store = watermark_store
+        # retries per API resource IE {'commentThreads' : 2}, and for the last API call of each thread or task.
+        self.retry_counts = collections.Counter()
+        self._last_retries = contextvars.ContextVar('last_retries', default=0)
+        # quota units spent per method and per API resource.
+        self.quota_ledger = QuotaLedger()
+        self._lock = threading.Lock()
 
         # check API Key
         if not self.key:
             raise ValueError('No API key used to initate the class.')
+
+        # creates a requests sessions for API calls.
+        self._create_session(pool_connections=pool_connections,
+                             pool_maxsize=pool_maxsize,
+                             http2=http2)
+
         if verify_api_key and not self.verify_key():
             raise ValueError('The API Key is invalid')
 
-        # creates a requests sessions for API calls.
-        self._create_session()
+
+    @property
+    def last_retries(self):
+        '''
+        The number of retries of the last API call sent by the current thread or task,
+        so concurrent calls don't overwrite each other's count.
+        '''
+        return self._last_retries.get()
 
 
     def verify_key(self):
         '''
-        Checks it the API key is valid.
+        Checks it the API keys are valid.
 
-        :returns: True if the API key is valid, False if the key is not valid.
+        :returns: True if every API key is valid, False if a key is not valid.
         :rtype: bool
         '''
         http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlists"
                          "?part=id&id=UC_x5XG1OV2P6uZZ5FSM9Ttw&"
-                         "key={}&maxResults=2".format(self.api_version, self.key))
-        response = requests.get(http_endpoint)
-        try:
-            response.raise_for_status()
-            return True
-        except:
-            return False
+                         "maxResults=2".format(self.api_version))
+        for key in self.key_pool.keys:
+            response = self.session.get(http_endpoint + '&key={}'.format(key),
+                                        timeout=self._timeout)
+            try:
+                response.raise_for_status()
+            except:
+                return False
+        return True
+
+
+    def plan(self, method, *args, n_items=None, n_replies=0, **kwargs):
+        '''
+        Estimates the number of requests and quota units a call would spend, without calling the API.
+        IE ``yt.plan(yt.get_video_metadata, video_ids)`` is ``QuotaPlan(requests=ceil(len(video_ids) / 50), units=ceil(len(video_ids) / 50))``.
+        Compare it with ``key_pool.remaining()`` to check that a crawl fits in today's quota.
+
+        :param method: a method of this class, or its name IE "search".
+        :param n_items: the expected number of items for paginated methods, IE the video count of a channel.
+        :type n_items: int
+        :param n_replies: the expected number of comment threads with more than 5 replies for :meth:`get_video_comments`. Threads with up to 5 replies come with them.
+        :type n_replies: int
+
+        :returns: the estimated requests and quota units.
+        :rtype: :class:`youtube_api.quota.QuotaPlan`
+        '''
+        if isinstance(method, str):
+            method = getattr(self, method)
+        return plan_quota(method, *args, n_items=n_items, n_replies=n_replies, **kwargs)
 
 
-    def _create_session(self, max_retries=2, backoff_factor=.5, status_forcelist=[500, 502, 503, 504], **kwargs):
+    def _create_session(self, pool_connections=10, pool_maxsize=10, http2=False):
         '''
-        Creates a requests session to retry API calls when any `status_forcelist` codes are returned.
-
-        :param max_retries: How many times to retry an HTTP request (API call) when a `status_forcelist` code is returned
-        :type max_retries: int
-        :param backoff_factor: How long to wait between retrying API calls. Scales exponentially.
-        :type backoff_factor: float
-        :param status_forcelist: Retry when any of these http response codes are returned.
-        :type status_forcelist: list
+        Creates a requests session for API calls over http and https, which keeps connections alive between API calls.
+        Asks for gzip compressed responses.
+        Failed API calls are retried by :meth:`_http_request` according to ``retry_policy``.
+
+        :param pool_connections: how many connection pools to cache.
+        :type pool_connections: int
+        :param pool_maxsize: how many connections to keep alive per host.
+        :type pool_maxsize: int
+        :param http2: use HTTP/2 for https requests.
+        :type http2: bool
         '''
         session = requests.Session()
-        retries = Retry(total=max_retries,
-                        backoff_factor=backoff_factor,
-                        status_forcelist=status_forcelist,
-                        **kwargs)
-        session.mount('http://', HTTPAdapter(max_retries=retries))
+        # Google only sends compressed responses to user agents that contain "gzip".
+        session.headers['Accept-Encoding'] = 'gzip'
+        session.headers['User-Agent'] = '{} (gzip)'.format(requests.utils.default_user_agent())
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        if http2:
+            session.mount('https://', HTTP2Adapter(pool_connections=pool_connections,
+                                                   pool_maxsize=pool_maxsize))
+        else:
+            session.mount('https://', adapter)
         self.session = session
 
     def _http_request(self, http_endpoint, timeout_in_n_seconds=False):
         '''
         A wrapper function for making an http request to the YouTube Data API.
         Will print the `http_endpoint` if the YouTubeDataAPI class is instantiated with verbose = True.
+        Returns the cached response if there is one in ``cache``.
+        Sends the ETag in ``etag_store`` and returns the stored response when it hasn't changed.
+        Adds the API key from ``key_pool`` that spent the least quota, and switches keys when a key runs out of quota.
+        Retries failed requests according to ``retry_policy``, and counts the retries in ``retry_counts`` and :attr:`last_retries`.
         Attempts to load the response of the http request,
         and returns json response.
         '''
         if self.verbose:
-            # Print the Http req and replace the API key with a placeholder
-            print(http_endpoint.replace(self.key, '{API_KEY_PLACEHOLDER}'))
-        response = self.session.get(http_endpoint, timeout=self._timeout)
-        response_json = _load_response(response)
+            print(http_endpoint)
+        if self.cache:
+            body = self.cache.get(http_endpoint)
+            if body is not None:
+                return self._loads(body)
+        stored = self.etag_store.get(http_endpoint) if self.etag_store is not None else None
+        headers = {'If-None-Match' : stored[0]} if stored else None
+        resource = _endpoint_resource(http_endpoint)
+        units = quota_cost(resource)
+        retries = 0
+        while True:
+            key = self.key_pool.acquire(units)
+            self.quota_ledger.record(resource, units)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(key, resource)
+            try:
+                response = self.session.get(http_endpoint + '&key={}'.format(key),
+                                            timeout=self._timeout, headers=headers)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self.retry_policy.should_retry(retries):
+                    raise
+                retry_after = None
+            else:
+                if response.ok:
+                    break
+                reason = error_reason(response.text)
+                if reason in QUOTA_EXCEEDED_REASONS and self.key_pool.exhaust(key):
+                    # try again right away with a key that has quota left.
+                    continue
+                if not self.retry_policy.should_retry(retries, response.status_code, reason):
+                    break
+                retry_after = response.headers.get('Retry-After')
+            time.sleep(self.retry_policy.get_backoff(retries, retry_after))
+            retries += 1
+
+        self._last_retries.set(retries)
+        with self._lock:
+            if retries:
+                self.retry_counts[resource] += retries
+        if stored and response.status_code == 304:
+            self.etag_store.hit()
+            return stored[1]
+        response_json = _load_response(response, self._loads)
+        if self.cache:
+            self.cache.set(http_endpoint, response.content)
+        if self.etag_store is not None:
+            etag = response.headers.get('ETag', response_json.get('etag'))
+            if etag:
+                self.etag_store.set(http_endpoint, etag, response_json)
         return response_json
 
+    def _http_request_many(self, http_endpoints, max_workers=None, ordered=True):
+        '''
+        Requests each of ``http_endpoints`` and yields the json responses.
+        With ``max_workers`` greater than one, requests are sent through a thread pool.
+        At most ``2 * max_workers`` requests are scheduled at a time, so ``http_endpoints`` can be a long generator.
+
+        :param max_workers: the number of threads sending requests, sends them one at a time when None.
+        :type max_workers: int
+        :param ordered: yield the responses in the order of ``http_endpoints``, or as soon as they complete.
+        :type ordered: bool
+        '''
+        if not max_workers or max_workers <= 1:
+            for http_endpoint in http_endpoints:
+                yield self._http_request(http_endpoint)
+            return
+
+        window = 2 * max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = collections.deque()
+            try:
+                for http_endpoint in http_endpoints:
+                    # run in a copy of the context so the quota is charged to the calling method.
+                    context = contextvars.copy_context()
+                    pending.append(executor.submit(context.run, self._http_request, http_endpoint))
+                    if len(pending) >= window:
+                        for future in _pop_completed(pending, ordered):
+                            yield future.result()
+                while pending:
+                    for future in _pop_completed(pending, ordered):
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _chunk_endpoints(self, resource, ids, part, kwargs, max_results=True):
+        '''
+        Builds one endpoint per 50-ID chunk of ``ids`` for the ``resource`` list endpoint.
+        '''
+        for chunk in _chunker(ids, 50):
+            id_input = ','.join(chunk)
+            http_endpoint = ("https://www.googleapis.com/youtube/v{}/{}"
+                             "?part={}&id={}".format(
+                                 self.api_version, resource, part, id_input))
+            if max_results:
+                http_endpoint += "&maxResults=50"
+            for k,v in kwargs.items():
+                http_endpoint += '&{}={}'.format(k, v)
+            yield http_endpoint
+
+    def _paginate(self, http_endpoint, next_page_token=None, delay=0, checkpoint=None,
+                  count=None):
+        '''
+        Requests every page of a paginated ``http_endpoint`` one at a time, starting at ``next_page_token``.
+        Yields the number of items on the pages before, and the json response of each page.
+        Stops at the page without a ``nextPageToken``.
+
+        With a ``checkpoint_store``, starts at the page saved by an earlier call of the ``checkpoint`` method
+        unless the caller passed a ``next_page_token``, and saves the next page token once the items of a page are consumed.
+        With ``prefetch``, the next page is requested as soon as its token is known.
+
+        :param delay: seconds to wait before requesting each following page.
+        :type delay: float
+        :param checkpoint: the name of the calling method, IE "search".
+        :type checkpoint: str
+        :param count: returns the number of items the caller yielded so far, when it is not the number of items on the pages.
+        :type count: callable
+        '''
+        n_items = 0
+        if checkpoint and self.checkpoint_store is not None and not next_page_token:
+            saved = self.checkpoint_store.get(checkpoint, http_endpoint)
+            if saved:
+                next_page_token, n_items = saved
+
+        def request(page_token, delay=0):
+            if delay:
+                time.sleep(delay)
+            page_endpoint = http_endpoint
+            if page_token:
+                page_endpoint += "&pageToken={}".format(page_token)
+            return self._http_request(page_endpoint)
+
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        prefetched = None
+        try:
+            response_json = request(next_page_token)
+            while True:
+                next_page_token = response_json.get('nextPageToken')
+                if executor and next_page_token:
+                    # request the next page while the caller consumes this one,
+                    # in a copy of the context so the quota is charged to the calling method.
+                    context = contextvars.copy_context()
+                    prefetched = executor.submit(context.run, request, next_page_token, delay)
+                yield n_items, response_json
+                n_items = count() if count else n_items + len(response_json.get('items', []))
+                if not next_page_token:
+                    self._end_checkpoint(checkpoint, http_endpoint)
+                    return
+                if checkpoint and self.checkpoint_store is not None:
+                    self.checkpoint_store.set(checkpoint, http_endpoint, next_page_token, n_items)
+                if prefetched:
+                    response_json = prefetched.result()
+                    prefetched = None
+                else:
+                    response_json = request(next_page_token, delay)
+        finally:
+            if prefetched:
+                prefetched.cancel()
+            if executor:
+                executor.shutdown(wait=False)
+
+    def _end_checkpoint(self, checkpoint, http_endpoint):
+        '''
+        Removes the checkpoint of a paginated method that finished.
+        '''
+        if checkpoint and self.checkpoint_store is not None:
+            self.checkpoint_store.delete(checkpoint, http_endpoint)
+
+    def _get_replies(self, parent_ids, part, kwargs, max_workers=None):
+        '''
+        Requests every page of replies to the comments ``parent_ids``.
+        The first pages of every comment are requested together, then the second pages of the comments that have more, and so on.
+
+        :returns: the raw replies of each comment ID.
+        :rtype: dict
+        '''
+        replies = {parent_id : [] for parent_id in parent_ids}
+        page_tokens = {parent_id : None for parent_id in parent_ids}
+        while page_tokens:
+            http_endpoints = []
+            for parent_id, page_token in page_tokens.items():
+                http_endpoint = ("https://www.googleapis.com/youtube/v{}/comments?"
+                                 "part={}&textFormat=plainText&maxResults=100&"
+                                 "parentId={}".format(
+                                     self.api_version, part, parent_id))
+                for k,v in kwargs.items():
+                    http_endpoint += '&{}={}'.format(k, v)
+                if page_token:
+                    http_endpoint += "&pageToken={}".format(page_token)
+                http_endpoints.append(http_endpoint)
+            responses = self._http_request_many(http_endpoints, max_workers=max_workers)
+            next_page_tokens = dict()
+            for parent_id, response_json in zip(list(page_tokens), responses):
+                replies[parent_id].extend(response_json.get('items', []))
+                if response_json.get('nextPageToken'):
+                    next_page_tokens[parent_id] = response_json['nextPageToken']
+            page_tokens = next_page_tokens
+        return replies
+
+    def _with_fields(self, parser, resource, kwargs, **extra):
+        '''
+        Adds the ``fields`` mask of ``parser`` to the query ``kwargs`` of a ``resource`` request,
+        unless ``partial_responses`` is off.
+        '''
+        if not self.partial_responses:
+            return kwargs
+        return _with_fields(parser, resource, kwargs, **extra)
+
+    def _get_items_by_id(self, resource, ids, part, kwargs, max_workers=None):
+        '''
+        Yields the raw ``resource`` items of ``ids`` once per ID, in the order of ``ids``.
+        Items in ``id_cache`` are not requested again, the others are requested in 50-ID chunks and cached.
+        IDs the API doesn't return are skipped.
+        '''
+        variant = (resource, part) + tuple(sorted(kwargs.items()))
+        ids = list(dict.fromkeys(ids))
+        items = dict()
+        missing = []
+        for id_ in ids:
+            item = self.id_cache.get(variant + (id_,))
+            if item is None:
+                missing.append(id_)
+            else:
+                items[id_] = item
+
+        position = {id_ : i for i, id_ in enumerate(ids)}
+        n_yielded = 0
+        http_endpoints = self._chunk_endpoints(resource, missing, part, kwargs)
+        responses = self._http_request_many(http_endpoints, max_workers=max_workers)
+        for i, response_json in enumerate(responses):
+            for item in response_json.get('items', []):
+                items[item['id']] = item
+                self.id_cache.set(variant + (item['id'],), item)
+            # every ID up to the end of this chunk is either cached or fetched.
+            last_id = missing[min(len(missing), (i + 1) * 50) - 1]
+            for id_ in ids[n_yielded : position[last_id] + 1]:
+                if id_ in items:
+                    yield items.pop(id_)
+            n_yielded = position[last_id] + 1
+        for id_ in ids[n_yielded:]:
+            if id_ in items:
+                yield items.pop(id_)
+
+    @count_quota
     def get_channel_id_from_user(self, username, **kwargs):
         """
         Get a channel_id from a YouTube username. These are the unique identifiers for all YouTube "uers". IE. "Munchies" -> "UCaLfMkkHhSA_LaCta0BzyhQ".
@@ -115,8 +471,8 @@ class YouTubeDataAPI:
         """
         http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels"
                          "?part=id"
-                         "&forUsername={}&key={}".format(self.api_version,
-                                                         username, self.key))
+                         "&forUsername={}".format(self.api_version,
+                                                  username))
         for k,v in kwargs.items():
             http_endpoint += '&{}={}'.format(k, v)
         response_json = self._http_request(http_endpoint)
@@ -126,10 +482,11 @@ class YouTubeDataAPI:
         return channel_id
 
 
+    @count_quota
     def get_channel_metadata_gen(self, channel_id, parser=P.parse_channel_metadata,
                                  part=["id", "snippet", "contentDetails", "statistics",
                                        "topicDetails", "brandingSettings"],
-                                **kwargs):
+                                 max_workers=None, ordered=True, **kwargs):
         '''
         Gets a dictionary of channel metadata given a channel_id, or a list of channel_ids.
 
@@ -139,31 +496,43 @@ class YouTubeDataAPI:
         :type parser: :mod:`youtube_api.parsers module`
         :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
         :type part: list
+        :param max_workers: send the 50-ID chunk requests through a thread pool with this many threads.
+        :type max_workers: int
+        :param ordered: when using ``max_workers``, keep the results in the order of the input IDs.
+        :type ordered: bool
+
+        When the class has an ``id_cache``, each ID is returned once, in input order, and cached IDs are not requested again.
 
         :returns: yields the YouTube channel metadata
         :rtype: dict
         '''
         parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'channels', kwargs)
         part = ','.join(part)
-        if isinstance(channel_id, list) or isinstance(channel_id, pd.Series):
-            for chunk in _chunker(channel_id, 50):
-                id_input = ','.join(chunk)
-                http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels?"
-                                "part={}&id={}&key={}&maxResults=50".format(
-                                    self.api_version, part, id_input, self.key))
-                for k,v in kwargs.items():
-                    http_endpoint += '&{}={}'.format(k, v)
-                response_json = self._http_request(http_endpoint)
+        if (isinstance(channel_id, list) or isinstance(channel_id, pd.Series)) and self.id_cache is not None:
+            # one collection_date per call, as cached items don't come from a page.
+            parse = P._page_parser(parser)
+            for item in self._get_items_by_id('channels', channel_id, part, kwargs,
+                                              max_workers=max_workers):
+                yield parse(item)
+        elif isinstance(channel_id, list) or isinstance(channel_id, pd.Series):
+            http_endpoints = self._chunk_endpoints('channels', channel_id, part, kwargs)
+            for response_json in self._http_request_many(http_endpoints,
+                                                         max_workers=max_workers,
+                                                         ordered=ordered):
+                parse = P._page_parser(parser)
                 if response_json.get('items'):
                     for item in response_json['items']:
-                        yield parser(item)
+                        yield parse(item)
                 else:
-                    yield parser(None)
+                    yield parse(None)
 
 
+    @count_quota
     def get_channel_metadata(self, channel_id, parser=P.parse_channel_metadata,
                              part=["id", "snippet", "contentDetails", "statistics",
-                                   "topicDetails", "brandingSettings"],  **kwargs):
+                                   "topicDetails", "brandingSettings"],
+                             max_workers=None, ordered=True, **kwargs):
         '''
         Gets a dictionary of channel metadata given a channel_id, or a list of channel_ids.
 
@@ -175,27 +544,34 @@ class YouTubeDataAPI:
         :type parser: :mod:`youtube_api.parsers module`
         :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
         :type part: list
+        :param max_workers: send the 50-ID chunk requests through a thread pool with this many threads.
+        :type max_workers: int
+        :param ordered: when using ``max_workers``, keep the results in the order of the input IDs.
+        :type ordered: bool
 
         :returns: the YouTube channel metadata
         :rtype: dict
         '''
         parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'channels', kwargs)
         channel_meta = []
         if isinstance(channel_id, str):
             part = ','.join(part)
             http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels?"
-                             "part={}&id={}&key={}&maxResults=50".format(
-                                 self.api_version, part, channel_id, self.key))
+                             "part={}&id={}&maxResults=50".format(
+                                 self.api_version, part, channel_id))
             for k,v in kwargs.items():
                 http_endpoint += '&{}={}'.format(k, v)
             response_json = self._http_request(http_endpoint)
             if response_json.get('items'):
-                channel_meta = parser(response_json['items'][0])
+                channel_meta = P._page_parser(parser)(response_json['items'][0])
 
         elif isinstance(channel_id, list) or isinstance(channel_id, pd.Series):
             for channel_meta_ in self.get_channel_metadata_gen(channel_id,
                                                                parser=parser,
                                                                part=part,
+                                                               max_workers=max_workers,
+                                                               ordered=ordered,
                                                                **kwargs):
                 channel_meta.append(channel_meta_)
         else:
@@ -204,8 +580,10 @@ class YouTubeDataAPI:
         return channel_meta
 
 
+    @count_quota
     def get_video_metadata_gen(self, video_id, parser=P.parse_video_metadata,
-                               part=['statistics','snippet'],  **kwargs):
+                               part=['statistics','snippet'], max_workers=None,
+                               ordered=True, **kwargs):
         '''
         Given a `video_id` returns metrics (views, likes, comments) and metadata (description, category) as a dictionary.
 
@@ -217,32 +595,43 @@ class YouTubeDataAPI:
         :type parser: :mod:`youtube_api.parsers module`
         :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
         :type part: list
+        :param max_workers: send the 50-ID chunk requests through a thread pool with this many threads.
+        :type max_workers: int
+        :param ordered: when using ``max_workers``, keep the results in the order of the input IDs.
+        :type ordered: bool
+
+        When the class has an ``id_cache``, each ID is returned once, in input order, and cached IDs are not requested again.
 
         :returns: returns metadata from the inputted ``video_id``s.
         :rtype: dict
         '''
         part = ','.join(part)
         parser=parser if parser else P.raw_json
-        if isinstance(video_id, list) or isinstance(video_id, pd.Series):
-            for chunk in _chunker(video_id, 50):
-                id_input = ','.join(chunk)
-                http_endpoint = ("https://www.googleapis.com/youtube/v{}/videos"
-                                 "?part={}"
-                                 "&id={}&key={}&maxResults=50".format(
-                                    self.api_version, part, id_input, self.key))
-                for k,v in kwargs.items():
-                    http_endpoint += '&{}={}'.format(k, v)
-                response_json = self._http_request(http_endpoint)
+        kwargs = self._with_fields(parser, 'videos', kwargs)
+        if (isinstance(video_id, list) or isinstance(video_id, pd.Series)) and self.id_cache is not None:
+            # one collection_date per call, as cached items don't come from a page.
+            parse = P._page_parser(parser)
+            for item in self._get_items_by_id('videos', video_id, part, kwargs,
+                                              max_workers=max_workers):
+                yield parse(item)
+        elif isinstance(video_id, list) or isinstance(video_id, pd.Series):
+            http_endpoints = self._chunk_endpoints('videos', video_id, part, kwargs)
+            for response_json in self._http_request_many(http_endpoints,
+                                                         max_workers=max_workers,
+                                                         ordered=ordered):
+                parse = P._page_parser(parser)
                 if response_json.get('items'):
                     for item in response_json['items']:
-                        yield parser(item)
+                        yield parse(item)
                 else:
-                    yield parser(None)
+                    yield parse(None)
         else:
             raise Exception('This function only takes iterables!')
 
 
-    def get_video_metadata(self, video_id, parser=P.parse_video_metadata, part=['statistics','snippet'],  **kwargs):
+    @count_quota
+    def get_video_metadata(self, video_id, parser=P.parse_video_metadata, part=['statistics','snippet'],
+                           max_workers=None, ordered=True, **kwargs):
         '''
         Given a single or list of `video_id` returns metrics (views, likes, comments) and metadata (description, category) as a dictionary.
 
@@ -254,29 +643,35 @@ class YouTubeDataAPI:
         :type parser: :mod:`youtube_api.parsers module`
         :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
         :type part: list
+        :param max_workers: send the 50-ID chunk requests through a thread pool with this many threads.
+        :type max_workers: int
+        :param ordered: when using ``max_workers``, keep the results in the order of the input IDs.
+        :type ordered: bool
 
         :returns: yields a video metadata.
         :rtype: dict
         '''
         video_metadata = []
         parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'videos', kwargs)
         if isinstance(video_id, str):
             part = ','.join(part)
             http_endpoint = ("https://www.googleapis.com/youtube/v{}/videos"
                              "?part={}"
-                             "&id={}&key={}&maxResults=2".format(self.api_version,
-                                                                 part, video_id,
-                                                                 self.key))
+                             "&id={}&maxResults=2".format(self.api_version,
+                                                          part, video_id))
             for k,v in kwargs.items():
                 http_endpoint += '&{}={}'.format(k, v)
             response_json = self._http_request(http_endpoint)
             if response_json.get('items'):
-                video_metadata = parser(response_json['items'][0])
+                video_metadata = P._page_parser(parser)(response_json['items'][0])
 
         elif isinstance(video_id, list) or isinstance(video_id, pd.Series):
             for video_meta in self.get_video_metadata_gen(video_id,
                                                           parser=parser,
                                                           part=part,
+                                                          max_workers=max_workers,
+                                                          ordered=ordered,
                                                           **kwargs):
                 video_metadata.append(video_meta)
         else:
@@ -285,6 +680,44 @@ class YouTubeDataAPI:
         return video_metadata
 
 
+    @count_quota
+    def get_playlists_gen(self, channel_id, next_page_token=False, parser=P.parse_playlist_metadata,
+                          part=['id','snippet','contentDetails'], **kwargs):
+        '''
+        Yields the playlists that `channel_id` created, requesting one page of 50 at a time.
+        Note that playlists can contains videos from any users.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/playlists/list
+
+        :param channel_id: a channel_id IE: "UCn8zNIfYAQNdrFRrr8oibKw"
+        :type channel_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields playlist info that ``channel_id`` is subscribed to.
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'playlists', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlists"
+                         "?part={}&channelId={}&maxResults=50".format(
+                             self.api_version, part, channel_id))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        for _, response_json in self._paginate(http_endpoint, next_page_token,
+                                               checkpoint='get_playlists'):
+            parse = P._page_parser(parser)
+            for item in response_json.get('items', []):
+                yield parse(item)
+
+
+    @count_quota
     def get_playlists(self, channel_id, next_page_token=False, parser=P.parse_playlist_metadata,
                       part=['id','snippet','contentDetails'], **kwargs):
         '''
@@ -306,32 +739,88 @@ class YouTubeDataAPI:
         :returns: playlist info that ``channel_id`` is subscribed to.
         :rtype: list of dict
         '''
-        parser=parser if parser else P.raw_json
-        part = ','.join(part)
         playlists = []
-        while True:
-            http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlists"
-                             "?part={}&channelId={}&key={}&maxResults=50".format(
-                                 self.api_version, part, channel_id, self.key))
-            for k,v in kwargs.items():
-                http_endpoint += '&{}={}'.format(k, v)
-            if next_page_token:
-                http_endpoint += "&pageToken={}".format(next_page_token)
-            response_json = self._http_request(http_endpoint)
-            if response_json.get('items'):
-                for item in response_json.get('items'):
-                    playlists.append(parser(item))
-                if response_json.get('nextPageToken'):
-                    next_page_token = response_json.get('nextPageToken')
-                else:
-                    break
-
+        for playlist in self.get_playlists_gen(channel_id, next_page_token=next_page_token,
+                                               parser=parser, part=part, **kwargs):
+            playlists.append(playlist)
         return playlists
 
 
+    @count_quota
+    def get_videos_from_playlist_id_gen(self, playlist_id, next_page_token=None,
+                                        parser=P.parse_video_url, part=['snippet'], max_results=200000,
+                                        since=None, **kwargs):
+        '''
+        Given a `playlist_id`, yields the videos of that playlist, requesting one page of 50 at a time.
+        With a high-water mark, stops at the videos collected before, as uploads playlists list the newest videos first.
+
+        Note that user uploads for any given channel are from a playlist named "upload playlist id". You can get this value using :meth:`youtube_api.youtube_api.get_channel_metadata` or :meth:`youtube_api.youtube_api_utils.get_upload_playlist_id`. The playlist ID for uploads is always the channel_id with "UU" subbed for "UC".
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/playlistItems
+
+        :param playlist_id: the playlist_id IE: "UUaLfMkkHhSA_LaCta0BzyhQ"
+        :type platlist_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param max_results: How many video IDs should returned? Contrary to the name, this is actually the minimum number of results to be returned.
+        :type mac_results: int
+        :param since: the high-water mark of an earlier walk, a publish datetime or timestamp, a set of video IDs, or both in a tuple. Stops at the first video published at or before it, or in the set. Defaults to the mark in ``watermark_store``, which is saved by walks that start at the first page, also when they stop at ``max_results``. Timestamps are in the clock of the ``publish_date`` of the parsers, so ``max(video['publish_date'] for video in videos)`` is a mark, and naive datetimes are in UTC.
+        :type since: datetime or set
+        
+        :returns: yields video ids associated with ``playlist_id``.
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        if since is None and self.watermark_store is not None:
+            since = self.watermark_store.get(playlist_id)
+        watermark = _watermark(since)
+        if watermark or self.watermark_store is not None:
+            kwargs = self._with_fields(parser, 'playlistItems', kwargs,
+                                       paths=['snippet/publishedAt', 'snippet/resourceId/videoId'])
+        else:
+            kwargs = self._with_fields(parser, 'playlistItems', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlistItems"
+                         "?part={}&playlistId={}&maxResults=50".format(
+                             self.api_version, part, playlist_id))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        # the newest page of videos, the next high-water mark,
+        # known only to a walk from the first page, not one resumed from a page token or a checkpoint.
+        newest = []
+        from_start = not next_page_token and not (self.checkpoint_store is not None and
+                                                  self.checkpoint_store.get('get_videos_from_playlist_id', http_endpoint))
+        for n_videos, response_json in self._paginate(http_endpoint, next_page_token,
+                                                      checkpoint='get_videos_from_playlist_id'):
+            if not response_json.get('items'):
+                break
+            items, reached = _new_items(response_json['items'], watermark)
+            parse = P._page_parser(parser)
+            for item in items:
+                if len(newest) < 50:
+                    newest.append(item)
+                yield parse(item)
+                n_videos += 1
+                if n_videos >= max_results:
+                    self._end_checkpoint('get_videos_from_playlist_id', http_endpoint)
+                    if self.watermark_store is not None and from_start:
+                        self.watermark_store.set(playlist_id, *_next_watermark(newest))
+                    return
+            if reached:
+                break
+        self._end_checkpoint('get_videos_from_playlist_id', http_endpoint)
+        if self.watermark_store is not None and from_start and newest:
+            self.watermark_store.set(playlist_id, *_next_watermark(newest))
+
+
+    @count_quota
     def get_videos_from_playlist_id(self, playlist_id, next_page_token=None,
                                     parser=P.parse_video_url, part=['snippet'], max_results=200000,
-                                    **kwargs):
+                                    since=None, **kwargs):
         '''
         Given a `playlist_id`, returns `video_ids` associated with that playlist.
 
@@ -349,44 +838,60 @@ class YouTubeDataAPI:
         :type part: list
         :param max_results: How many video IDs should returned? Contrary to the name, this is actually the minimum number of results to be returned.
         :type mac_results: int
+        :param since: the high-water mark of an earlier walk, see :meth:`get_videos_from_playlist_id_gen`.
+        :type since: datetime or set
         
         :returns: video ids associated with ``playlist_id``.
         :rtype: list of dict
         '''
-        parser=parser if parser else P.raw_json
-        part = ','.join(part)
         videos = []
-        run = True
-        while run:
-            http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlistItems"
-                             "?part={}&playlistId={}&maxResults=50&key={}".format(
-                                 self.api_version, part, playlist_id, self.key))
-            for k,v in kwargs.items():
-                http_endpoint += '&{}={}'.format(k, v)
-            if next_page_token:
-                http_endpoint += "&pageToken={}".format(next_page_token)
+        for video in self.get_videos_from_playlist_id_gen(playlist_id, next_page_token=next_page_token,
+                                                          parser=parser, part=part,
+                                                          max_results=max_results, since=since,
+                                                          **kwargs):
+            videos.append(video)
+        return videos
 
-            response_json = self._http_request(http_endpoint,
-                                               timeout_in_n_seconds=20  )
-            if response_json.get('items'):
-                for item in response_json.get('items'):
-                    videos.append(parser(item))
-                    if len(videos) >= max_results:
-                        run = False
-                        break
-                        
-                if response_json.get('nextPageToken'):
-                    next_page_token = response_json.get('nextPageToken')
-                else:
-                    run=False
-                    break
-            else:
-                run=False
-                break
 
-        return videos
+    @count_quota
+    def get_subscriptions_gen(self, channel_id, next_page_token=False,
+                              parser=P.parse_subscription_descriptive,
+                              part=['id', 'snippet'], **kwargs):
+        '''
+        Yields the channels that `channel_id` is subscribed to, requesting one page of 50 at a time.
 
+        Read the docs: https://developers.google.com/youtube/v3/docs/subscriptions
 
+        :param channel_id: a channel_id IE: "UCn8zNIfYAQNdrFRrr8oibKw"
+        :type channel_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param stop_after_n_iteration: stops the API calls after N API calls
+        :type stop_after_n_iteration: int
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields channel IDs that ``channel_id`` is subscribed to.
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'subscriptions', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/subscriptions"
+                         "?channelId={}&part={}&maxResults=50".format(
+                             self.api_version, channel_id, part))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        for _, response_json in self._paginate(http_endpoint, next_page_token,
+                                               checkpoint='get_subscriptions'):
+            parse = P._page_parser(parser)
+            for item in response_json.get('items', []):
+                yield parse(item)
+
+
+    @count_quota
     def get_subscriptions(self, channel_id, next_page_token=False,
                           parser=P.parse_subscription_descriptive,
                           part=['id', 'snippet'], **kwargs):
@@ -409,32 +914,17 @@ class YouTubeDataAPI:
         :returns: channel IDs that ``channel_id`` is subscribed to.
         :rtype: list
         '''
-        parser=parser if parser else P.raw_json
-        part = ','.join(part)
         subscriptions = []
-        while True:
-            http_endpoint = ("https://www.googleapis.com/youtube/v{}/subscriptions"
-                             "?channelId={}&part={}&maxResults=50&key={}".format(
-                                 self.api_version, channel_id, part, self.key))
-            for k,v in kwargs.items():
-                http_endpoint += '&{}={}'.format(k, v)
-            if next_page_token:
-                http_endpoint += "&pageToken={}".format(next_page_token)
-
-            response_json = self._http_request(http_endpoint)
-            if response_json.get('items'):
-                for item in response_json.get('items'):
-                    subscriptions.append(parser(item))
-                if response_json.get('nextPageToken'):
-                    next_page_token = response_json.get('nextPageToken')
-                else:
-                    return subscriptions
-
+        for subscription in self.get_subscriptions_gen(channel_id, next_page_token=next_page_token,
+                                                       parser=parser, part=part, **kwargs):
+            subscriptions.append(subscription)
         return subscriptions
 
 
+    @count_quota
     def get_featured_channels_gen(self, channel_id, parser=P.parse_featured_channels,
-                                  part=["id", "brandingSettings"], **kwargs):
+                                  part=["id", "brandingSettings"], max_workers=None,
+                                  ordered=True, **kwargs):
         '''
         Given a `channel_id` returns a dictionary {channel_id : [list, of, channel_ids]}
         of featured channels.
@@ -449,39 +939,43 @@ class YouTubeDataAPI:
         :type parser: :mod:`youtube_api.parsers module`
         :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
         :type part: list
+        :param max_workers: send the 50-ID chunk requests through a thread pool with this many threads.
+        :type max_workers: int
+        :param ordered: when using ``max_workers``, keep the results in the order of the input IDs.
+        :type ordered: bool
 
         :returns: yields metadata for featured channels
         :rtype: dict
         '''
         parser = parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'channels', kwargs)
         part = ','.join(part)
         if isinstance(channel_id, list):
-            for chunk in _chunker(channel_id, 50):
-                id_input = ','.join(chunk)
-                http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels"
-                                 "?part={}&id={}&key={}".format(
-                                     self.api_version, part, id_input, self.key))
-                for k,v in kwargs.items():
-                    http_endpoint += '&{}={}'.format(k, v)
-                response_json = self._http_request(http_endpoint)
+            http_endpoints = self._chunk_endpoints('channels', channel_id, part, kwargs,
+                                                   max_results=False)
+            for response_json in self._http_request_many(http_endpoints,
+                                                         max_workers=max_workers,
+                                                         ordered=ordered):
+                parse = P._page_parser(parser)
                 if response_json.get('items'):
                     for item in response_json['items']:
-                        yield parser(item)
+                        yield parse(item)
                 else:
-                    yield parser(None)
+                    yield parse(None)
 
         else:
             http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels"
-                             "?part={}&id={}&key={}".format(
-                                 self.api_version, part, channel_id, self.key))
+                             "?part={}&id={}".format(
+                                 self.api_version, part, channel_id))
             for k,v in kwargs.items():
                 http_endpoint += '&{}={}'.format(k, v)
-            response = self.session.get(http_endpoint)
-            response_json = _load_response(response)
+            response_json = self._http_request(http_endpoint)
+            parse = P._page_parser(parser)
             for item in response_json['items']:
-                yield parser(item)
+                yield parse(item)
 
 
+    @count_quota
     def get_featured_channels(self, channel_id, parser=P.parse_featured_channels, **kwargs):
         '''
         Given a `channel_id` returns a dictionary {channel_id : [list, of, channel_ids]}
@@ -508,12 +1002,77 @@ class YouTubeDataAPI:
         return featured_channels
 
 
+    @count_quota
+    def get_video_comments_gen(self, video_id, get_replies=True,
+                               max_results=None, next_page_token=False,
+                               parser=P.parse_comment_metadata, part = ['snippet'],
+                               max_workers=None, **kwargs):
+        """
+        Yields comments and replies to comments for a given video, requesting one page of 100 comments at a time.
+        Each comment is followed by its replies.
+
+        Comment threads are requested with ``part=replies``, which includes up to 5 replies per comment.
+        The replies of the other comments on a page are paged through with the comments endpoint.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/commentThreads/list
+
+
+        :param video_id: a video_id IE: "eqwPlwHSL_M"
+        :type video_id: str
+        :param get_replies: whether or not to get replies to comments
+        :type get_replies: bool
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param max_workers: request the replies of the comments on a page through a thread pool with this many threads.
+        :type max_workers: int
+
+        :returns: yields comments and responses to comments of the given ``video_id``.
+        :rtype: dict
+        """
+        parser=parser if parser else P.raw_json
+        reply_part = ','.join(p for p in part if p != 'replies')
+        if get_replies and 'replies' not in part:
+            part = list(part) + ['replies']
+        part = ','.join(part)
+        thread_kwargs = self._with_fields(parser, 'commentThreads', kwargs)
+        reply_kwargs = self._with_fields(parser, 'comments', kwargs)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/commentThreads?"
+                         "part={}&textFormat=plainText&maxResults=100&"
+                         "videoId={}".format(
+                             self.api_version, part, video_id))
+        for k,v in thread_kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        n_comments = 0
+        for n_comments, response_json in self._paginate(http_endpoint, next_page_token,
+                                                        checkpoint='get_video_comments',
+                                                        count=lambda: n_comments):
+            items = response_json.get('items', [])
+            replies = dict()
+            if get_replies:
+                truncated = [item['id'] for item in items if _replies_truncated(item)]
+                replies = self._get_replies(truncated, reply_part, reply_kwargs,
+                                            max_workers=max_workers)
+            parse = P._page_parser(parser)
+            for item in items:
+                thread_replies = replies.get(item['id'], item.get('replies', {}).get('comments', []))
+                for comment in [item] + (thread_replies if get_replies else []):
+                    if max_results and n_comments >= max_results:
+                        self._end_checkpoint('get_video_comments', http_endpoint)
+                        return
+                    n_comments += 1
+                    yield parse(comment)
+
+
+    @count_quota
     def get_video_comments(self, video_id, get_replies=True,
                            max_results=None, next_page_token=False,
                            parser=P.parse_comment_metadata, part = ['snippet'],
-                           **kwargs):
+                           max_workers=None, **kwargs):
         """
         Returns comments and replies to comments for a given video.
+        Each comment is followed by its replies.
 
         Read the docs: https://developers.google.com/youtube/v3/docs/commentThreads/list
 
@@ -526,57 +1085,108 @@ class YouTubeDataAPI:
         :type parser: :mod:`youtube_api.parsers module`
         :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
         :type part: list
+        :param max_workers: request the replies of the comments on a page through a thread pool with this many threads.
+        :type max_workers: int
 
         :returns: comments and responses to comments of the given ``video_id``.
         :rtype: list of dict
         """
+        comments = []
+        for comment in self.get_video_comments_gen(video_id, get_replies=get_replies,
+                                                   max_results=max_results,
+                                                   next_page_token=next_page_token,
+                                                   parser=parser, part=part,
+                                                   max_workers=max_workers, **kwargs):
+            comments.append(comment)
+        return comments
+
+
+    @count_quota
+    def search_gen(self, q=None, channel_id=None,
+                   max_results=5, order_by="relevance", next_page_token=None,
+                   published_after=datetime.datetime.timestamp(datetime.datetime(2000,1,1)),
+                   published_before=datetime.datetime.timestamp(
+                       datetime.datetime((3000 if sys.maxsize > 2**31 else 2038),1,1)),
+                   location=None, location_radius='1km', region_code=None,
+                   safe_search=None, relevance_language=None, event_type=None,
+                   topic_id=None, video_duration=None, search_type="video",
+                   parser=P.parse_rec_video_metadata, part=['snippet'],
+                   **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords, and yield the results one page of 50 at a time. Only returns up to 500 videos per search.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/search/list
+
+        :param q: regex pattern to search using | for or, && for and, and - for not. IE boat|fishing is boat or fishing
+        :type q: list or str
+        :param max_results: max number of videos returned by a search query.
+        :type max_results: int
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param order_by: Return search results ordered by either ``relevance``, ``date``, ``rating``, ``title``, ``videoCount``, ``viewCount``.
+        :type order_by: str
+        :param next_page_token: A token to continue from a preciously stopped query IE:CDIQAA
+        :type next_page_token: str
+        :param published_after: Only show videos uploaded after datetime
+        :type published_after: datetime
+        :param published_before: Only show videos uploaded before datetime
+        :type published_before: datetime
+        :param location: Coodinates of video uploaded in location.
+        :type location: tuple
+        :param location_radius: The radius from the ``location`` param to include in the search.
+        :type location_radius: str
+        :param region_code: search results for videos that can be viewed in the specified country. The parameter value is an ISO 3166-1 alpha-2 country code.
+        :type region_code: str
+        :param safe_search: whether or not to include restricted content, options are "moderate", "strict", None.
+        :type safe_search: str or None
+        :param relevance_language: Instructs the API to return search results that are most relevant to the specified language.
+        :type relevance_language: str
+        :param event_type: whether the video is "live", "completed", or "upcoming".
+        :type event_type: str
+        :param topic_id: only contain resources associated with the specified topic. The value identifies a Freebase topic ID.
+        :type topic_id: str
+        :param video_duration: filter on video durations "any", "long", "medium", "short".
+        :type video_duration: str
+        :param search_type: return results on a "video", "channel", or "playlist" search.
+
+        :returns: yields incomplete video metadata of videos returned by search query.
+        :rtype: dict
+        """
+        if search_type not in ["video", "channel", "playlist"]:
+            raise Exception("The value you have entered for `type` is not valid!")
+
         parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'search', kwargs)
         part = ','.join(part)
-        comments = []
-        run = True
-        while run:
-            http_endpoint = ("https://www.googleapis.com/youtube/v{}/commentThreads?"
-                             "part={}&textFormat=plainText&maxResults=100&"
-                             "videoId={}&key={}".format(
-                                 self.api_version, part, video_id, self.key))
-            for k,v in kwargs.items():
-                http_endpoint += '&{}={}'.format(k, v)
-            if next_page_token:
-                http_endpoint += "&pageToken={}".format(next_page_token)
-            response = self.session.get(http_endpoint)
-            response_json = _load_response(response)
-            if response_json.get('items'):
-                items = response_json.get('items')
-                for item in items:
-                    if max_results:
-                        if len(comments) >= max_results:
-                            return comments
-                    comments.append(parser(item))
-            if response_json.get('nextPageToken'):
-                next_page_token = response_json['nextPageToken']
-            else:
-                run=False
-                break
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/search?"
+                         "part={}&type={}&maxResults=50"
+                         "&order={}".format(
+                             self.api_version, part, search_type, order_by))
+        http_endpoint += _search_query(
+            q=q, channel_id=channel_id, published_after=published_after,
+            published_before=published_before, location=location,
+            location_radius=location_radius, region_code=region_code,
+            safe_search=safe_search, relevance_language=relevance_language,
+            event_type=event_type, topic_id=topic_id,
+            video_duration=video_duration, **kwargs)
+        delay = 0 if self.rate_limiter else .1
+        for n_videos, response_json in self._paginate(http_endpoint, next_page_token, delay=delay,
+                                                      checkpoint='search'):
+            if not response_json.get('items'):
+                self._end_checkpoint('search', http_endpoint)
+                return
+            parse = P._page_parser(parser)
+            for item in response_json['items']:
+                if max_results and n_videos >= max_results:
+                    self._end_checkpoint('search', http_endpoint)
+                    return
+                n_videos += 1
+                yield parse(item)
 
-        if get_replies:
-            for comment in comments:
-                if comment.get('reply_count') and comment.get('reply_count') > 0:
-                    comment_id = comment.get('comment_id')
-                    http_endpoint = ("https://www.googleapis.com/youtube/v{}/comments?"
-                                     "part={}&textFormat=plainText&maxResults=100&"
-                                     "parentId={}&key={}".format(
-                                         self.api_version, part, comment_id, self.key))
-                    for k,v in kwargs.items():
-                        http_endpoint += '&{}={}'.format(k, v)
-                    response_json = self._http_request(http_endpoint)
-                    if response_json.get('items'):
-                        for item in response_json.get('items'):
-                            if max_results:
-                                if len(comments) >= max_results:
-                                    return comments
-                            comments.append(parser(item))
-        return comments
 
+    @count_quota
     def search(self, q=None, channel_id=None,
                max_results=5, order_by="relevance", next_page_token=None,
                published_after=datetime.datetime.timestamp(datetime.datetime(2000,1,1)),
@@ -588,7 +1198,7 @@ class YouTubeDataAPI:
                parser=P.parse_rec_video_metadata, part=['snippet'],
                **kwargs):
         """
-        Search YouTube for either videos, channels for keywords. Only returns up to 500 videos per search. For an exhaustive search, take advantage of the ``published_after`` and ``published_before`` params. Note the docstring needs to be updated to account for all the arguments this function takes.
+        Search YouTube for either videos, channels for keywords. Only returns up to 500 videos per search. For an exhaustive search, use :meth:`search_exhaustive`, which splits the ``published_after`` and ``published_before`` range for you. Note the docstring needs to be updated to account for all the arguments this function takes.
 
         Read the docs: https://developers.google.com/youtube/v3/docs/search/list
 
@@ -629,97 +1239,152 @@ class YouTubeDataAPI:
         :returns: incomplete video metadata of videos returned by search query.
         :rtype: list of dict
         """
+        videos = []
+        for video in self.search_gen(q=q, channel_id=channel_id, max_results=max_results,
+                                     order_by=order_by, next_page_token=next_page_token,
+                                     published_after=published_after,
+                                     published_before=published_before,
+                                     location=location, location_radius=location_radius,
+                                     region_code=region_code, safe_search=safe_search,
+                                     relevance_language=relevance_language,
+                                     event_type=event_type, topic_id=topic_id,
+                                     video_duration=video_duration,
+                                     search_type=search_type, parser=parser, part=part,
+                                     **kwargs):
+            videos.append(video)
+        return videos
+
+
+    @count_quota
+    def search_exhaustive_gen(self, q=None, channel_id=None, max_results=None, order_by="date",
+                              published_after=datetime.datetime.timestamp(datetime.datetime(2005,1,1)),
+                              published_before=None, window_results=450, min_window=60,
+                              search_type="video", parser=P.parse_rec_video_metadata,
+                              part=['snippet'], max_workers=None, **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords, past the cap of about 500 results per search.
+
+        The date range is split into windows of time that are searched separately.
+        When the first page of a window has more ``pageInfo.totalResults`` than ``window_results``,
+        the window is halved and both halves are searched, until windows are shorter than ``min_window``.
+        Results found by more than one window are yielded once, in the order the pages arrive.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/search/list
+
+        :param q: regex pattern to search using | for or, && for and, and - for not. IE boat|fishing is boat or fishing
+        :type q: list or str
+        :param max_results: max number of results, all of them when None.
+        :type max_results: int
+        :param published_after: Only show videos uploaded after datetime
+        :type published_after: datetime
+        :param published_before: Only show videos uploaded before datetime, now when None.
+        :type published_before: datetime
+        :param window_results: the number of results a window is expected to return in full.
+        :type window_results: int
+        :param min_window: the shortest window to split, in seconds.
+        :type min_window: float
+        :param search_type: return results on a "video", "channel", or "playlist" search.
+        :type search_type: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param max_workers: search the windows through a thread pool with this many threads.
+        :type max_workers: int
+        :param kwargs: the other filters of :meth:`search`, IE ``region_code`` or ``video_duration``.
+
+        :returns: yields incomplete video metadata of videos returned by search query.
+        :rtype: dict
+        """
         if search_type not in ["video", "channel", "playlist"]:
             raise Exception("The value you have entered for `type` is not valid!")
 
         parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'search', kwargs,
+                                   paths=['id'], fields=['pageInfo/totalResults'])
         part = ','.join(part)
-        videos = []
-        while True:
+        published_after = _timestamp(published_after)
+        published_before = _timestamp(published_before) if published_before else time.time()
+
+        def window_endpoint(window, page_token):
             http_endpoint = ("https://www.googleapis.com/youtube/v{}/search?"
                              "part={}&type={}&maxResults=50"
-                             "&order={}&key={}".format(
-                                 self.api_version, part, search_type, order_by, self.key))
-            if q:
-                if isinstance(q, list):
-                    q = '|'.join(q)
-                http_endpoint += "&q={}".format(q)
-
-            if published_after:
-                if not isinstance(published_after, float) and not isinstance(published_after, datetime.date):
-                    raise Exception("published_after must be a timestamp, not a {}".format(type(published_after)))
-                
-                if isinstance(published_after, float):
-                    published_after = datetime.datetime.utcfromtimestamp(published_after)
-                _published_after = datetime.datetime.strftime(published_after, "%Y-%m-%dT%H:%M:%SZ")
-                http_endpoint += "&publishedAfter={}".format(_published_after)
-
-            if published_before:
-                if not isinstance(published_before, float) and not isinstance(published_before, datetime.date):
-                    raise Exception("published_before must be a timestamp, not a {}".format(type(published_before)))
-                    
-                if isinstance(published_before, float):
-                    published_before = datetime.datetime.utcfromtimestamp(published_before)
-                _published_before = datetime.datetime.strftime(published_before, "%Y-%m-%dT%H:%M:%SZ")
-                http_endpoint += "&publishedBefore={}".format(_published_before)
-
-            if channel_id:
-                http_endpoint += "&channelId={}".format(channel_id)
-
-            if location:
-                if isinstance(location, tuple):
-                    location = urllib.parse.quote_plus(str(location).strip('()').replace(' ', ''))
-                http_endpoint += "&location={}&locationRadius={}".format(location,
-                                                                         location_radius)
-            if region_code:
-                http_endpoint += "&regionCode={}".format(region_code)
-
-            if safe_search:
-                if not safe_search in ['moderate', 'strict', 'none']:
-                    raise "Not proper safe_search."
-                http_endpoint += '&safeSearch={}'.format(safe_search)
-
-            if relevance_language:
-                http_endpoint += '&relevanceLanguage={}'.format(relevance_language)
-
-            if event_type:
-                if not event_type in ['completed', 'live', 'upcoming']:
-                    raise "Not proper event_type!"
-                http_endpoint += '&eventType={}'.format(event_type)
-
-            if topic_id:
-                http_endpoint += '&topicId={}'.format(topic_id)
-
-            if video_duration:
-                if not video_duration in ['short', 'long', 'medium', 'any']:
-                    raise "Not proper video_duration"
-                http_endpoint += '&videoDuration={}'.format(video_duration)
-
-            for k,v in kwargs.items():
-                http_endpoint += '&{}={}'.format(k, v)
-
-            if next_page_token:
-                http_endpoint += "&pageToken={}".format(next_page_token)
-
-            response_json = self._http_request(http_endpoint)
-            if response_json.get('items'):
-                for item in response_json.get('items'):
-                    videos.append(parser(item))
-                if max_results:
-                    if len(videos) >= max_results:
-                        videos = videos[:max_results]
-                        break
-                if response_json.get('nextPageToken'):
-                    next_page_token = response_json.get('nextPageToken')
-                    time.sleep(.1)
-                else:
-                    break
-            else:
-                break
+                             "&order={}".format(
+                                 self.api_version, part, search_type, order_by))
+            http_endpoint += _search_query(q=q, channel_id=channel_id,
+                                           published_after=window[0],
+                                           published_before=window[1], **kwargs)
+            if page_token:
+                http_endpoint += "&pageToken={}".format(page_token)
+            return http_endpoint
+
+        # compact IDs of the results yielded so far.
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max_workers or 1) as executor:
+            # the window and page token of each request in flight.
+            pending = dict()
+            def submit(window, page_token=None):
+                # run in a copy of the context so the quota is charged to this method.
+                context = contextvars.copy_context()
+                future = executor.submit(context.run, self._http_request,
+                                         window_endpoint(window, page_token))
+                pending[future] = (window, page_token)
+
+            submit((published_after, published_before))
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        window, page_token = pending.pop(future)
+                        response_json = future.result()
+                        total_results = response_json.get('pageInfo', {}).get('totalResults', 0)
+                        if (page_token is None and total_results > window_results and
+                                window[1] - window[0] > min_window):
+                            middle = (window[0] + window[1]) / 2
+                            submit((window[0], middle))
+                            submit((middle, window[1]))
+                        elif response_json.get('items') and response_json.get('nextPageToken'):
+                            submit(window, response_json['nextPageToken'])
+                        parse = P._page_parser(parser)
+                        for item in response_json.get('items', []):
+                            item_id = _compact_id(_search_item_id(item))
+                            if item_id in seen:
+                                continue
+                            seen.add(item_id)
+                            yield parse(item)
+                            if max_results and len(seen) >= max_results:
+                                return
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+    @count_quota
+    def search_exhaustive(self, q=None, channel_id=None, max_results=None, order_by="date",
+                          published_after=datetime.datetime.timestamp(datetime.datetime(2005,1,1)),
+                          published_before=None, window_results=450, min_window=60,
+                          search_type="video", parser=P.parse_rec_video_metadata,
+                          part=['snippet'], max_workers=None, **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords, past the cap of about 500 results per search.
+        See :meth:`search_exhaustive_gen`.
 
+        :returns: incomplete video metadata of videos returned by search query.
+        :rtype: list of dict
+        """
+        videos = []
+        for video in self.search_exhaustive_gen(q=q, channel_id=channel_id, max_results=max_results,
+                                                order_by=order_by, published_after=published_after,
+                                                published_before=published_before,
+                                                window_results=window_results,
+                                                min_window=min_window, search_type=search_type,
+                                                parser=parser, part=part,
+                                                max_workers=max_workers, **kwargs):
+            videos.append(video)
         return videos
 
 
+    @count_quota
     def get_recommended_videos(self, video_id, max_results=5,
                                parser=P.parse_rec_video_metadata,
                                **kwargs):
@@ -0,0 +1,1287 @@
+import sys
+import time
+import asyncio
+import datetime
+import contextvars
+import collections
+import pandas as pd
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from youtube_api.youtube_api_utils import (
+    _chunker,
+    _search_query,
+    _endpoint_resource,
+    _with_fields,
+    _replies_truncated,
+    _timestamp,
+    _search_item_id,
+    _compact_id,
+    _watermark,
+    _new_items,
+    _next_watermark,
+)
+from youtube_api.retry import RetryPolicy, error_reason
+from youtube_api.decoders import get_decoder
+from youtube_api.quota import (
+    KeyPool,
+    QuotaLedger,
+    count_quota,
+    plan_quota,
+    quota_cost,
+    QUOTA_EXCEEDED_REASONS,
+)
+import youtube_api.parsers as P
+
+"""
+This script has the AsyncYouTubeDataAPI class, an asyncio counterpart of
+:class:`youtube_api.youtube_api.YouTubeDataAPI` built on ``aiohttp``.
+"""
+
+__all__ = ['AsyncYouTubeDataAPI']
+
+class AsyncYouTubeDataAPI:
+    """
+    The asyncio client for the YouTube Data API. Every method of :class:`youtube_api.youtube_api.YouTubeDataAPI`
+    is available as a coroutine, and the ``*_gen`` methods are async generators.
+    At most ``max_concurrency`` requests are in flight at the same time.
+
+    Use it as an async context manager so the HTTP session is opened and closed with the client:
+
+    .. code-block:: python
+
+        async with AsyncYouTubeDataAPI(api_key) as yt:
+            videos = await yt.get_video_metadata(video_ids)
+
+    :param key: YouTube Data API key. Get a YouTube Data API key here: https://console.cloud.google.com/apis/dashboard
+        Pass a list of keys, or a :class:`youtube_api.quota.KeyPool`, to spread API calls across keys.
+    :param max_concurrency: the maximum number of requests in flight at once.
+    :type max_concurrency: int
+    :param retry_policy: which failed API calls to retry and how long to wait in between, see :class:`youtube_api.retry.RetryPolicy`.
+    :param rate_limiter: paces API calls per key and resource, see :mod:`youtube_api.rate_limit`.
+    :param cache: a response cache such as :class:`youtube_api.cache.SQLiteCache`, so repeated API calls don't spend quota.
+    :param id_cache: a :class:`youtube_api.cache.IDCache` of videos and channels by ID. Lists of IDs are deduplicated, and cached IDs are not requested again.
+    :param etag_store: a :class:`youtube_api.cache.ETagStore`. Repeated API calls send the stored ETag, and unchanged responses are not downloaded or parsed again.
+    :param partial_responses: request only the JSON paths the parser reads, with a ``fields`` mask. Parsers declare their paths in a ``fields`` attribute.
+    :param json_decoder: the JSON decoder for responses, IE "orjson", see :mod:`youtube_api.decoders`. Defaults to the fastest one installed.
+    :param checkpoint_store: a :class:`youtube_api.checkpoint.SQLiteCheckpointStore`. Paginated methods save their progress after each page, and continue from it when called again with the same arguments.
+    :param prefetch: request the next page of paginated methods in the background while the current page is parsed and yielded. A page that is never read still spends quota.
+    :param watermark_store: a :class:`youtube_api.checkpoint.SQLiteWatermarkStore`. Playlist walks stop at the videos collected by the last walk of the playlist, and save the mark of the newest videos.
+    """
+    def __init__(
+        self, key, api_version='3', verify_api_key=True, verbose=False, timeout=20,
+        max_concurrency=10, retry_policy=None, rate_limiter=None, cache=None, id_cache=None,
+        etag_store=None, partial_responses=True,
+        json_decoder=None, checkpoint_store=None, prefetch=False,
+        watermark_store=None
+    ):
+        """
+        :param key: YouTube Data API key
+        Get a YouTube Data API key here: https://console.cloud.google.com/apis/dashboard
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncYouTubeDataAPI requires aiohttp, '
+                              'install it with `pip install aiohttp`.')
+        self.key_pool = key if isinstance(key, KeyPool) else KeyPool(key if key else [])
+        self.key = self.key_pool.keys[0] if len(self.key_pool) else None
+        self.api_version = int(api_version)
+        self.verbose = verbose
+        self.max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._verify_api_key = verify_api_key
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.id_cache = id_cache
+        self.etag_store = etag_store
+        self.partial_responses = partial_responses
+        self._loads = get_decoder(json_decoder)
+        self.checkpoint_store = checkpoint_store
+        self.prefetch = prefetch
+        self.watermark_store = watermark_store
+        # retries per API resource IE {'commentThreads' : 2}, and for the last API call of each thread or task.
+        self.retry_counts = collections.Counter()
+        self._last_retries = contextvars.ContextVar('last_retries', default=0)
+        # quota units spent per method and per API resource.
+        self.quota_ledger = QuotaLedger()
+        self.session = None
+
+        # check API Key
+        if not self.key:
+            raise ValueError('No API key used to initate the class.')
+
+
+    async def __aenter__(self):
+        await self._create_session()
+        if self._verify_api_key and not await self.verify_key():
+            await self.close()
+            raise ValueError('The API Key is invalid')
+        return self
+
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+    async def _create_session(self):
+        '''
+        Creates an aiohttp session whose connection pool holds ``max_concurrency`` connections.
+        Asks for gzip compressed responses.
+        '''
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            # Google only sends compressed responses to user agents that contain "gzip".
+            headers = {'Accept-Encoding' : 'gzip',
+                       'User-Agent' : '{} (gzip)'.format(aiohttp.http.SERVER_SOFTWARE)}
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self._timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+
+    async def close(self):
+        '''
+        Closes the underlying HTTP session.
+        '''
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+    @property
+    def last_retries(self):
+        '''
+        The number of retries of the last API call sent by the current thread or task,
+        so concurrent calls don't overwrite each other's count.
+        '''
+        return self._last_retries.get()
+
+
+    async def verify_key(self):
+        '''
+        Checks it the API keys are valid.
+
+        :returns: True if every API key is valid, False if a key is not valid.
+        :rtype: bool
+        '''
+        if self.session is None:
+            await self._create_session()
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlists"
+                         "?part=id&id=UC_x5XG1OV2P6uZZ5FSM9Ttw&"
+                         "maxResults=2".format(self.api_version))
+        for key in self.key_pool.keys:
+            async with self.session.get(http_endpoint + '&key={}'.format(key)) as response:
+                if not response.ok:
+                    return False
+        return True
+
+
+    def plan(self, method, *args, n_items=None, n_replies=0, **kwargs):
+        '''
+        Estimates the number of requests and quota units a call would spend, without calling the API.
+        IE ``yt.plan(yt.get_video_metadata, video_ids)`` is ``QuotaPlan(requests=ceil(len(video_ids) / 50), units=ceil(len(video_ids) / 50))``.
+        Compare it with ``key_pool.remaining()`` to check that a crawl fits in today's quota.
+
+        :param method: a method of this class, or its name IE "search".
+        :param n_items: the expected number of items for paginated methods, IE the video count of a channel.
+        :type n_items: int
+        :param n_replies: the expected number of comment threads with more than 5 replies for :meth:`get_video_comments`. Threads with up to 5 replies come with them.
+        :type n_replies: int
+
+        :returns: the estimated requests and quota units.
+        :rtype: :class:`youtube_api.quota.QuotaPlan`
+        '''
+        if isinstance(method, str):
+            method = getattr(self, method)
+        return plan_quota(method, *args, n_items=n_items, n_replies=n_replies, **kwargs)
+
+
+    async def _http_request(self, http_endpoint):
+        '''
+        A wrapper coroutine for making an http request to the YouTube Data API.
+        Returns the cached response if there is one in ``cache``.
+        Sends the ETag in ``etag_store`` and returns the stored response when it hasn't changed.
+        Waits for a free slot so no more than ``max_concurrency`` requests are in flight.
+        Adds the API key from ``key_pool`` that spent the least quota, and switches keys when a key runs out of quota.
+        Retries failed requests according to ``retry_policy``, and counts the retries in ``retry_counts`` and :attr:`last_retries`.
+        Returns the json response.
+        '''
+        if self.session is None:
+            await self._create_session()
+        if self.verbose:
+            print(http_endpoint)
+        if self.cache:
+            body = self.cache.get(http_endpoint)
+            if body is not None:
+                return self._loads(body)
+        stored = self.etag_store.get(http_endpoint) if self.etag_store is not None else None
+        headers = {'If-None-Match' : stored[0]} if stored else None
+        resource = _endpoint_resource(http_endpoint)
+        units = quota_cost(resource)
+        retries = 0
+        while True:
+            key = self.key_pool.acquire(units)
+            self.quota_ledger.record(resource, units)
+            if self.rate_limiter:
+                wait = self.rate_limiter.try_acquire(key, resource)
+                while wait:
+                    await asyncio.sleep(wait)
+                    wait = self.rate_limiter.try_acquire(key, resource)
+            try:
+                async with self._semaphore:
+                    async with self.session.get(http_endpoint + '&key={}'.format(key), headers=headers) as response:
+                        response_body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not self.retry_policy.should_retry(retries):
+                    raise
+                retry_after = None
+            else:
+                if response.ok:
+                    break
+                reason = error_reason(response_body)
+                if reason in QUOTA_EXCEEDED_REASONS and self.key_pool.exhaust(key):
+                    # try again right away with a key that has quota left.
+                    continue
+                if not self.retry_policy.should_retry(retries, response.status, reason):
+                    break
+                retry_after = response.headers.get('Retry-After')
+            await asyncio.sleep(self.retry_policy.get_backoff(retries, retry_after))
+            retries += 1
+
+        self._last_retries.set(retries)
+        if retries:
+            self.retry_counts[resource] += retries
+        if stored and response.status == 304:
+            self.etag_store.hit()
+            return stored[1]
+        if not response.ok:
+            # the message is the reason of the API error, IE "quotaExceeded", rather than the http reason phrase.
+            raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status,
+                                              message=error_reason(response_body) or response.reason,
+                                              headers=response.headers)
+        response_json = self._loads(response_body)
+        if self.cache:
+            self.cache.set(http_endpoint, response_body)
+        if self.etag_store is not None:
+            etag = response.headers.get('ETag', response_json.get('etag'))
+            if etag:
+                self.etag_store.set(http_endpoint, etag, response_json)
+        return response_json
+
+
+    async def _http_request_many(self, http_endpoints):
+        '''
+        Requests ``http_endpoints`` concurrently, keeping up to ``max_concurrency`` requests scheduled,
+        and yields the json responses in the order of ``http_endpoints``.
+        '''
+        pending = collections.deque()
+        try:
+            for http_endpoint in http_endpoints:
+                pending.append(asyncio.ensure_future(self._http_request(http_endpoint)))
+                if len(pending) >= self.max_concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+    @count_quota
+    async def get_channel_id_from_user(self, username, **kwargs):
+        """
+        Get a channel_id from a YouTube username.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/channels/list
+
+        :param username: the username for a YouTube channel
+        :type username: str
+
+        :returns: YouTube Channel ID for a given username
+        :rtype: str
+        """
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels"
+                         "?part=id"
+                         "&forUsername={}".format(self.api_version,
+                                                  username))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        response_json = await self._http_request(http_endpoint)
+        channel_id = None
+        if response_json.get('items'):
+            channel_id = response_json['items'][0]['id']
+        return channel_id
+
+
+    def _chunk_endpoints(self, resource, ids, part, kwargs, max_results=True):
+        '''
+        Builds one endpoint per 50-ID chunk of ``ids`` for the ``resource`` list endpoint.
+        '''
+        for chunk in _chunker(ids, 50):
+            id_input = ','.join(chunk)
+            http_endpoint = ("https://www.googleapis.com/youtube/v{}/{}"
+                             "?part={}&id={}".format(
+                                 self.api_version, resource, part, id_input))
+            if max_results:
+                http_endpoint += "&maxResults=50"
+            for k,v in kwargs.items():
+                http_endpoint += '&{}={}'.format(k, v)
+            yield http_endpoint
+
+
+    async def _paginate(self, http_endpoint, next_page_token=None, delay=0, checkpoint=None,
+                        count=None):
+        '''
+        Requests every page of a paginated ``http_endpoint`` one at a time, starting at ``next_page_token``.
+        Yields the number of items on the pages before, and the json response of each page.
+        Stops at the page without a ``nextPageToken``.
+
+        With a ``checkpoint_store``, starts at the page saved by an earlier call of the ``checkpoint`` method
+        unless the caller passed a ``next_page_token``, and saves the next page token once the items of a page are consumed.
+        With ``prefetch``, the next page is requested as soon as its token is known.
+
+        :param delay: seconds to wait before requesting each following page.
+        :type delay: float
+        :param checkpoint: the name of the calling method, IE "search".
+        :type checkpoint: str
+        :param count: returns the number of items the caller yielded so far, when it is not the number of items on the pages.
+        :type count: callable
+        '''
+        n_items = 0
+        if checkpoint and self.checkpoint_store is not None and not next_page_token:
+            saved = self.checkpoint_store.get(checkpoint, http_endpoint)
+            if saved:
+                next_page_token, n_items = saved
+
+        async def request(page_token, delay=0):
+            if delay:
+                await asyncio.sleep(delay)
+            page_endpoint = http_endpoint
+            if page_token:
+                page_endpoint += "&pageToken={}".format(page_token)
+            return await self._http_request(page_endpoint)
+
+        prefetched = None
+        try:
+            response_json = await request(next_page_token)
+            while True:
+                next_page_token = response_json.get('nextPageToken')
+                if self.prefetch and next_page_token:
+                    # request the next page while the caller consumes this one.
+                    prefetched = asyncio.ensure_future(request(next_page_token, delay))
+                yield n_items, response_json
+                n_items = count() if count else n_items + len(response_json.get('items', []))
+                if not next_page_token:
+                    self._end_checkpoint(checkpoint, http_endpoint)
+                    return
+                if checkpoint and self.checkpoint_store is not None:
+                    self.checkpoint_store.set(checkpoint, http_endpoint, next_page_token, n_items)
+                if prefetched:
+                    response_json = await prefetched
+                    prefetched = None
+                else:
+                    response_json = await request(next_page_token, delay)
+        finally:
+            if prefetched:
+                prefetched.cancel()
+
+
+    def _end_checkpoint(self, checkpoint, http_endpoint):
+        '''
+        Removes the checkpoint of a paginated method that finished.
+        '''
+        if checkpoint and self.checkpoint_store is not None:
+            self.checkpoint_store.delete(checkpoint, http_endpoint)
+
+
+    async def _get_replies(self, parent_ids, part, kwargs):
+        '''
+        Requests every page of replies to the comments ``parent_ids``.
+        The first pages of every comment are requested concurrently, then the second pages of the comments that have more, and so on.
+
+        :returns: the raw replies of each comment ID.
+        :rtype: dict
+        '''
+        replies = {parent_id : [] for parent_id in parent_ids}
+        page_tokens = {parent_id : None for parent_id in parent_ids}
+        while page_tokens:
+            http_endpoints = []
+            for parent_id, page_token in page_tokens.items():
+                http_endpoint = ("https://www.googleapis.com/youtube/v{}/comments?"
+                                 "part={}&textFormat=plainText&maxResults=100&"
+                                 "parentId={}".format(
+                                     self.api_version, part, parent_id))
+                for k,v in kwargs.items():
+                    http_endpoint += '&{}={}'.format(k, v)
+                if page_token:
+                    http_endpoint += "&pageToken={}".format(page_token)
+                http_endpoints.append(http_endpoint)
+            next_page_tokens = dict()
+            parent_ids = list(page_tokens)
+            i = 0
+            async for response_json in self._http_request_many(http_endpoints):
+                parent_id = parent_ids[i]
+                i += 1
+                replies[parent_id].extend(response_json.get('items', []))
+                if response_json.get('nextPageToken'):
+                    next_page_tokens[parent_id] = response_json['nextPageToken']
+            page_tokens = next_page_tokens
+        return replies
+
+
+    def _with_fields(self, parser, resource, kwargs, **extra):
+        '''
+        Adds the ``fields`` mask of ``parser`` to the query ``kwargs`` of a ``resource`` request,
+        unless ``partial_responses`` is off.
+        '''
+        if not self.partial_responses:
+            return kwargs
+        return _with_fields(parser, resource, kwargs, **extra)
+
+
+    async def _get_items_by_id(self, resource, ids, part, kwargs):
+        '''
+        Yields the raw ``resource`` items of ``ids`` once per ID, in the order of ``ids``.
+        Items in ``id_cache`` are not requested again, the others are requested in 50-ID chunks and cached.
+        IDs the API doesn't return are skipped.
+        '''
+        variant = (resource, part) + tuple(sorted(kwargs.items()))
+        ids = list(dict.fromkeys(ids))
+        items = dict()
+        missing = []
+        for id_ in ids:
+            item = self.id_cache.get(variant + (id_,))
+            if item is None:
+                missing.append(id_)
+            else:
+                items[id_] = item
+
+        position = {id_ : i for i, id_ in enumerate(ids)}
+        n_yielded = 0
+        http_endpoints = self._chunk_endpoints(resource, missing, part, kwargs)
+        i = 0
+        async for response_json in self._http_request_many(http_endpoints):
+            for item in response_json.get('items', []):
+                items[item['id']] = item
+                self.id_cache.set(variant + (item['id'],), item)
+            # every ID up to the end of this chunk is either cached or fetched.
+            i += 1
+            last_id = missing[min(len(missing), i * 50) - 1]
+            for id_ in ids[n_yielded : position[last_id] + 1]:
+                if id_ in items:
+                    yield items.pop(id_)
+            n_yielded = position[last_id] + 1
+        for id_ in ids[n_yielded:]:
+            if id_ in items:
+                yield items.pop(id_)
+
+
+    @count_quota
+    async def get_channel_metadata_gen(self, channel_id, parser=P.parse_channel_metadata,
+                                       part=["id", "snippet", "contentDetails", "statistics",
+                                             "topicDetails", "brandingSettings"],
+                                       **kwargs):
+        '''
+        Async generator of channel metadata given a list of channel_ids.
+        Chunks of 50 channel_ids are requested concurrently.
+
+        :param channel_id:  channel id(s)
+        :type channel_id: list
+        :param parser: the function to parse the json document.
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields the YouTube channel metadata
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'channels', kwargs)
+        part = ','.join(part)
+        if (isinstance(channel_id, list) or isinstance(channel_id, pd.Series)) and self.id_cache is not None:
+            # one collection_date per call, as cached items don't come from a page.
+            parse = P._page_parser(parser)
+            async for item in self._get_items_by_id('channels', channel_id, part, kwargs):
+                yield parse(item)
+        elif isinstance(channel_id, list) or isinstance(channel_id, pd.Series):
+            http_endpoints = self._chunk_endpoints('channels', channel_id, part, kwargs)
+            async for response_json in self._http_request_many(http_endpoints):
+                parse = P._page_parser(parser)
+                if response_json.get('items'):
+                    for item in response_json['items']:
+                        yield parse(item)
+                else:
+                    yield parse(None)
+
+
+    @count_quota
+    async def get_channel_metadata(self, channel_id, parser=P.parse_channel_metadata,
+                                   part=["id", "snippet", "contentDetails", "statistics",
+                                         "topicDetails", "brandingSettings"],  **kwargs):
+        '''
+        Gets a dictionary of channel metadata given a channel_id, or a list of channel_ids.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/channels/list
+
+        :param channel_id: the channel id(s)
+        :type channel_id: str or list
+        :param parser: the function to parse the json document.
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: the YouTube channel metadata
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'channels', kwargs)
+        channel_meta = []
+        if isinstance(channel_id, str):
+            part = ','.join(part)
+            http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels?"
+                             "part={}&id={}&maxResults=50".format(
+                                 self.api_version, part, channel_id))
+            for k,v in kwargs.items():
+                http_endpoint += '&{}={}'.format(k, v)
+            response_json = await self._http_request(http_endpoint)
+            if response_json.get('items'):
+                channel_meta = P._page_parser(parser)(response_json['items'][0])
+
+        elif isinstance(channel_id, list) or isinstance(channel_id, pd.Series):
+            async for channel_meta_ in self.get_channel_metadata_gen(channel_id,
+                                                                     parser=parser,
+                                                                     part=part,
+                                                                     **kwargs):
+                channel_meta.append(channel_meta_)
+        else:
+            raise TypeError("Could not process the type entered!")
+
+        return channel_meta
+
+
+    @count_quota
+    async def get_video_metadata_gen(self, video_id, parser=P.parse_video_metadata,
+                                     part=['statistics','snippet'],  **kwargs):
+        '''
+        Async generator of video metrics and metadata given a list of `video_id`.
+        Chunks of 50 video_ids are requested concurrently.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/videos/list
+
+        :param video_id: The IDs of videos IE: ["kNbhUWLH_yY"]
+        :type video_id: list of str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: returns metadata from the inputted ``video_id``s.
+        :rtype: dict
+        '''
+        part = ','.join(part)
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'videos', kwargs)
+        if (isinstance(video_id, list) or isinstance(video_id, pd.Series)) and self.id_cache is not None:
+            # one collection_date per call, as cached items don't come from a page.
+            parse = P._page_parser(parser)
+            async for item in self._get_items_by_id('videos', video_id, part, kwargs):
+                yield parse(item)
+        elif isinstance(video_id, list) or isinstance(video_id, pd.Series):
+            http_endpoints = self._chunk_endpoints('videos', video_id, part, kwargs)
+            async for response_json in self._http_request_many(http_endpoints):
+                parse = P._page_parser(parser)
+                if response_json.get('items'):
+                    for item in response_json['items']:
+                        yield parse(item)
+                else:
+                    yield parse(None)
+        else:
+            raise Exception('This function only takes iterables!')
+
+
+    @count_quota
+    async def get_video_metadata(self, video_id, parser=P.parse_video_metadata,
+                                 part=['statistics','snippet'],  **kwargs):
+        '''
+        Given a single or list of `video_id` returns metrics (views, likes, comments) and metadata (description, category) as a dictionary.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/videos/list
+
+        :param video_id:  the ID of a video IE: ['kNbhUWLH_yY']
+        :type video_id: str or list of str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: video metadata.
+        :rtype: dict or list of dict
+        '''
+        video_metadata = []
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'videos', kwargs)
+        if isinstance(video_id, str):
+            part = ','.join(part)
+            http_endpoint = ("https://www.googleapis.com/youtube/v{}/videos"
+                             "?part={}"
+                             "&id={}&maxResults=2".format(self.api_version,
+                                                          part, video_id))
+            for k,v in kwargs.items():
+                http_endpoint += '&{}={}'.format(k, v)
+            response_json = await self._http_request(http_endpoint)
+            if response_json.get('items'):
+                video_metadata = P._page_parser(parser)(response_json['items'][0])
+
+        elif isinstance(video_id, list) or isinstance(video_id, pd.Series):
+            async for video_meta in self.get_video_metadata_gen(video_id,
+                                                                parser=parser,
+                                                                part=part,
+                                                                **kwargs):
+                video_metadata.append(video_meta)
+        else:
+            raise TypeError("Could not process the type entered!")
+
+        return video_metadata
+
+
+    @count_quota
+    async def get_playlists_gen(self, channel_id, next_page_token=False, parser=P.parse_playlist_metadata,
+                                part=['id','snippet','contentDetails'], **kwargs):
+        '''
+        Yields the playlists that `channel_id` created, requesting one page of 50 at a time.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/playlists/list
+
+        :param channel_id: a channel_id IE: "UCn8zNIfYAQNdrFRrr8oibKw"
+        :type channel_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields playlist info that ``channel_id`` created.
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'playlists', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlists"
+                         "?part={}&channelId={}&maxResults=50".format(
+                             self.api_version, part, channel_id))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        async for _, response_json in self._paginate(http_endpoint, next_page_token,
+                                                     checkpoint='get_playlists'):
+            parse = P._page_parser(parser)
+            for item in response_json.get('items', []):
+                yield parse(item)
+
+
+    @count_quota
+    async def get_playlists(self, channel_id, next_page_token=False, parser=P.parse_playlist_metadata,
+                            part=['id','snippet','contentDetails'], **kwargs):
+        '''
+        Returns a list of playlist IDs that `channel_id` created.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/playlists/list
+
+        :param channel_id: a channel_id IE: "UCn8zNIfYAQNdrFRrr8oibKw"
+        :type channel_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: playlist info that ``channel_id`` created.
+        :rtype: list of dict
+        '''
+        playlists = []
+        async for playlist in self.get_playlists_gen(channel_id, next_page_token=next_page_token,
+                                                     parser=parser, part=part, **kwargs):
+            playlists.append(playlist)
+        return playlists
+
+
+    @count_quota
+    async def get_videos_from_playlist_id_gen(self, playlist_id, next_page_token=None,
+                                              parser=P.parse_video_url, part=['snippet'],
+                                              max_results=200000, since=None, **kwargs):
+        '''
+        Given a `playlist_id`, yields the videos of that playlist, requesting one page of 50 at a time.
+        With a high-water mark, stops at the videos collected before, as uploads playlists list the newest videos first.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/playlistItems
+
+        :param playlist_id: the playlist_id IE: "UUaLfMkkHhSA_LaCta0BzyhQ"
+        :type platlist_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param max_results: How many video IDs should returned? Contrary to the name, this is actually the minimum number of results to be returned.
+        :type max_results: int
+        :param since: the high-water mark of an earlier walk, a publish datetime or timestamp, a set of video IDs, or both in a tuple. Stops at the first video published at or before it, or in the set. Defaults to the mark in ``watermark_store``, which is saved by walks that start at the first page, also when they stop at ``max_results``. Timestamps are in the clock of the ``publish_date`` of the parsers, so ``max(video['publish_date'] for video in videos)`` is a mark, and naive datetimes are in UTC.
+        :type since: datetime or set
+
+        :returns: yields video ids associated with ``playlist_id``.
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        if since is None and self.watermark_store is not None:
+            since = self.watermark_store.get(playlist_id)
+        watermark = _watermark(since)
+        if watermark or self.watermark_store is not None:
+            kwargs = self._with_fields(parser, 'playlistItems', kwargs,
+                                       paths=['snippet/publishedAt', 'snippet/resourceId/videoId'])
+        else:
+            kwargs = self._with_fields(parser, 'playlistItems', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/playlistItems"
+                         "?part={}&playlistId={}&maxResults=50".format(
+                             self.api_version, part, playlist_id))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        # the newest page of videos, the next high-water mark,
+        # known only to a walk from the first page, not one resumed from a page token or a checkpoint.
+        newest = []
+        from_start = not next_page_token and not (self.checkpoint_store is not None and
+                                                  self.checkpoint_store.get('get_videos_from_playlist_id', http_endpoint))
+        async for n_videos, response_json in self._paginate(http_endpoint, next_page_token,
+                                                            checkpoint='get_videos_from_playlist_id'):
+            if not response_json.get('items'):
+                break
+            items, reached = _new_items(response_json['items'], watermark)
+            parse = P._page_parser(parser)
+            for item in items:
+                if len(newest) < 50:
+                    newest.append(item)
+                yield parse(item)
+                n_videos += 1
+                if n_videos >= max_results:
+                    self._end_checkpoint('get_videos_from_playlist_id', http_endpoint)
+                    if self.watermark_store is not None and from_start:
+                        self.watermark_store.set(playlist_id, *_next_watermark(newest))
+                    return
+            if reached:
+                break
+        self._end_checkpoint('get_videos_from_playlist_id', http_endpoint)
+        if self.watermark_store is not None and from_start and newest:
+            self.watermark_store.set(playlist_id, *_next_watermark(newest))
+
+
+    @count_quota
+    async def get_videos_from_playlist_id(self, playlist_id, next_page_token=None,
+                                          parser=P.parse_video_url, part=['snippet'],
+                                          max_results=200000, since=None, **kwargs):
+        '''
+        Given a `playlist_id`, returns `video_ids` associated with that playlist.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/playlistItems
+
+        :param playlist_id: the playlist_id IE: "UUaLfMkkHhSA_LaCta0BzyhQ"
+        :type platlist_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param max_results: How many video IDs should returned? Contrary to the name, this is actually the minimum number of results to be returned.
+        :type max_results: int
+        :param since: the high-water mark of an earlier walk, see :meth:`get_videos_from_playlist_id_gen`.
+        :type since: datetime or set
+
+        :returns: video ids associated with ``playlist_id``.
+        :rtype: list of dict
+        '''
+        videos = []
+        async for video in self.get_videos_from_playlist_id_gen(playlist_id, next_page_token=next_page_token,
+                                                                parser=parser, part=part,
+                                                                max_results=max_results, since=since,
+                                                                **kwargs):
+            videos.append(video)
+        return videos
+
+
+    @count_quota
+    async def get_subscriptions_gen(self, channel_id, next_page_token=False,
+                                    parser=P.parse_subscription_descriptive,
+                                    part=['id', 'snippet'], **kwargs):
+        '''
+        Yields the channels that `channel_id` is subscribed to, requesting one page of 50 at a time.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/subscriptions
+
+        :param channel_id: a channel_id IE: "UCn8zNIfYAQNdrFRrr8oibKw"
+        :type channel_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields channel IDs that ``channel_id`` is subscribed to.
+        :rtype: dict
+        '''
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'subscriptions', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/subscriptions"
+                         "?channelId={}&part={}&maxResults=50".format(
+                             self.api_version, channel_id, part))
+        for k,v in kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        async for _, response_json in self._paginate(http_endpoint, next_page_token,
+                                                     checkpoint='get_subscriptions'):
+            parse = P._page_parser(parser)
+            for item in response_json.get('items', []):
+                yield parse(item)
+
+
+    @count_quota
+    async def get_subscriptions(self, channel_id, next_page_token=False,
+                                parser=P.parse_subscription_descriptive,
+                                part=['id', 'snippet'], **kwargs):
+        '''
+        Returns a list of channel IDs that `channel_id` is subscribed to.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/subscriptions
+
+        :param channel_id: a channel_id IE: "UCn8zNIfYAQNdrFRrr8oibKw"
+        :type channel_id: str
+        :param next_page_token: a token to continue from a preciously stopped query IE: "CDIQAA"
+        :type next_page_token: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: channel IDs that ``channel_id`` is subscribed to.
+        :rtype: list
+        '''
+        subscriptions = []
+        async for subscription in self.get_subscriptions_gen(channel_id, next_page_token=next_page_token,
+                                                             parser=parser, part=part, **kwargs):
+            subscriptions.append(subscription)
+        return subscriptions
+
+
+    @count_quota
+    async def get_featured_channels_gen(self, channel_id, parser=P.parse_featured_channels,
+                                        part=["id", "brandingSettings"], **kwargs):
+        '''
+        Async generator of dictionaries {channel_id : [list, of, channel_ids]} of featured channels,
+        given a `channel_id` or a list of channel IDs. Chunks of 50 channel IDs are requested concurrently.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/channels/list
+
+        :param channel_id: channel_ids IE: ['UCn8zNIfYAQNdrFRrr8oibKw']
+        :type channel_id: str of list of str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields metadata for featured channels
+        :rtype: dict
+        '''
+        parser = parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'channels', kwargs)
+        part = ','.join(part)
+        if isinstance(channel_id, list):
+            http_endpoints = self._chunk_endpoints('channels', channel_id, part, kwargs,
+                                                   max_results=False)
+            async for response_json in self._http_request_many(http_endpoints):
+                parse = P._page_parser(parser)
+                if response_json.get('items'):
+                    for item in response_json['items']:
+                        yield parse(item)
+                else:
+                    yield parse(None)
+
+        else:
+            http_endpoint = ("https://www.googleapis.com/youtube/v{}/channels"
+                             "?part={}&id={}".format(
+                                 self.api_version, part, channel_id))
+            for k,v in kwargs.items():
+                http_endpoint += '&{}={}'.format(k, v)
+            response_json = await self._http_request(http_endpoint)
+            parse = P._page_parser(parser)
+            for item in response_json['items']:
+                yield parse(item)
+
+
+    @count_quota
+    async def get_featured_channels(self, channel_id, parser=P.parse_featured_channels, **kwargs):
+        '''
+        Given a `channel_id` returns a dictionary {channel_id : [list, of, channel_ids]}
+        of featured channels.
+
+        Optionally, can take a list of channel IDs, and returns a list of dictionaries.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/channels/list
+
+        :param channel_id: channel_ids IE:['UCn8zNIfYAQNdrFRrr8oibKw']
+        :type channel_id: str or list of str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+
+        :returns: metadata for featured channels from ``channel_id``.
+        :rtype: list of dict
+        '''
+        featured_channels = []
+        async for channel in self.get_featured_channels_gen(channel_id, parser=parser, **kwargs):
+            featured_channels.append(channel)
+        return featured_channels
+
+
+    @count_quota
+    async def get_video_comments_gen(self, video_id, get_replies=True,
+                                     max_results=None, next_page_token=False,
+                                     parser=P.parse_comment_metadata, part = ['snippet'],
+                                     **kwargs):
+        """
+        Yields comments and replies to comments for a given video, requesting one page of 100 comments at a time.
+        Each comment is followed by its replies.
+
+        Comment threads are requested with ``part=replies``, which includes up to 5 replies per comment.
+        The replies of the other comments on a page are paged through with the comments endpoint, concurrently.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/commentThreads/list
+
+        :param video_id: a video_id IE: "eqwPlwHSL_M"
+        :type video_id: str
+        :param get_replies: whether or not to get replies to comments
+        :type get_replies: bool
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields comments and responses to comments of the given ``video_id``.
+        :rtype: dict
+        """
+        parser=parser if parser else P.raw_json
+        reply_part = ','.join(p for p in part if p != 'replies')
+        if get_replies and 'replies' not in part:
+            part = list(part) + ['replies']
+        part = ','.join(part)
+        thread_kwargs = self._with_fields(parser, 'commentThreads', kwargs)
+        reply_kwargs = self._with_fields(parser, 'comments', kwargs)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/commentThreads?"
+                         "part={}&textFormat=plainText&maxResults=100&"
+                         "videoId={}".format(
+                             self.api_version, part, video_id))
+        for k,v in thread_kwargs.items():
+            http_endpoint += '&{}={}'.format(k, v)
+        n_comments = 0
+        async for n_comments, response_json in self._paginate(http_endpoint, next_page_token,
+                                                              checkpoint='get_video_comments',
+                                                              count=lambda: n_comments):
+            items = response_json.get('items', [])
+            replies = dict()
+            if get_replies:
+                truncated = [item['id'] for item in items if _replies_truncated(item)]
+                replies = await self._get_replies(truncated, reply_part, reply_kwargs)
+            parse = P._page_parser(parser)
+            for item in items:
+                thread_replies = replies.get(item['id'], item.get('replies', {}).get('comments', []))
+                for comment in [item] + (thread_replies if get_replies else []):
+                    if max_results and n_comments >= max_results:
+                        self._end_checkpoint('get_video_comments', http_endpoint)
+                        return
+                    n_comments += 1
+                    yield parse(comment)
+
+
+    @count_quota
+    async def get_video_comments(self, video_id, get_replies=True,
+                                 max_results=None, next_page_token=False,
+                                 parser=P.parse_comment_metadata, part = ['snippet'],
+                                 **kwargs):
+        """
+        Returns comments and replies to comments for a given video.
+        Each comment is followed by its replies.
+        Comment threads are paged in order, replies are requested concurrently.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/commentThreads/list
+
+        :param video_id: a video_id IE: "eqwPlwHSL_M"
+        :type video_id: str
+        :param get_replies: whether or not to get replies to comments
+        :type get_replies: bool
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: comments and responses to comments of the given ``video_id``.
+        :rtype: list of dict
+        """
+        comments = []
+        async for comment in self.get_video_comments_gen(video_id, get_replies=get_replies,
+                                                         max_results=max_results,
+                                                         next_page_token=next_page_token,
+                                                         parser=parser, part=part, **kwargs):
+            comments.append(comment)
+        return comments
+
+
+    @count_quota
+    async def search_gen(self, q=None, channel_id=None,
+                         max_results=5, order_by="relevance", next_page_token=None,
+                         published_after=datetime.datetime.timestamp(datetime.datetime(2000,1,1)),
+                         published_before=datetime.datetime.timestamp(
+                             datetime.datetime((3000 if sys.maxsize > 2**31 else 2038),1,1)),
+                         location=None, location_radius='1km', region_code=None,
+                         safe_search=None, relevance_language=None, event_type=None,
+                         topic_id=None, video_duration=None, search_type="video",
+                         parser=P.parse_rec_video_metadata, part=['snippet'],
+                         **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords, and yield the results one page of 50 at a time. Only returns up to 500 videos per search.
+        Takes the same arguments as :meth:`youtube_api.youtube_api.YouTubeDataAPI.search`.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/search/list
+
+        :param q: regex pattern to search using | for or, && for and, and - for not. IE boat|fishing is boat or fishing
+        :type q: list or str
+        :param max_results: max number of videos returned by a search query.
+        :type max_results: int
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: yields incomplete video metadata of videos returned by search query.
+        :rtype: dict
+        """
+        if search_type not in ["video", "channel", "playlist"]:
+            raise Exception("The value you have entered for `type` is not valid!")
+
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'search', kwargs)
+        part = ','.join(part)
+        http_endpoint = ("https://www.googleapis.com/youtube/v{}/search?"
+                         "part={}&type={}&maxResults=50"
+                         "&order={}".format(
+                             self.api_version, part, search_type, order_by))
+        http_endpoint += _search_query(
+            q=q, channel_id=channel_id, published_after=published_after,
+            published_before=published_before, location=location,
+            location_radius=location_radius, region_code=region_code,
+            safe_search=safe_search, relevance_language=relevance_language,
+            event_type=event_type, topic_id=topic_id,
+            video_duration=video_duration, **kwargs)
+        delay = 0 if self.rate_limiter else .1
+        async for n_videos, response_json in self._paginate(http_endpoint, next_page_token, delay=delay,
+                                                            checkpoint='search'):
+            if not response_json.get('items'):
+                self._end_checkpoint('search', http_endpoint)
+                return
+            parse = P._page_parser(parser)
+            for item in response_json['items']:
+                if max_results and n_videos >= max_results:
+                    self._end_checkpoint('search', http_endpoint)
+                    return
+                n_videos += 1
+                yield parse(item)
+
+
+    @count_quota
+    async def search(self, q=None, channel_id=None,
+                     max_results=5, order_by="relevance", next_page_token=None,
+                     published_after=datetime.datetime.timestamp(datetime.datetime(2000,1,1)),
+                     published_before=datetime.datetime.timestamp(
+                         datetime.datetime((3000 if sys.maxsize > 2**31 else 2038),1,1)),
+                     location=None, location_radius='1km', region_code=None,
+                     safe_search=None, relevance_language=None, event_type=None,
+                     topic_id=None, video_duration=None, search_type="video",
+                     parser=P.parse_rec_video_metadata, part=['snippet'],
+                     **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords. Only returns up to 500 videos per search.
+        Takes the same arguments as :meth:`youtube_api.youtube_api.YouTubeDataAPI.search`.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/search/list
+
+        :param q: regex pattern to search using | for or, && for and, and - for not. IE boat|fishing is boat or fishing
+        :type q: list or str
+        :param max_results: max number of videos returned by a search query.
+        :type max_results: int
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+
+        :returns: incomplete video metadata of videos returned by search query.
+        :rtype: list of dict
+        """
+        videos = []
+        async for video in self.search_gen(q=q, channel_id=channel_id, max_results=max_results,
+                                           order_by=order_by, next_page_token=next_page_token,
+                                           published_after=published_after,
+                                           published_before=published_before,
+                                           location=location, location_radius=location_radius,
+                                           region_code=region_code, safe_search=safe_search,
+                                           relevance_language=relevance_language,
+                                           event_type=event_type, topic_id=topic_id,
+                                           video_duration=video_duration,
+                                           search_type=search_type, parser=parser, part=part,
+                                           **kwargs):
+            videos.append(video)
+        return videos
+
+
+    @count_quota
+    async def search_exhaustive_gen(self, q=None, channel_id=None, max_results=None, order_by="date",
+                                    published_after=datetime.datetime.timestamp(datetime.datetime(2005,1,1)),
+                                    published_before=None, window_results=450, min_window=60,
+                                    search_type="video", parser=P.parse_rec_video_metadata,
+                                    part=['snippet'], **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords, past the cap of about 500 results per search.
+
+        The date range is split into windows of time that are searched concurrently.
+        When the first page of a window has more ``pageInfo.totalResults`` than ``window_results``,
+        the window is halved and both halves are searched, until windows are shorter than ``min_window``.
+        Results found by more than one window are yielded once, in the order the pages arrive.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/search/list
+
+        :param q: regex pattern to search using | for or, && for and, and - for not. IE boat|fishing is boat or fishing
+        :type q: list or str
+        :param max_results: max number of results, all of them when None.
+        :type max_results: int
+        :param published_after: Only show videos uploaded after datetime
+        :type published_after: datetime
+        :param published_before: Only show videos uploaded before datetime, now when None.
+        :type published_before: datetime
+        :param window_results: the number of results a window is expected to return in full.
+        :type window_results: int
+        :param min_window: the shortest window to split, in seconds.
+        :type min_window: float
+        :param search_type: return results on a "video", "channel", or "playlist" search.
+        :type search_type: str
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :param part: The part parameter specifies a comma-separated list of one or more resource properties that the API response will include. Different parameters cost different quota costs from the API.
+        :type part: list
+        :param kwargs: the other filters of :meth:`search`, IE ``region_code`` or ``video_duration``.
+
+        :returns: yields incomplete video metadata of videos returned by search query.
+        :rtype: dict
+        """
+        if search_type not in ["video", "channel", "playlist"]:
+            raise Exception("The value you have entered for `type` is not valid!")
+
+        parser=parser if parser else P.raw_json
+        kwargs = self._with_fields(parser, 'search', kwargs,
+                                   paths=['id'], fields=['pageInfo/totalResults'])
+        part = ','.join(part)
+        published_after = _timestamp(published_after)
+        published_before = _timestamp(published_before) if published_before else time.time()
+
+        def window_endpoint(window, page_token):
+            http_endpoint = ("https://www.googleapis.com/youtube/v{}/search?"
+                             "part={}&type={}&maxResults=50"
+                             "&order={}".format(
+                                 self.api_version, part, search_type, order_by))
+            http_endpoint += _search_query(q=q, channel_id=channel_id,
+                                           published_after=window[0],
+                                           published_before=window[1], **kwargs)
+            if page_token:
+                http_endpoint += "&pageToken={}".format(page_token)
+            return http_endpoint
+
+        # compact IDs of the results yielded so far.
+        seen = set()
+        # the window and page token of each request in flight, at most ``max_concurrency`` are sent at once.
+        pending = dict()
+        def submit(window, page_token=None):
+            task = asyncio.ensure_future(self._http_request(window_endpoint(window, page_token)))
+            pending[task] = (window, page_token)
+
+        submit((published_after, published_before))
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    window, page_token = pending.pop(task)
+                    response_json = task.result()
+                    total_results = response_json.get('pageInfo', {}).get('totalResults', 0)
+                    if (page_token is None and total_results > window_results and
+                            window[1] - window[0] > min_window):
+                        middle = (window[0] + window[1]) / 2
+                        submit((window[0], middle))
+                        submit((middle, window[1]))
+                    elif response_json.get('items') and response_json.get('nextPageToken'):
+                        submit(window, response_json['nextPageToken'])
+                    parse = P._page_parser(parser)
+                    for item in response_json.get('items', []):
+                        item_id = _compact_id(_search_item_id(item))
+                        if item_id in seen:
+                            continue
+                        seen.add(item_id)
+                        yield parse(item)
+                        if max_results and len(seen) >= max_results:
+                            return
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+    @count_quota
+    async def search_exhaustive(self, q=None, channel_id=None, max_results=None, order_by="date",
+                                published_after=datetime.datetime.timestamp(datetime.datetime(2005,1,1)),
+                                published_before=None, window_results=450, min_window=60,
+                                search_type="video", parser=P.parse_rec_video_metadata,
+                                part=['snippet'], **kwargs):
+        """
+        Search YouTube for either videos, channels for keywords, past the cap of about 500 results per search.
+        See :meth:`search_exhaustive_gen`.
+
+        :returns: incomplete video metadata of videos returned by search query.
+        :rtype: list of dict
+        """
+        videos = []
+        async for video in self.search_exhaustive_gen(q=q, channel_id=channel_id,
+                                                      max_results=max_results, order_by=order_by,
+                                                      published_after=published_after,
+                                                      published_before=published_before,
+                                                      window_results=window_results,
+                                                      min_window=min_window,
+                                                      search_type=search_type, parser=parser,
+                                                      part=part, **kwargs):
+            videos.append(video)
+        return videos
+
+
+    @count_quota
+    async def get_recommended_videos(self, video_id, max_results=5,
+                                     parser=P.parse_rec_video_metadata,
+                                     **kwargs):
+        """
+        Get recommended videos given a video ID. This extends the search API.
+
+        Read the docs: https://developers.google.com/youtube/v3/docs/search/list
+
+        :param video_id: (str) a video_id IE: "eqwPlwHSL_M"
+        :param max_results: (int) max number of recommended vids
+        :param parser: the function to parse the json document
+        :type parser: :mod:`youtube_api.parsers module`
+        :returns: incomplete video metadata from recommended videos of ``video_id``.
+        :rtype: list of dict
+        """
+        return await self.search(relatedToVideoId=video_id, order_by='relevance')
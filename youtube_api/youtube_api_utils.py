@@ -1,13 +1,22 @@
 import sys
 import json
+import base64
+import binascii
+import calendar
 import datetime
+import functools
+import time
 import requests
 import re
 import signal
+import numpy as np
 
+import urllib.parse
 from urllib.parse import urlparse
 from urllib.parse import parse_qs
 
+from youtube_api import decoders
+
 '''
 This contains utilities used by other functions in the YoutubeDataApi class, as well as a few convenience functions for data analysis.
 '''
@@ -16,6 +25,8 @@ __all__ = [
     '_chunker',
     '_load_response',
     'parse_yt_datetime',
+    'parse_yt_datetimes',
+    'parse_yt_duration',
     'get_upload_playlist_id',
     'get_liked_playlist_id',
 ]
@@ -40,17 +51,95 @@ def _chunker(l, chunksize):
     for i in range(0, len(l), chunksize):
         yield l[i:i + chunksize]
 
-def _load_response(response):
+def _endpoint_resource(http_endpoint):
+    '''
+    Returns the API resource an endpoint calls, IE "videos" for https://www.googleapis.com/youtube/v3/videos?part=id
+    '''
+    return urlparse(http_endpoint).path.rsplit('/', 1)[-1]
+
+def _load_response(response, loads=None):
     '''
     Loads the response to json, and checks for errors.
+    Parses the raw bytes of the response with ``loads``, or the fastest installed JSON decoder.
     '''
     
     response.raise_for_status()
-    response_json = json.loads(response.text)
+    loads = loads if loads else decoders.loads
+    response_json = loads(response.content)
 
     return response_json
 
 
+def _search_query(q=None, channel_id=None, published_after=None,
+                  published_before=None, location=None, location_radius='1km',
+                  region_code=None, safe_search=None, relevance_language=None,
+                  event_type=None, topic_id=None, video_duration=None, **kwargs):
+    '''
+    Builds the query string arguments shared by every page of a search request.
+    Validates the arguments passed to :meth:`youtube_api.youtube_api.YouTubeDataAPI.search`.
+    '''
+    http_endpoint = ''
+    if q:
+        if isinstance(q, list):
+            q = '|'.join(q)
+        http_endpoint += "&q={}".format(q)
+
+    if published_after:
+        if not isinstance(published_after, float) and not isinstance(published_after, datetime.date):
+            raise Exception("published_after must be a timestamp, not a {}".format(type(published_after)))
+
+        if isinstance(published_after, float):
+            published_after = datetime.datetime.utcfromtimestamp(published_after)
+        _published_after = datetime.datetime.strftime(published_after, "%Y-%m-%dT%H:%M:%SZ")
+        http_endpoint += "&publishedAfter={}".format(_published_after)
+
+    if published_before:
+        if not isinstance(published_before, float) and not isinstance(published_before, datetime.date):
+            raise Exception("published_before must be a timestamp, not a {}".format(type(published_before)))
+
+        if isinstance(published_before, float):
+            published_before = datetime.datetime.utcfromtimestamp(published_before)
+        _published_before = datetime.datetime.strftime(published_before, "%Y-%m-%dT%H:%M:%SZ")
+        http_endpoint += "&publishedBefore={}".format(_published_before)
+
+    if channel_id:
+        http_endpoint += "&channelId={}".format(channel_id)
+
+    if location:
+        if isinstance(location, tuple):
+            location = urllib.parse.quote_plus(str(location).strip('()').replace(' ', ''))
+        http_endpoint += "&location={}&locationRadius={}".format(location,
+                                                                 location_radius)
+    if region_code:
+        http_endpoint += "&regionCode={}".format(region_code)
+
+    if safe_search:
+        if not safe_search in ['moderate', 'strict', 'none']:
+            raise Exception("Not proper safe_search.")
+        http_endpoint += '&safeSearch={}'.format(safe_search)
+
+    if relevance_language:
+        http_endpoint += '&relevanceLanguage={}'.format(relevance_language)
+
+    if event_type:
+        if not event_type in ['completed', 'live', 'upcoming']:
+            raise Exception("Not proper event_type!")
+        http_endpoint += '&eventType={}'.format(event_type)
+
+    if topic_id:
+        http_endpoint += '&topicId={}'.format(topic_id)
+
+    if video_duration:
+        if not video_duration in ['short', 'long', 'medium', 'any']:
+            raise Exception("Not proper video_duration")
+        http_endpoint += '&videoDuration={}'.format(video_duration)
+
+    for k,v in kwargs.items():
+        http_endpoint += '&{}={}'.format(k, v)
+
+    return http_endpoint
+
+
 def parse_yt_datetime(date_str):
     '''
     Parses a date string returned from YouTube's API into a Python datetime.
@@ -58,16 +147,112 @@ def parse_yt_datetime(date_str):
     date = None
     if date_str:
         try:
-            date = datetime.datetime.strptime(date_str,"%Y-%m-%dT%H:%M:%S.%fZ")
-            date = datetime.datetime.timestamp(date)
+            date = datetime.datetime.timestamp(_fromisoformat_z(date_str))
         except:
             try:
-                date = datetime.datetime.strptime(date_str,"%Y-%m-%dT%H:%M:%SZ")
+                date = datetime.datetime.strptime(date_str,"%Y-%m-%dT%H:%M:%S.%fZ")
                 date = datetime.datetime.timestamp(date)
             except:
-                pass
+                try:
+                    date = datetime.datetime.strptime(date_str,"%Y-%m-%dT%H:%M:%SZ")
+                    date = datetime.datetime.timestamp(date)
+                except:
+                    pass
     return date
 
+
+def _fromisoformat_z(date_str):
+    '''
+    Parses the two fixed-width forms YouTube's API returns, IE "2018-03-14T20:53:14.000Z" and
+    "2018-03-14T20:53:14Z", into a naive datetime several times faster than ``strptime``.
+    Raises ValueError on anything else, which :func:`parse_yt_datetime` hands to ``strptime``.
+    '''
+    if _is_fixed_width(date_str):
+        return datetime.datetime.fromisoformat(date_str[:-1])
+    raise ValueError('Not a fixed-width YouTube date: {!r}'.format(date_str))
+
+
+def _is_fixed_width(date_str):
+    n = len(date_str)
+    return (n in (20, 24, 27) and date_str[-1] == 'Z' and date_str[10] == 'T'
+            and (n == 20 or date_str[19] == '.'))
+
+
+def parse_yt_datetimes(date_strs):
+    '''
+    Parses a page or column of date strings returned from YouTube's API at once,
+    with the same results as :func:`parse_yt_datetime` on each of them.
+    numpy parses the whole column, and each date is shifted by the offset of the local time zone on its day,
+    which is looked up once per day. Dates on the days the offset changes, IE daylight saving time starts or ends,
+    are parsed on their own, and so is every date if any isn't in one of the two forms the API returns.
+
+    :param date_strs: date strings, IE the "publishedAt" of every item of a page.
+    :type date_strs: iterable of str
+
+    :returns: the timestamps, None where a date is missing or invalid.
+    :rtype: list of float
+    '''
+    date_strs = list(date_strs)
+    if not date_strs:
+        return []
+    try:
+        micros = _yt_datetime64(date_strs).astype(np.int64)
+    except ValueError:
+        return [parse_yt_datetime(date_str) for date_str in date_strs]
+    seconds, fraction = np.divmod(micros, 10 ** 6)
+    # naive dates are local time, like datetime.timestamp, so shift them by the offset of the zone on their day.
+    # missing dates are NaT, far outside the days of datetime, and are parsed on their own.
+    days, inverse = np.unique(seconds // 86400, return_inverse=True)
+    offsets = np.array([_day_utc_offset(day, time.timezone, time.tzname) for day in days.tolist()],
+                       dtype=np.float64)[inverse]
+    timestamps = ((seconds + offsets) + fraction / 1e6).tolist()
+    for i in np.flatnonzero(np.isnan(offsets)).tolist():
+        timestamps[i] = parse_yt_datetime(date_strs[i])
+    return timestamps
+
+
+def _yt_datetime64(date_strs):
+    '''
+    Parses date strings in the two fixed-width forms YouTube's API returns into a numpy datetime64[us] array in UTC,
+    NaT where a date is None. Raises ValueError if any other date isn't in one of the two forms.
+    '''
+    if not all(date_str is None or (isinstance(date_str, str) and _is_fixed_width(date_str))
+               for date_str in date_strs):
+        raise ValueError('Not all fixed-width YouTube dates.')
+    return np.array([date_str[:-1] if date_str is not None else 'NaT' for date_str in date_strs],
+                    dtype='datetime64[us]')
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+@functools.lru_cache(maxsize=65536)
+def _day_utc_offset(day, timezone, tzname):
+    '''
+    Returns the seconds between UTC and local time over the ``day``-th day since the epoch,
+    or None if it changed during the day. ``timezone`` and ``tzname`` key the cache by local time zone.
+    '''
+    try:
+        start = _EPOCH + datetime.timedelta(days=day)
+        offsets = {datetime.datetime.timestamp(date) - calendar.timegm(date.timetuple())
+                   for date in (start, start + datetime.timedelta(seconds=86399))}
+    except (OverflowError, OSError, ValueError):
+        return None
+    return offsets.pop() if len(offsets) == 1 else None
+
+
+_YT_DURATION = re.compile(r'P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+
+def parse_yt_duration(duration_str):
+    '''
+    Parses an ISO 8601 duration returned from YouTube's API, IE the "contentDetails/duration" of a video
+    "PT1H2M3S", into a number of seconds. Returns None if it can't be parsed.
+    '''
+    match = _YT_DURATION.fullmatch(duration_str) if isinstance(duration_str, str) else None
+    if not match:
+        return None
+    weeks, days, hours, minutes, seconds = [int(group) if group else 0 for group in match.groups()]
+    return (((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds
+
 def get_upload_playlist_id(channel_id):
     '''Given a channel_id, returns the user uploaded playlist id.'''
     playlist_id = 'UU' + channel_id[2:]
@@ -78,3 +263,148 @@ def get_liked_playlist_id(channel_id):
     '''Given a channel_id, returns the user liked playlist id.'''
     playlist_id = 'LL' + channel_id[2:]
     return playlist_id
+
+
+def _fields_mask(paths):
+    '''
+    Compiles slash separated JSON paths into the ``fields`` syntax of the API,
+    IE ['id', 'snippet/title', 'snippet/thumbnails/high/url'] -> 'id,snippet(title,thumbnails/high/url)'.
+    '''
+    tree = dict()
+    for path in paths:
+        node = tree
+        for name in path.split('/'):
+            node = node.setdefault(name, dict())
+
+    def render(node):
+        fields = []
+        for name, children in node.items():
+            if not children:
+                fields.append(name)
+            elif len(children) == 1:
+                fields.append('{}/{}'.format(name, render(children)))
+            else:
+                fields.append('{}({})'.format(name, render(children)))
+        return ','.join(fields)
+
+    return render(tree)
+
+
+def _with_fields(parser, resource, kwargs, paths=(), fields=()):
+    '''
+    Adds a ``fields`` mask of the JSON paths ``parser`` reads from ``resource`` items to the query ``kwargs``,
+    so the API only sends those properties. Keeps ``kwargs`` as-is if it already has ``fields``,
+    or the parser doesn't declare its paths.
+    The caller adds the item ``paths`` and top-level ``fields`` it reads itself.
+    '''
+    declared = getattr(parser, 'fields', None)
+    if not declared or 'fields' in kwargs:
+        return kwargs
+    declared = declared.get(resource, declared.get(None))
+    if not declared:
+        return kwargs
+    return dict(kwargs, fields=','.join(['nextPageToken', 'etag'] + list(fields) +
+                                        ['items({})'.format(_fields_mask(list(declared) + list(paths)))]))
+
+
+def _replies_truncated(item):
+    '''
+    Whether a comment thread ``item`` requested with ``part=replies`` is missing some of its replies,
+    as the API includes at most 5 of them.
+    '''
+    inline = item.get('replies', {}).get('comments', [])
+    return len(inline) < item.get('snippet', {}).get('totalReplyCount', 0)
+
+
+def _timestamp(date):
+    '''
+    Converts a timestamp or datetime into a timestamp. Naive datetimes are in UTC, like in :func:`_search_query`.
+    '''
+    if isinstance(date, datetime.datetime) and date.tzinfo:
+        return date.timestamp()
+    if isinstance(date, datetime.datetime):
+        return calendar.timegm(date.timetuple()) + date.microsecond / 1e6
+    if isinstance(date, datetime.date):
+        return float(calendar.timegm(date.timetuple()))
+    return float(date)
+
+
+def _search_item_id(item):
+    '''
+    Returns the video, channel or playlist ID of a raw search result.
+    '''
+    item_id = item.get('id', {})
+    if not isinstance(item_id, dict):
+        return item_id
+    return item_id.get('videoId') or item_id.get('channelId') or item_id.get('playlistId')
+
+
+def _compact_id(item_id):
+    '''
+    Packs an 11 character video ID, URL-safe base64, into an int,
+    which takes 36 bytes instead of 60 for the string. Other IDs are returned as-is.
+    '''
+    if isinstance(item_id, str) and len(item_id) == 11:
+        try:
+            # pad to 12 characters so no bits are dropped.
+            return int.from_bytes(base64.b64decode(item_id + 'A', altchars=b'-_', validate=True), 'big')
+        except (binascii.Error, ValueError):
+            pass
+    return item_id
+
+
+def _publish_timestamp(date):
+    '''
+    Converts a timestamp or datetime into the clock of :func:`parse_yt_datetime`, which reads the UTC dates of the API
+    as local time, so a mark compares with the ``publish_date`` of the parsers. Naive datetimes are in UTC, like in :func:`_search_query`.
+    '''
+    if isinstance(date, datetime.datetime):
+        if date.tzinfo:
+            date = date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return datetime.datetime.timestamp(date)
+    if isinstance(date, datetime.date):
+        return datetime.datetime.timestamp(datetime.datetime(date.year, date.month, date.day))
+    return float(date)
+
+
+def _watermark(since):
+    '''
+    Normalizes the high-water mark of a playlist into a (timestamp, video IDs) tuple, or None.
+    ``since`` is a datetime or timestamp, a collection of video IDs, or a tuple of both.
+    Timestamps are in the clock of :func:`parse_yt_datetime`, see :func:`_publish_timestamp`.
+    '''
+    if since is None:
+        return None
+    if isinstance(since, tuple) and len(since) == 2 and not isinstance(since[1], str):
+        timestamp, video_ids = since
+        return (_publish_timestamp(timestamp) if timestamp is not None else None, set(video_ids))
+    if isinstance(since, (set, frozenset, list, tuple)):
+        return (None, set(since))
+    return (_publish_timestamp(since), set())
+
+
+def _new_items(items, watermark):
+    '''
+    Returns the playlist items before the first one at or below the high-water mark,
+    and whether the mark was reached.
+    '''
+    if not watermark:
+        return items, False
+    timestamp, video_ids = watermark
+    published = parse_yt_datetimes(item.get('snippet', {}).get('publishedAt') for item in items)
+    for i, (item, published_at) in enumerate(zip(items, published)):
+        snippet = item.get('snippet', {})
+        if (snippet.get('resourceId', {}).get('videoId') in video_ids or
+                (timestamp is not None and published_at is not None and published_at <= timestamp)):
+            return items[:i], True
+    return items, False
+
+
+def _next_watermark(items):
+    '''
+    Returns the high-water mark of the newest playlist ``items``: their latest publish timestamp and video IDs.
+    '''
+    timestamps = parse_yt_datetimes(item.get('snippet', {}).get('publishedAt') for item in items)
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    video_ids = [item.get('snippet', {}).get('resourceId', {}).get('videoId') for item in items]
+    return (max(timestamps) if timestamps else None, [video_id for video_id in video_ids if video_id])